@@ -1,10 +1,36 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Count
 from .models import (
     Rol, User, Grado, Grupo, Asignatura, Estudiante, 
     DocenteAsignaturaGrupo, Asistencia, Periodo, Calificacion, 
     TipoObservacion, Observador, Planeacion
 )
+from . import roles
+
+# Los __str__ de Grupo, Estudiante y de los modelos que los referencian
+# recorren relaciones (grupo -> grado, estudiante -> user). Cada admin carga
+# esas relaciones con list_select_related para que el listado haga una sola
+# consulta sin importar cuántas filas muestre.
+
+def grupos_con_grado():
+    return Grupo.objects.select_related('grado').order_by('grado__nombre', 'nombre')
+
+class GrupoListFilter(admin.RelatedFieldListFilter):
+    """
+    Filtro por grupo que carga el grado de todas las opciones en una consulta
+    """
+    def field_choices(self, field, request, model_admin):
+        return [(grupo.pk, str(grupo)) for grupo in grupos_con_grado()]
+
+class SiseModelAdmin(admin.ModelAdmin):
+    """
+    Los selectores de Grupo de los formularios usan grupos_con_grado()
+    """
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.related_model is Grupo and 'queryset' not in kwargs:
+            kwargs['queryset'] = grupos_con_grado()
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 @admin.register(Rol)
 class RolAdmin(admin.ModelAdmin):
@@ -14,6 +40,7 @@ class RolAdmin(admin.ModelAdmin):
 class UserAdmin(BaseUserAdmin):
     list_display = ('email', 'nombre', 'apellido', 'rol', 'is_staff')
     list_filter = ('rol', 'is_staff', 'is_superuser', 'is_active')
+    list_select_related = ('rol',)
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         ('Información Personal', {'fields': ('nombre', 'apellido', 'rol')}),
@@ -28,19 +55,48 @@ class UserAdmin(BaseUserAdmin):
     search_fields = ('email', 'nombre', 'apellido')
     ordering = ('email',)
     filter_horizontal = ('groups', 'user_permissions',)
+    
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        # El autocompletado de los campos "docente" solo ofrece docentes
+        if request.GET.get('field_name') == 'docente':
+            rol_docente = roles.registro.id(roles.DOCENTE)
+            if rol_docente:
+                queryset = queryset.filter(rol_id=rol_docente)
+        return queryset, may_have_duplicates
 
 admin.site.register(User, UserAdmin)
 
 @admin.register(Grado)
 class GradoAdmin(admin.ModelAdmin):
-    list_display = ('nombre',)
+    list_display = ('nombre', 'total_grupos')
     search_fields = ('nombre',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(total_grupos=Count('grupos'))
+    
+    def total_grupos(self, obj):
+        return obj.total_grupos
+    total_grupos.short_description = 'Grupos'
+    total_grupos.admin_order_field = 'total_grupos'
 
 @admin.register(Grupo)
 class GrupoAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'grado')
+    list_display = ('nombre', 'grado', 'total_estudiantes')
     list_filter = ('grado',)
+    list_select_related = ('grado',)
     search_fields = ('nombre', 'grado__nombre')
+    
+    def get_queryset(self, request):
+        # select_related también para el autocompletado, que no usa list_select_related
+        return super().get_queryset(request).select_related('grado').annotate(
+            total_estudiantes=Count('estudiantes')
+        )
+    
+    def total_estudiantes(self, obj):
+        return obj.total_estudiantes
+    total_estudiantes.short_description = 'Estudiantes'
+    total_estudiantes.admin_order_field = 'total_estudiantes'
 
 @admin.register(Asignatura)
 class AsignaturaAdmin(admin.ModelAdmin):
@@ -53,17 +109,21 @@ class EstudianteInline(admin.StackedInline):
     verbose_name_plural = 'estudiante'
 
 @admin.register(Estudiante)
-class EstudianteAdmin(admin.ModelAdmin):
+class EstudianteAdmin(SiseModelAdmin):
     list_display = ('get_nombre', 'get_apellido', 'get_email', 'grupo')
-    list_filter = ('grupo', 'grupo__grado')
+    list_filter = (('grupo', GrupoListFilter), 'grupo__grado')
+    list_select_related = ('user', 'grupo__grado')
     search_fields = ('user__nombre', 'user__apellido', 'user__email', 'grupo__nombre', 'grupo__grado__nombre')
+    raw_id_fields = ('user',)
+    autocomplete_fields = ('acudientes',)
     
     def get_queryset(self, request):
-        # Filtrar solo usuarios con rol de Estudiante
-        qs = super().get_queryset(request)
-        rol_estudiante = Rol.objects.filter(nombre='Estudiante').first()
+        # Filtrar solo usuarios con rol de Estudiante. El select_related sirve
+        # también al autocompletado de los demás admins, que usa este queryset
+        qs = super().get_queryset(request).select_related('user', 'grupo__grado')
+        rol_estudiante = roles.registro.id(roles.ESTUDIANTE)
         if rol_estudiante:
-            return qs.filter(user__rol=rol_estudiante)
+            return qs.filter(user__rol_id=rol_estudiante)
         return qs
     
     def get_nombre(self, obj):
@@ -82,24 +142,26 @@ class EstudianteAdmin(admin.ModelAdmin):
     get_email.admin_order_field = 'user__email'
 
 @admin.register(DocenteAsignaturaGrupo)
-class DocenteAsignaturaGrupoAdmin(admin.ModelAdmin):
+class DocenteAsignaturaGrupoAdmin(SiseModelAdmin):
     list_display = ('docente', 'asignatura', 'grupo')
-    list_filter = ('asignatura', 'grupo', 'grupo__grado')
+    list_filter = ('asignatura', ('grupo', GrupoListFilter), 'grupo__grado')
+    list_select_related = ('docente', 'asignatura', 'grupo__grado')
     search_fields = ('docente__nombre', 'docente__apellido', 'asignatura__nombre', 'grupo__nombre')
+    autocomplete_fields = ('docente',)
     
     def get_queryset(self, request):
         # Filtrar solo usuarios con rol de Docente
         qs = super().get_queryset(request)
-        rol_docente = Rol.objects.filter(nombre='Docente').first()
+        rol_docente = roles.registro.id(roles.DOCENTE)
         if rol_docente:
-            return qs.filter(docente__rol=rol_docente)
+            return qs.filter(docente__rol_id=rol_docente)
         return qs
     
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "docente":
-            rol_docente = Rol.objects.filter(nombre='Docente').first()
+            rol_docente = roles.registro.id(roles.DOCENTE)
             if rol_docente:
-                kwargs["queryset"] = User.objects.filter(rol=rol_docente)
+                kwargs["queryset"] = User.objects.filter(rol_id=rol_docente)
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 @admin.register(Periodo)
@@ -108,17 +170,24 @@ class PeriodoAdmin(admin.ModelAdmin):
     search_fields = ('nombre',)
 
 @admin.register(Asistencia)
-class AsistenciaAdmin(admin.ModelAdmin):
+class AsistenciaAdmin(SiseModelAdmin):
     list_display = ('estudiante', 'fecha', 'estado', 'registrada_por')
-    list_filter = ('estado', 'fecha', 'estudiante__grupo', 'estudiante__grupo__grado')
+    list_filter = ('estado', 'fecha', ('estudiante__grupo', GrupoListFilter), 'estudiante__grupo__grado')
+    list_select_related = ('estudiante__user', 'estudiante__grupo__grado', 'registrada_por')
     search_fields = ('estudiante__user__nombre', 'estudiante__user__apellido', 'observaciones')
+    autocomplete_fields = ('estudiante', 'registrada_por')
     date_hierarchy = 'fecha'
+    # Evita un COUNT(*) adicional sobre toda la tabla al filtrar
+    show_full_result_count = False
 
 @admin.register(Calificacion)
-class CalificacionAdmin(admin.ModelAdmin):
+class CalificacionAdmin(SiseModelAdmin):
     list_display = ('estudiante', 'asignatura', 'periodo', 'nota')
-    list_filter = ('asignatura', 'periodo', 'estudiante__grupo', 'estudiante__grupo__grado')
+    list_filter = ('asignatura', 'periodo', ('estudiante__grupo', GrupoListFilter), 'estudiante__grupo__grado')
+    list_select_related = ('estudiante__user', 'estudiante__grupo__grado', 'asignatura', 'periodo')
     search_fields = ('estudiante__user__nombre', 'estudiante__user__apellido', 'observaciones')
+    autocomplete_fields = ('estudiante',)
+    show_full_result_count = False
 
 @admin.register(TipoObservacion)
 class TipoObservacionAdmin(admin.ModelAdmin):
@@ -126,22 +195,27 @@ class TipoObservacionAdmin(admin.ModelAdmin):
     search_fields = ('nombre',)
 
 @admin.register(Observador)
-class ObservadorAdmin(admin.ModelAdmin):
+class ObservadorAdmin(SiseModelAdmin):
     list_display = ('estudiante', 'tipo_observacion', 'fecha', 'registrada_por')
-    list_filter = ('tipo_observacion', 'fecha', 'estudiante__grupo', 'estudiante__grupo__grado')
+    list_filter = ('tipo_observacion', 'fecha', ('estudiante__grupo', GrupoListFilter), 'estudiante__grupo__grado')
+    list_select_related = ('estudiante__user', 'estudiante__grupo__grado', 'tipo_observacion', 'registrada_por')
     search_fields = ('estudiante__user__nombre', 'estudiante__user__apellido', 'descripcion')
+    autocomplete_fields = ('estudiante', 'registrada_por')
     date_hierarchy = 'fecha'
+    show_full_result_count = False
 
 @admin.register(Planeacion)
-class PlaneacionAdmin(admin.ModelAdmin):
+class PlaneacionAdmin(SiseModelAdmin):
     list_display = ('docente', 'asignatura', 'grupo', 'fecha', 'tema', 'estado')
-    list_filter = ('estado', 'asignatura', 'grupo', 'grupo__grado')
+    list_filter = ('estado', 'asignatura', ('grupo', GrupoListFilter), 'grupo__grado')
+    list_select_related = ('docente', 'asignatura', 'grupo__grado')
     search_fields = ('docente__nombre', 'docente__apellido', 'tema', 'objetivos', 'competencias')
+    autocomplete_fields = ('docente',)
     date_hierarchy = 'fecha'
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         # Si el usuario no es superusuario y es un docente, solo mostrar sus planeaciones
-        if not request.user.is_superuser and hasattr(request.user, 'rol') and request.user.rol.nombre == 'Docente':
+        if not request.user.is_superuser and roles.registro.nombre(getattr(request.user, 'rol_id', None)) == roles.DOCENTE:
             return qs.filter(docente=request.user)
         return qs
@@ -0,0 +1,135 @@
+"""
+Almacenamiento con deduplicación por contenido para los adjuntos de
+planeaciones.
+
+Cada archivo se guarda una sola vez en ``blobs/<ab>/<sha256>`` dentro de
+MEDIA_ROOT, y el nombre que queda en el campo es
+``planeaciones/<sha256>/<nombre original>``: el nombre original se conserva
+para la descarga, pero todos los adjuntos con el mismo contenido apuntan al
+mismo blob. El hash se calcula mientras el archivo se copia a un temporal
+junto a los blobs; si el blob ya existía, el temporal se descarta sin
+reescribir el contenido.
+
+BlobAdjunto lleva la cuenta de las planeaciones que usan cada blob (la
+actualizan las señales de Planeacion, ver core/signals.py). Los blobs no se
+borran al reemplazar o eliminar un adjunto: los elimina el comando
+``recolectar_adjuntos`` cuando ya no tienen referencias. Los nombres sin hash
+(adjuntos guardados antes de la deduplicación) siguen funcionando como en
+FileSystemStorage.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, storages
+from django.db.models import F
+from django.utils import timezone
+
+# Bytes leídos por iteración al calcular el hash de un archivo existente
+BLOQUE = 1024 * 1024
+DIRECTORIO_BLOBS = 'blobs'
+
+_HASH = re.compile(r'[0-9a-f]{64}')
+
+def hash_de_nombre(nombre):
+    """
+    Hash del blob al que apunta un nombre ``<directorio>/<sha256>/<archivo>``,
+    o None si el nombre no es de un blob
+    """
+    partes = (nombre or '').split('/')
+    if len(partes) >= 3 and _HASH.fullmatch(partes[-2]):
+        return partes[-2]
+    return None
+
+class ArchivoEnDisco(File):
+    """
+    Archivo local abierto que el almacenamiento puede mover en lugar de
+    copiar (temporary_file_path, como los archivos temporales de Django)
+    """
+    def temporary_file_path(self):
+        return self.name
+
+def almacenamiento_adjuntos():
+    # Se resuelve al usarse para que STORAGES['adjuntos'] pueda cambiarse
+    return storages['adjuntos']
+
+class AlmacenamientoDeduplicado(FileSystemStorage):
+    def ruta_blob(self, sha256):
+        return super().path(f'{DIRECTORIO_BLOBS}/{sha256[:2]}/{sha256}')
+
+    def path(self, name):
+        sha256 = hash_de_nombre(name)
+        return self.ruta_blob(sha256) if sha256 else super().path(name)
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre final depende del contenido y agrega '<sha256>/' (ver
+        # _save): no hay colisiones, pero el nombre original se recorta para
+        # que quepa en el campo
+        extra = 65
+        if max_length and len(name) + extra > max_length:
+            raiz, extension = os.path.splitext(name)
+            name = raiz[:max_length - extra - len(extension)] + extension
+        return name
+
+    def _save(self, name, content):
+        directorio = super().path(DIRECTORIO_BLOBS)
+        os.makedirs(directorio, exist_ok=True)
+        hasher = hashlib.sha256()
+        tamano = 0
+        if hasattr(content, 'temporary_file_path'):
+            # Archivo ya escrito en disco (carga por partes o archivo grande
+            # de un formulario): solo se lee para el hash y luego se mueve
+            temporal = content.temporary_file_path()
+            with open(temporal, 'rb') as archivo:
+                for bloque in iter(lambda: archivo.read(BLOQUE), b''):
+                    hasher.update(bloque)
+                    tamano += len(bloque)
+        else:
+            with tempfile.NamedTemporaryFile(dir=directorio, prefix='.tmp-', delete=False) as archivo:
+                temporal = archivo.name
+                for bloque in content.chunks():
+                    hasher.update(bloque)
+                    archivo.write(bloque)
+                    tamano += len(bloque)
+
+        sha256 = hasher.hexdigest()
+        destino = self.ruta_blob(sha256)
+        self._registrar(sha256, tamano)
+        if os.path.exists(destino):
+            os.remove(temporal)
+            # Se renueva la fecha para que la recolección no lo tome por abandonado
+            os.utime(destino)
+        else:
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            file_move_safe(temporal, destino, allow_overwrite=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(destino, self.file_permissions_mode)
+
+        directorio_nombre, archivo_nombre = os.path.split(name)
+        return '/'.join(filter(None, [directorio_nombre, sha256, archivo_nombre]))
+
+    def _registrar(self, sha256, tamano):
+        from .models import BlobAdjunto
+        actualizados = BlobAdjunto.objects.filter(sha256=sha256).update(usado=timezone.now())
+        if not actualizados:
+            BlobAdjunto.objects.get_or_create(sha256=sha256, defaults={'tamano': tamano})
+
+    def delete(self, name):
+        # Otro adjunto puede usar el mismo blob: los borra recolectar_adjuntos
+        if hash_de_nombre(name):
+            return
+        super().delete(name)
+
+def ajustar_referencias(sha256, cambio):
+    """
+    Suma ``cambio`` a las referencias del blob ``sha256`` (si es un blob)
+    """
+    from .models import BlobAdjunto
+    if not sha256:
+        return
+    blobs = BlobAdjunto.objects.filter(sha256=sha256)
+    if cambio < 0:
+        blobs = blobs.filter(referencias__gte=-cambio)
+    blobs.update(referencias=F('referencias') + cambio, usado=timezone.now())
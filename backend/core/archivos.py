@@ -0,0 +1,128 @@
+"""
+Entrega de archivos de MEDIA_ROOT después de comprobar el permiso en la vista.
+
+Según ``SISE_DESCARGAS_SERVIDOR`` la respuesta solo lleva la cabecera para
+que el servidor web envíe el archivo (``x-accel`` para nginx, ``x-sendfile``
+para Apache o lighttpd) o Django lo transmite en bloques con FileResponse,
+con soporte de Range (un solo intervalo) para reanudar descargas y para los
+reproductores de video.
+
+Con nginx, MEDIA_ROOT se publica en una location interna cuyo prefijo es
+``SISE_DESCARGAS_PREFIJO_INTERNO``::
+
+    location /protegido/ {
+        internal;
+        alias /ruta/a/backend/media/;
+    }
+"""
+import mimetypes
+import os
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+# Bytes leídos por iteración al transmitir un archivo desde Django
+BLOQUE = 64 * 1024
+
+class _Tramo:
+    """
+    Lectura de ``longitud`` bytes de un archivo desde su posición actual
+    """
+    def __init__(self, archivo, longitud):
+        self.archivo = archivo
+        self.restante = longitud
+
+    def read(self, tamano=-1):
+        if tamano < 0 or tamano > self.restante:
+            tamano = self.restante
+        datos = self.archivo.read(tamano) if tamano else b''
+        self.restante -= len(datos)
+        return datos
+
+    def close(self):
+        self.archivo.close()
+
+def rango_solicitado(cabecera, tamano):
+    """
+    Interpreta una cabecera Range de un solo intervalo de bytes.
+
+    Devuelve ``(inicio, fin)`` con el fin incluido, None si la cabecera no
+    aplica (se envía el archivo completo) o False si el intervalo queda fuera
+    del archivo (416).
+    """
+    if not cabecera:
+        return None
+    unidad, _, intervalo = cabecera.partition('=')
+    if unidad.strip().lower() != 'bytes' or ',' in intervalo:
+        return None
+    inicio, guion, fin = intervalo.strip().partition('-')
+    if not guion:
+        return None
+    try:
+        if inicio:
+            inicio = int(inicio)
+            fin = int(fin) if fin else max(inicio, tamano - 1)
+            if fin < inicio:
+                return None
+        else:
+            # bytes=-N: los últimos N bytes
+            sufijo = int(fin)
+            if sufijo == 0:
+                return False
+            inicio, fin = max(tamano - sufijo, 0), tamano - 1
+    except ValueError:
+        return None
+    if inicio >= tamano:
+        return False
+    return inicio, min(fin, tamano - 1)
+
+def respuesta_archivo(request, archivo, nombre=None):
+    """
+    Respuesta de descarga de ``archivo`` (un FieldFile) como adjunto con
+    ``nombre`` (por defecto, el nombre del archivo en el almacenamiento)
+    """
+    nombre = nombre or os.path.basename(archivo.name)
+    servidor = settings.SISE_DESCARGAS_SERVIDOR
+    if servidor == 'django':
+        return _transmitir(request, archivo, nombre)
+
+    tipo = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+    respuesta = HttpResponse(content_type=tipo)
+    if servidor == 'x-accel':
+        # Ruta real dentro de MEDIA_ROOT: con deduplicación no coincide con el nombre
+        relativa = os.path.relpath(archivo.path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        prefijo = settings.SISE_DESCARGAS_PREFIJO_INTERNO.rstrip('/')
+        respuesta['X-Accel-Redirect'] = f'{prefijo}/{quote(relativa)}'
+    else:
+        respuesta['X-Sendfile'] = archivo.path
+    respuesta['Content-Disposition'] = content_disposition_header(True, nombre)
+    return respuesta
+
+def _transmitir(request, archivo, nombre):
+    tamano = archivo.size
+    modificado = http_date(archivo.storage.get_modified_time(archivo.name).timestamp())
+
+    rango = rango_solicitado(request.headers.get('Range'), tamano)
+    # If-Range: si el archivo cambió desde la descarga parcial, se envía completo
+    condicion = request.headers.get('If-Range')
+    if rango and condicion and parse_http_date_safe(condicion) != parse_http_date_safe(modificado):
+        rango = None
+
+    if rango is False:
+        respuesta = HttpResponse(status=416)
+        respuesta['Content-Range'] = f'bytes */{tamano}'
+    else:
+        archivo.open('rb')
+        if rango:
+            inicio, fin = rango
+            archivo.seek(inicio)
+            respuesta = FileResponse(_Tramo(archivo.file, fin - inicio + 1), status=206, as_attachment=True, filename=nombre)
+            respuesta['Content-Length'] = fin - inicio + 1
+            respuesta['Content-Range'] = f'bytes {inicio}-{fin}/{tamano}'
+        else:
+            respuesta = FileResponse(archivo.file, as_attachment=True, filename=nombre)
+        respuesta.block_size = BLOQUE
+    respuesta['Accept-Ranges'] = 'bytes'
+    respuesta['Last-Modified'] = modificado
+    return respuesta
@@ -0,0 +1,126 @@
+"""
+Versiones asíncronas de las lecturas más frecuentes de la API.
+
+DRF no tiene vistas asíncronas: bajo ASGI cada petición a una vista de DRF
+ocupa un hilo a través de sync_to_async. Estas vistas son ``async def`` de
+Django que usan el ORM asíncrono y ``CachedTokenAuthentication.aauthenticate``,
+así que una conexión que espera no retiene ningún hilo. Reutilizan los
+filtros, la paginación y los serializadores de UserViewSet, por lo que sus
+respuestas son iguales a las de las rutas síncronas.
+
+Solo aceptan GET con autenticación por token.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from . import roles
+from .authentication import CachedTokenAuthentication
+from .models import User
+from .serializers import RolSerializer
+from .services.auth_service import AuthService
+from .views import ESTADO_API, UserViewSet
+
+autenticacion = CachedTokenAuthentication()
+
+def _json(datos, status=200):
+    return HttpResponse(JSONRenderer().render(datos), status=status, content_type='application/json')
+
+def vista_async(funcion=None, *, publica=False):
+    """
+    Convierte una corutina ``funcion(request, ...)`` en una vista GET que
+    autentica por token (salvo ``publica``) y responde los errores de DRF
+    con el mismo formato que las vistas síncronas
+    """
+    def decorador(funcion):
+        async def vista(request, *args, **kwargs):
+            if request.method != 'GET':
+                respuesta = _json({"detail": str(exceptions.MethodNotAllowed(request.method).detail)}, 405)
+                respuesta['Allow'] = 'GET'
+                return respuesta
+            peticion = Request(request, authenticators=())
+            try:
+                if not publica:
+                    credenciales = await autenticacion.aauthenticate(request)
+                    if credenciales is None:
+                        raise exceptions.NotAuthenticated()
+                    peticion.user, peticion.auth = credenciales
+                return await funcion(peticion, *args, **kwargs)
+            except exceptions.APIException as exc:
+                respuesta = _json({"detail": exc.detail}, exc.status_code)
+                if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                    respuesta.status_code = 401
+                    respuesta['WWW-Authenticate'] = autenticacion.authenticate_header(request)
+                return respuesta
+        vista.__name__ = funcion.__name__
+        vista.__doc__ = funcion.__doc__
+        return vista
+    return decorador(funcion) if funcion else decorador
+
+def _vista_usuarios(peticion, action, **kwargs):
+    return UserViewSet(request=peticion, args=(), kwargs=kwargs, format_kwarg=None, action=action)
+
+@vista_async(publica=True)
+async def api_health_check(request):
+    return _json(ESTADO_API)
+
+@vista_async
+async def api_user(request):
+    await roles.registro.acargar(request.user.rol_id)
+    respuesta = AuthService.get_current_user(request.user)
+    return _json(respuesta.data, respuesta.status_code)
+
+@vista_async
+async def api_usuarios(request):
+    vista = _vista_usuarios(request, 'list')
+    if request.query_params.get(api_settings.SEARCH_PARAM):
+        # UserSearchFilter puede consultar la base (comprobación de FTS5), así
+        # que corre en el hilo del ORM
+        queryset = await sync_to_async(vista.filter_queryset)(vista.get_queryset())
+    else:
+        queryset = vista.filter_queryset(vista.get_queryset())
+    paginador = vista.paginator
+    filas = await paginador.apaginate_queryset(queryset, request, vista)
+    datos = vista.get_serializer(filas, many=True).data
+    return _json(paginador.get_paginated_response(datos).data)
+
+@vista_async
+async def api_usuario(request, pk):
+    vista = _vista_usuarios(request, 'retrieve', pk=pk)
+    try:
+        usuario = await vista.get_queryset().aget(pk=pk)
+    except User.DoesNotExist:
+        # Mismo mensaje que get_object_or_404 en UserViewSet
+        raise exceptions.NotFound(f'No {User._meta.object_name} matches the given query.')
+    return _json(vista.get_serializer(usuario).data)
+
+@vista_async
+async def api_roles(request):
+    """
+    Listado de roles desde el registro en memoria, con la misma paginación por
+    número de página que RolViewSet
+    """
+    await roles.registro.acargar()
+    todos = [{"id": rol_id, "nombre": nombre} for rol_id, nombre in roles.registro.roles()]
+    tamano = api_settings.PAGE_SIZE
+    try:
+        pagina = int(request.query_params.get('page', 1))
+    except ValueError:
+        raise exceptions.NotFound('Página inválida.')
+    if pagina < 1 or (pagina - 1) * tamano >= max(len(todos), 1):
+        raise exceptions.NotFound('Página inválida.')
+
+    url = request.build_absolute_uri()
+    siguiente = replace_query_param(url, 'page', pagina + 1) if pagina * tamano < len(todos) else None
+    anterior = None
+    if pagina > 1:
+        anterior = remove_query_param(url, 'page') if pagina == 2 else replace_query_param(url, 'page', pagina - 1)
+    return _json({
+        "count": len(todos),
+        "next": siguiente,
+        "previous": anterior,
+        "results": RolSerializer(todos[(pagina - 1) * tamano:pagina * tamano], many=True).data,
+    })
@@ -0,0 +1,189 @@
+"""
+Autenticación por token con caché en memoria y vencimiento de tokens.
+
+``CachedTokenAuthentication`` reemplaza a ``TokenAuthentication`` de DRF:
+guarda en un caché LRU con TTL la relación token -> usuario (con el rol ya
+cargado) para no consultar ``authtoken_token`` y ``core_user`` en cada
+petición. El caché es por proceso: las invalidaciones (logout, cambios del
+usuario) se aplican de inmediato en el proceso que las hace y en los demás
+trabajadores como máximo ``TOKEN_CACHE_TTL`` segundos después.
+
+``aauthenticate`` es la variante asíncrona para las vistas de
+core/async_views.py: usa el mismo caché y, ante un fallo, el ORM asíncrono,
+así que no bloquea el bucle de eventos.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+def token_expirado(token):
+    """
+    Indica si el token superó la vigencia configurada en TOKEN_LIFETIME_HOURS
+    (0 desactiva el vencimiento)
+    """
+    horas = settings.TOKEN_LIFETIME_HOURS
+    return bool(horas) and token.created + timedelta(hours=horas) < timezone.now()
+
+class TokenCache:
+    """
+    Caché LRU con TTL, seguro entre hilos, de token -> Token (con usuario y rol)
+    """
+    def __init__(self, max_entradas, ttl, hook=None):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.hook = hook
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def _notificar(self, evento):
+        if self.hook:
+            self.hook(evento, self)
+
+    def get(self, key):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(key)
+            if entrada is not None and entrada[1] > ahora:
+                self._datos.move_to_end(key)
+                self.aciertos += 1
+                token = entrada[0]
+            else:
+                if entrada is not None:
+                    del self._datos[key]
+                self.fallos += 1
+                token = None
+        self._notificar('acierto' if token else 'fallo')
+        return token
+
+    def set(self, key, token):
+        with self._lock:
+            self._datos[key] = (token, time.monotonic() + self.ttl)
+            self._datos.move_to_end(key)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def invalidar_token(self, key):
+        with self._lock:
+            eliminado = self._datos.pop(key, None) is not None
+            self.invalidaciones += eliminado
+        if eliminado:
+            self._notificar('invalidacion')
+
+    def invalidar_usuario(self, user_id):
+        with self._lock:
+            keys = [key for key, (token, _) in self._datos.items() if token.user_id == user_id]
+            for key in keys:
+                del self._datos[key]
+            self.invalidaciones += len(keys)
+        if keys:
+            self._notificar('invalidacion')
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "invalidaciones": self.invalidaciones,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
+
+def _crear_cache():
+    hook = settings.TOKEN_CACHE_METRICS_HOOK
+    return TokenCache(
+        settings.TOKEN_CACHE_SIZE,
+        settings.TOKEN_CACHE_TTL,
+        import_string(hook) if hook else None
+    )
+
+token_cache = _crear_cache()
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication con caché por proceso y vencimiento de tokens
+    """
+    def clave(self, request):
+        """
+        Clave del token de la cabecera Authorization, o None si la petición no
+        usa este esquema
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain spaces.')
+            )
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.')
+            )
+
+    def authenticate(self, request):
+        key = self.clave(request)
+        return None if key is None else self.authenticate_credentials(key)
+
+    async def aauthenticate(self, request):
+        key = self.clave(request)
+        return None if key is None else await self.aauthenticate_credentials(key)
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            try:
+                token = Token.objects.select_related('user__rol').get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Token inválido.')
+            token_cache.set(key, token)
+
+        if token_expirado(token):
+            token_cache.invalidar_token(key)
+            Token.objects.filter(key=key).delete()
+            raise exceptions.AuthenticationFailed('El token ha expirado.')
+        return self._credenciales(token)
+
+    async def aauthenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            try:
+                token = await Token.objects.select_related('user__rol').aget(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Token inválido.')
+            token_cache.set(key, token)
+
+        if token_expirado(token):
+            token_cache.invalidar_token(key)
+            await Token.objects.filter(key=key).adelete()
+            raise exceptions.AuthenticationFailed('El token ha expirado.')
+        return self._credenciales(token)
+
+    def _credenciales(self, token):
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('Usuario inactivo o eliminado.')
+
+        # Cada petición recibe su propia copia para que los cambios que haga
+        # una vista sobre request.user no se compartan con otras peticiones
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return (token.user, token)
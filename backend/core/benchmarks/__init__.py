@@ -0,0 +1,138 @@
+"""
+Escenarios de benchmark ejecutables con ``python manage.py benchmark <escenario>``.
+
+Cada escenario es un módulo de este paquete con una función
+``run(opciones)`` que devuelve una lista de mediciones (ver ``medir``).
+Los datos de prueba se crean dentro de una transacción que el comando
+revierte al terminar, por lo que la base de datos no queda modificada.
+
+Los resultados pueden guardarse como línea base en ``bases/<escenario>.json``
+(``--guardar-base``) y compararse en ejecuciones posteriores (``--comparar``):
+una medición es una regresión si su mediana supera la de la base en más de
+la tolerancia relativa y del margen absoluto (los endpoints de menos de un
+milisegundo varían más que cualquier tolerancia razonable), o si ejecuta más
+consultas. Las consultas se cuentan en cada repetición y se guarda la mayor
+(``consultas``) y la menor (``consultas_min``): la primera repetición suele
+cargar cachés del proceso y hacer alguna consulta más que las demás.
+"""
+import json
+import statistics
+import time
+from pathlib import Path
+from django.db import connection
+
+ESCENARIOS = {
+    'api': 'core.benchmarks.api',
+    'asgi': 'core.benchmarks.asgi',
+    'asistencia': 'core.benchmarks.asistencia',
+    'busqueda': 'core.benchmarks.busqueda',
+    'calificaciones': 'core.benchmarks.calificaciones',
+    'docente': 'core.benchmarks.docente',
+    'exportacion': 'core.benchmarks.exportacion',
+    'login': 'core.benchmarks.login',
+    'planeaciones': 'core.benchmarks.planeaciones',
+    'usuarios': 'core.benchmarks.usuarios',
+}
+
+class ContadorConsultas:
+    """
+    execute_wrapper que solo cuenta las consultas ejecutadas
+    """
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+def medir(nombre, funcion, repeticiones=5, preparar=None):
+    """
+    Ejecuta ``funcion`` varias veces y devuelve tiempos y número de consultas.
+
+    ``preparar`` se llama antes de cada repetición y no se mide.
+    """
+    tiempos = []
+    consultas = []
+    contador = ContadorConsultas()
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        contador.total = 0
+        with connection.execute_wrapper(contador):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(contador.total)
+    return resumen(nombre, tiempos, consultas)
+
+def resumen(nombre, tiempos, consultas, segundos=None):
+    """
+    Medición con el formato de ``medir`` a partir de tiempos en milisegundos.
+
+    ``consultas`` es la lista de consultas de cada repetición o un solo número
+    si todas hicieron las mismas. ``segundos`` es la duración total cuando las
+    repeticiones corren en paralelo; por defecto se asume que corrieron una
+    tras otra.
+    """
+    if isinstance(consultas, int):
+        consultas = [consultas]
+    tiempos = sorted(tiempos)
+    if segundos is None:
+        segundos = sum(tiempos) / 1000
+    return {
+        "nombre": nombre,
+        "repeticiones": len(tiempos),
+        "mediana_ms": round(statistics.median(tiempos), 2),
+        "p95_ms": round(_percentil(tiempos, 0.95), 2),
+        "p99_ms": round(_percentil(tiempos, 0.99), 2),
+        "min_ms": round(tiempos[0], 2),
+        "por_segundo": round(len(tiempos) / segundos, 1) if segundos else None,
+        "consultas": max(consultas),
+        "consultas_min": min(consultas),
+    }
+
+def _percentil(ordenados, fraccion):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fraccion))]
+
+def ruta_base(escenario):
+    return Path(__file__).resolve().parent / 'bases' / f'{escenario}.json'
+
+def guardar_base(ruta, escenario, opciones, resultados):
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    contenido = {
+        "escenario": escenario,
+        "tamano": opciones['tamano'],
+        "repeticiones": opciones['repeticiones'],
+        "resultados": resultados,
+    }
+    ruta.write_text(json.dumps(contenido, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+def cargar_base(ruta):
+    return json.loads(Path(ruta).read_text(encoding='utf-8'))
+
+def comparar(resultados, base, tolerancia=0.25, margen_ms=1.0, tiempos=True):
+    """
+    Devuelve las regresiones de ``resultados`` frente a la línea base.
+
+    Con ``tiempos=False`` solo se comparan las consultas, que no dependen de
+    la máquina.
+    """
+    anteriores = {resultado['nombre']: resultado for resultado in base['resultados']}
+    regresiones = []
+    for resultado in resultados:
+        anterior = anteriores.get(resultado['nombre'])
+        if anterior is None:
+            continue
+        if resultado['consultas'] > anterior['consultas']:
+            regresiones.append({
+                "nombre": resultado['nombre'], "metrica": 'consultas',
+                "base": anterior['consultas'], "actual": resultado['consultas'],
+            })
+        limite = max(anterior['mediana_ms'] * (1 + tolerancia), anterior['mediana_ms'] + margen_ms)
+        if tiempos and resultado['mediana_ms'] > limite:
+            regresiones.append({
+                "nombre": resultado['nombre'], "metrica": 'mediana_ms',
+                "base": anterior['mediana_ms'], "actual": resultado['mediana_ms'],
+            })
+    return regresiones
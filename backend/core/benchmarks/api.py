@@ -0,0 +1,75 @@
+"""
+Latencia, rendimiento y consultas de los endpoints principales de la API
+recorriendo la pila completa (URLs, middleware, autenticación por token,
+permisos, serializadores y renderizado).
+
+``--tamano`` es el número de usuarios creados. El hash de contraseñas se
+cambia por MD5 para que /api/login/ mida la petición y no PBKDF2.
+"""
+from django.contrib.auth.hashers import make_password
+from django.test import Client, override_settings
+from rest_framework.authtoken.models import Token
+from .. import roles
+from ..models import Rol, User
+from ..search import texto_busqueda
+from . import medir
+
+def run(opciones):
+    with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+        return _run(opciones)
+
+def _run(opciones):
+    total = opciones['tamano']
+    password = make_password('benchmark123')
+    rol_admin, _ = Rol.objects.get_or_create(nombre=roles.ADMINISTRADOR)
+    rol_estudiante, _ = Rol.objects.get_or_create(nombre=roles.ESTUDIANTE)
+    admin = User.objects.create(
+        email='bench.admin@sise.test', nombre='Admin', apellido='Bench',
+        password=password, rol=rol_admin, is_staff=True
+    )
+    usuarios = [
+        User(
+            email=f'bench.usuario.{i}@sise.test', nombre=f'Nombre {i % 97}',
+            apellido=f'Apellido {i % 1013:04d}', password=password, rol=rol_estudiante
+        )
+        for i in range(total)
+    ]
+    for usuario in usuarios:
+        usuario.busqueda = texto_busqueda(usuario.nombre, usuario.apellido, usuario.email)
+    User.objects.bulk_create(usuarios, batch_size=1000)
+    uno = User.objects.filter(email__startswith='bench.usuario.').order_by('id').values_list('id', flat=True)[total // 2]
+
+    token = Token.objects.create(user=admin)
+    cliente = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+    anonimo = Client()
+
+    def get(ruta, parametros=None, cliente=cliente):
+        def pedir():
+            respuesta = cliente.get(ruta, parametros)
+            assert respuesta.status_code == 200, (ruta, respuesta.status_code)
+        return pedir
+
+    def login():
+        respuesta = anonimo.post(
+            '/api/login/', {'email': 'bench.admin@sise.test', 'password': 'benchmark123'},
+            content_type='application/json'
+        )
+        assert respuesta.status_code == 200, respuesta.status_code
+
+    # Una petición de calentamiento por endpoint carga cachés (roles, tokens)
+    # para que todas las repeticiones midan el estado estable
+    mediciones = [
+        ('login', login),
+        ('user', get('/api/user/')),
+        ('usuarios lista', get('/api/usuarios/')),
+        ('usuarios búsqueda', get('/api/usuarios/', {'search': 'apellido 0500'})),
+        ('usuarios orden email', get('/api/usuarios/', {'ordering': '-email'})),
+        ('usuarios detalle', get(f'/api/usuarios/{uno}/')),
+        ('roles', get('/api/roles/')),
+        ('health', get('/api/health/', cliente=anonimo)),
+    ]
+    resultados = []
+    for nombre, funcion in mediciones:
+        funcion()
+        resultados.append(medir(nombre, funcion, opciones['repeticiones']))
+    return resultados
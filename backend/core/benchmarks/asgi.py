@@ -0,0 +1,160 @@
+"""
+Rendimiento de WSGI frente a ASGI con muchas conexiones que pasan la mayor
+parte del tiempo inactivas (clientes lentos, redes móviles).
+
+Cada conexión hace ``--repeticiones`` peticiones y antes de cada una queda
+``ESPERA`` segundos inactiva; los inicios se reparten a lo largo de la primera
+espera para que las peticiones no lleguen todas a la vez. Se comparan tres
+formas de servir la misma ruta:
+
+- WSGI con ``HILOS`` hilos, como un servidor de workers síncronos: la
+  conexión ocupa su hilo también mientras está inactiva.
+- ASGI con la vista síncrona de DRF: la espera no ocupa hilos, pero cada
+  petición pasa por sync_to_async.
+- ASGI con las vistas de core/async_views.py.
+
+Las aplicaciones se llaman dentro del proceso (WSGIHandler y ASGIHandler de
+Django, sin red) para medir solo el modelo de concurrencia. La latencia va
+desde que el cliente termina de esperar hasta que recibe la respuesta, así
+que incluye la cola por un hilo libre. ``--tamano`` es el número de
+conexiones simultáneas.
+
+Se miden /api/user/ y /api/health/, que con los cachés de tokens y roles
+calientes no consultan la base: los hilos de los servidores no comparten la
+transacción en la que el comando crea los datos.
+"""
+import asyncio
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from rest_framework.authtoken.models import Token
+from .. import roles
+from ..models import Rol, User
+from . import resumen
+
+# Segundos de inactividad antes de cada petición
+ESPERA = 0.1
+# Hilos del servidor WSGI
+HILOS = 8
+
+RUTAS = [
+    ('user', '/api/user/', '/api/async/user/'),
+    ('health', '/api/health/', '/api/async/health/'),
+]
+
+def run(opciones):
+    rol, _ = Rol.objects.get_or_create(nombre=roles.ADMINISTRADOR)
+    usuario = User.objects.create(
+        email='bench.asgi@sise.test', nombre='Bench', apellido='ASGI', password='!', rol=rol
+    )
+    clave = Token.objects.create(user=usuario).key
+    conexiones, peticiones = opciones['tamano'], opciones['repeticiones']
+
+    # Cada petición cerraría la conexión del hilo principal, que tiene abierta
+    # la transacción del benchmark (igual que hace el cliente de pruebas)
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        resultados = []
+        for nombre, ruta, ruta_async in RUTAS:
+            for modo, medicion in [
+                (f'wsgi ({HILOS} hilos)', lambda: _wsgi(ruta, clave, conexiones, peticiones)),
+                ('asgi vista síncrona', lambda: async_to_sync(_asgi)(ruta, clave, conexiones, peticiones)),
+                ('asgi vista asíncrona', lambda: async_to_sync(_asgi)(ruta_async, clave, conexiones, peticiones)),
+            ]:
+                tiempos, segundos = medicion()
+                resultados.append(resumen(f'{nombre} {modo}', tiempos, 0, segundos))
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+    return resultados
+
+def _wsgi(ruta, clave, conexiones, peticiones):
+    aplicacion = WSGIHandler()
+
+    def pedir():
+        entorno = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': ruta, 'SCRIPT_NAME': '', 'QUERY_STRING': '',
+            'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'testserver', 'HTTP_AUTHORIZATION': f'Token {clave}',
+            'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+            'wsgi.errors': sys.stderr, 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        estados = []
+        respuesta = aplicacion(entorno, lambda estado, cabeceras: estados.append(estado))
+        b''.join(respuesta)
+        respuesta.close()
+        assert estados[0].startswith('200'), (ruta, estados[0])
+
+    pedir()  # Calienta los cachés de token y roles
+    inicio = time.perf_counter()
+
+    def conexion(numero):
+        tiempos = []
+        listo = inicio + ESPERA * (1 + numero / conexiones)
+        time.sleep(max(0.0, listo - time.perf_counter()))
+        for n in range(peticiones):
+            if n:
+                time.sleep(ESPERA)
+                listo = time.perf_counter()
+            pedir()
+            tiempos.append((time.perf_counter() - listo) * 1000)
+        return tiempos
+
+    with ThreadPoolExecutor(HILOS) as hilos:
+        futuros = [hilos.submit(conexion, numero) for numero in range(conexiones)]
+        tiempos = [tiempo for futuro in futuros for tiempo in futuro.result()]
+    return tiempos, time.perf_counter() - inicio
+
+async def _asgi(ruta, clave, conexiones, peticiones):
+    aplicacion = ASGIHandler()
+    alcance = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': ruta, 'raw_path': ruta.encode(), 'root_path': '',
+        'query_string': b'', 'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        'headers': [(b'host', b'testserver'), (b'authorization', f'Token {clave}'.encode())],
+    }
+
+    async def pedir():
+        recibido = False
+        terminado = asyncio.Event()
+        estados = []
+
+        async def receive():
+            nonlocal recibido
+            if not recibido:
+                recibido = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await terminado.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(mensaje):
+            if mensaje['type'] == 'http.response.start':
+                estados.append(mensaje['status'])
+
+        await aplicacion(dict(alcance), receive, send)
+        terminado.set()
+        assert estados == [200], (ruta, estados)
+
+    await pedir()
+    inicio = time.perf_counter()
+
+    async def conexion(numero):
+        tiempos = []
+        await asyncio.sleep(ESPERA * numero / conexiones)
+        for _ in range(peticiones):
+            await asyncio.sleep(ESPERA)
+            listo = time.perf_counter()
+            await pedir()
+            tiempos.append((time.perf_counter() - listo) * 1000)
+        return tiempos
+
+    por_conexion = await asyncio.gather(*(conexion(numero) for numero in range(conexiones)))
+    return [tiempo for tiempos in por_conexion for tiempo in tiempos], time.perf_counter() - inicio
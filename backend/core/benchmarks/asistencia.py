@@ -0,0 +1,45 @@
+"""
+Registro de asistencia de un grupo: guardado fila a fila frente al
+registro masivo de ``AsistenciaService.registrar_grupo``.
+"""
+import datetime
+from django.db import transaction
+from ..models import Asistencia
+from ..services.asistencia_service import AsistenciaService
+from . import medir
+from .datos import crear_institucion
+
+def run(opciones):
+    datos = crear_institucion(estudiantes_por_grupo=opciones['tamano'])
+    grupo = datos.grupos[0]
+    fecha = datetime.date(2025, 2, 3)
+    registros = [
+        {"estudiante": e.id, "estado": "P", "observaciones": ""}
+        for e in datos.estudiantes
+    ]
+
+    def limpiar():
+        Asistencia.objects.filter(estudiante__grupo=grupo).delete()
+
+    def fila_a_fila():
+        # Comportamiento previo: una transacción y un guardado por estudiante
+        for registro in registros:
+            with transaction.atomic():
+                Asistencia.objects.update_or_create(
+                    estudiante_id=registro['estudiante'], fecha=fecha,
+                    defaults={
+                        'estado': registro['estado'],
+                        'registrada_por': datos.docente,
+                    }
+                )
+
+    def masivo():
+        AsistenciaService.registrar_grupo(grupo, fecha, registros, datos.docente)
+
+    repeticiones = opciones['repeticiones']
+    return [
+        medir('fila a fila (nuevo)', fila_a_fila, repeticiones, preparar=limpiar),
+        medir('fila a fila (actualizar)', fila_a_fila, repeticiones),
+        medir('masivo (nuevo)', masivo, repeticiones, preparar=limpiar),
+        medir('masivo (actualizar)', masivo, repeticiones),
+    ]
@@ -0,0 +1,56 @@
+"""
+Búsqueda de usuarios: icontains sobre nombre/apellido/email (el
+SearchFilter anterior) frente a UserSearch sobre la columna normalizada.
+
+``--tamano`` es el número de usuarios creados (p. ej. 100000).
+"""
+import random
+from django.db.models import Q
+from ..models import Rol, User
+from ..search import UserSearch, texto_busqueda
+from . import medir
+
+NOMBRES = [
+    'José', 'María', 'Andrés', 'Sofía', 'Martín', 'Lucía', 'Julián', 'Valentina',
+    'Sebastián', 'Camila', 'Nicolás', 'Daniela', 'Tomás', 'Isabel', 'Matías', 'Ángela',
+]
+APELLIDOS = [
+    'Gómez', 'Rodríguez', 'Martínez', 'García', 'López', 'Hernández', 'Pérez', 'Sánchez',
+    'Ramírez', 'Díaz', 'Muñoz', 'Álvarez', 'Jiménez', 'Vásquez', 'Castaño', 'Peña',
+    'Quiñones', 'Ordóñez', 'Zúñiga', 'Londoño', 'Beltrán', 'Cárdenas', 'Echeverri', 'Montaño',
+]
+
+def run(opciones):
+    aleatorio = random.Random(8)
+    rol, _ = Rol.objects.get_or_create(nombre='Estudiante')
+    usuarios = []
+    for i in range(opciones['tamano']):
+        nombre = aleatorio.choice(NOMBRES)
+        apellido = f'{aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}'
+        email = f'usuario{i}@sise.test'
+        usuarios.append(User(
+            email=email, nombre=nombre, apellido=apellido, password='!', rol=rol,
+            busqueda=texto_busqueda(nombre, apellido, email)
+        ))
+    User.objects.bulk_create(usuarios, batch_size=2000)
+
+    def icontains(texto):
+        def buscar():
+            filtro = Q()
+            for termino in texto.split():
+                filtro &= Q(nombre__icontains=termino) | Q(apellido__icontains=termino) | Q(email__icontains=termino)
+            list(User.objects.filter(filtro).order_by('apellido', 'nombre', 'id')[:10])
+        return buscar
+
+    def indexada(texto):
+        def buscar():
+            queryset, orden = UserSearch.buscar(User.objects.all(), texto)
+            list(queryset.order_by(*filter(None, [orden, 'apellido', 'nombre', 'id']))[:10])
+        return buscar
+
+    repeticiones = opciones['repeticiones']
+    resultados = []
+    for texto in ['Zúñiga', 'zuniga', 'ordoñ', 'Sofía Peña', 'usuario9999']:
+        resultados.append(medir(f'icontains "{texto}"', icontains(texto), repeticiones))
+        resultados.append(medir(f'indexada "{texto}"', indexada(texto), repeticiones))
+    return resultados
@@ -0,0 +1,48 @@
+"""
+Planilla de notas: validación y guardado fila a fila frente a
+``CalificacionService.registrar_planilla``.
+"""
+import random
+from decimal import Decimal
+from django.db import transaction
+from ..models import Calificacion
+from ..services.calificacion_service import CalificacionService
+from . import medir
+from .datos import crear_institucion
+
+def run(opciones):
+    datos = crear_institucion(estudiantes_por_grupo=opciones['tamano'])
+    asignacion = datos.asignaciones[0]
+    aleatorio = random.Random(1)
+    registros = [
+        {"estudiante": e.id, "nota": str(Decimal(aleatorio.randint(10, 50)) / 10)}
+        for e in datos.estudiantes
+    ]
+
+    def limpiar():
+        Calificacion.objects.filter(periodo=datos.periodo).delete()
+
+    def fila_a_fila():
+        # Comportamiento previo: validar y guardar cada nota por separado
+        for registro in registros:
+            with transaction.atomic():
+                calificacion, _ = Calificacion.objects.get_or_create(
+                    estudiante_id=registro['estudiante'],
+                    asignatura_id=asignacion.asignatura_id,
+                    periodo=datos.periodo,
+                    defaults={'nota': registro['nota']}
+                )
+                calificacion.nota = registro['nota']
+                calificacion.full_clean()
+                calificacion.save()
+
+    def planilla():
+        CalificacionService.registrar_planilla(asignacion, datos.periodo, registros)
+
+    repeticiones = opciones['repeticiones']
+    return [
+        medir('fila a fila (nuevo)', fila_a_fila, repeticiones, preparar=limpiar),
+        medir('fila a fila (actualizar)', fila_a_fila, repeticiones),
+        medir('planilla (nuevo)', planilla, repeticiones, preparar=limpiar),
+        medir('planilla (actualizar)', planilla, repeticiones),
+    ]
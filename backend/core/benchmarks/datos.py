@@ -0,0 +1,67 @@
+"""
+Construcción rápida de datos de prueba para los benchmarks.
+"""
+import datetime
+from types import SimpleNamespace
+from django.contrib.auth.hashers import make_password
+from ..search import texto_busqueda
+from ..models import Rol, User, Grado, Grupo, Asignatura, Estudiante, DocenteAsignaturaGrupo, Periodo
+
+# Hash precalculado: evita ejecutar PBKDF2 por cada usuario creado
+PASSWORD_BENCHMARK = 'benchmark123'
+
+def crear_institucion(grupos=1, estudiantes_por_grupo=40, prefijo='bench'):
+    """
+    Crea un grado con ``grupos`` grupos, un docente asignado a todos ellos y
+    ``estudiantes_por_grupo`` estudiantes en cada grupo usando bulk_create.
+    """
+    password = make_password(PASSWORD_BENCHMARK)
+    roles = {
+        nombre: Rol.objects.get_or_create(nombre=nombre)[0]
+        for nombre in ('Docente', 'Estudiante')
+    }
+    grado = Grado.objects.create(nombre=f'{prefijo} grado')
+    lista_grupos = Grupo.objects.bulk_create(
+        [Grupo(nombre=f'{i + 1:02d}', grado=grado) for i in range(grupos)]
+    )
+    asignatura = Asignatura.objects.create(nombre=f'{prefijo} asignatura')
+    periodo = Periodo.objects.create(
+        nombre=f'{prefijo} periodo',
+        fecha_inicio=datetime.date(2025, 1, 20),
+        fecha_fin=datetime.date(2025, 4, 11)
+    )
+    docente = User.objects.create(
+        email=f'{prefijo}.docente@sise.test', nombre='Docente', apellido=prefijo,
+        password=password, rol=roles['Docente']
+    )
+    DocenteAsignaturaGrupo.objects.bulk_create([
+        DocenteAsignaturaGrupo(docente=docente, asignatura=asignatura, grupo=grupo)
+        for grupo in lista_grupos
+    ])
+
+    usuarios = [
+        User(
+            email=f'{prefijo}.{g}.{i}@sise.test', nombre=f'Estudiante {i}',
+            apellido=f'{prefijo} {g}', password=password, rol=roles['Estudiante']
+        )
+        for g in range(grupos) for i in range(estudiantes_por_grupo)
+    ]
+    for usuario in usuarios:
+        usuario.busqueda = texto_busqueda(usuario.nombre, usuario.apellido, usuario.email)
+    User.objects.bulk_create(usuarios)
+    # bulk_create no devuelve ids en todos los motores; se releen por email
+    ids = dict(
+        User.objects.filter(email__startswith=f'{prefijo}.', rol=roles['Estudiante'])
+        .values_list('email', 'id')
+    )
+    Estudiante.objects.bulk_create([
+        Estudiante(user_id=ids[usuario.email], grupo=lista_grupos[n // estudiantes_por_grupo])
+        for n, usuario in enumerate(usuarios)
+    ])
+    estudiantes = list(Estudiante.objects.filter(grupo__in=lista_grupos).order_by('id'))
+
+    return SimpleNamespace(
+        roles=roles, grado=grado, grupos=lista_grupos, asignatura=asignatura,
+        periodo=periodo, docente=docente, estudiantes=estudiantes,
+        asignaciones=list(DocenteAsignaturaGrupo.objects.filter(docente=docente).order_by('id'))
+    )
@@ -0,0 +1,79 @@
+"""
+Carga de un docente con ``GRUPOS`` grupos de ``--tamano`` estudiantes:
+recorrido por asignación (lista de cada grupo y nombre de cada estudiante
+por separado, como al combinar los recursos REST) frente a
+``CargaDocenteService.obtener`` y al endpoint /api/docentes/carga/.
+
+El docente tiene una segunda asignatura en ``COMPARTIDOS`` grupos, que
+``obtener`` envía una sola vez. La mitad de los grupos tiene la asistencia
+del día registrada y cada asignación una planeación pendiente.
+"""
+from django.test import Client
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from ..models import Asignatura, Asistencia, DocenteAsignaturaGrupo, Planeacion
+from ..services.carga_docente_service import CargaDocenteService
+from . import medir
+from .datos import crear_institucion
+
+GRUPOS = 15
+# Grupos en los que el docente dicta también la segunda asignatura
+COMPARTIDOS = 5
+
+def run(opciones):
+    datos = crear_institucion(grupos=GRUPOS, estudiantes_por_grupo=opciones['tamano'])
+    docente = datos.docente
+    hoy = timezone.localdate()
+
+    segunda = Asignatura.objects.create(nombre='bench segunda asignatura')
+    DocenteAsignaturaGrupo.objects.bulk_create([
+        DocenteAsignaturaGrupo(docente=docente, asignatura=segunda, grupo=grupo)
+        for grupo in datos.grupos[:COMPARTIDOS]
+    ])
+    con_asistencia = {grupo.id for grupo in datos.grupos[::2]}
+    Asistencia.objects.bulk_create([
+        Asistencia(estudiante=estudiante, fecha=hoy, estado='P', registrada_por=docente)
+        for estudiante in datos.estudiantes if estudiante.grupo_id in con_asistencia
+    ])
+    Planeacion.objects.bulk_create([
+        Planeacion(
+            docente=docente, asignatura_id=asignacion.asignatura_id, grupo_id=asignacion.grupo_id,
+            fecha=hoy, tema=f'Tema {asignacion.id}', objetivos='-', competencias='-',
+            actividades='-', recursos='-', evaluacion='-', estado='B'
+        )
+        for asignacion in DocenteAsignaturaGrupo.objects.filter(docente=docente)
+    ])
+
+    def por_asignacion():
+        # Una lista y una consulta de asistencia por asignación y el usuario
+        # de cada estudiante por separado
+        resultado = []
+        for asignacion in docente.asignaturas_grupos.all():
+            grupo = asignacion.grupo
+            estudiantes = [
+                (estudiante.id, estudiante.user.nombre, estudiante.user.apellido)
+                for estudiante in grupo.estudiantes.all()
+            ]
+            asistencia = dict(
+                Asistencia.objects.filter(estudiante__grupo=grupo, fecha=hoy)
+                .values_list('estudiante_id', 'estado')
+            )
+            resultado.append((asignacion.asignatura.nombre, grupo.nombre, estudiantes, asistencia))
+        resultado.append(list(docente.planeaciones.filter(estado__in=('B', 'E'))))
+        return resultado
+
+    token = Token.objects.create(user=docente)
+    cliente = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def endpoint():
+        respuesta = cliente.get('/api/docentes/carga/')
+        assert respuesta.status_code == 200, respuesta.status_code
+
+    # Calienta el caché de tokens
+    endpoint()
+    repeticiones = opciones['repeticiones']
+    return [
+        medir('por asignación', por_asignacion, repeticiones),
+        medir('servicio', lambda: CargaDocenteService.obtener(docente, hoy), repeticiones),
+        medir('endpoint', endpoint, repeticiones),
+    ]
@@ -0,0 +1,73 @@
+"""
+Exportación de un año de asistencias: tiempo hasta el primer bloque con filas
+de la respuesta y tiempo total, en CSV y XLSX.
+
+``--tamano`` es el número de estudiantes; cada uno tiene 200 días hábiles
+de asistencia.
+"""
+import datetime
+from django.test import RequestFactory
+from rest_framework.test import force_authenticate
+from ..models import Asistencia, User
+from ..views import api_exportar_asistencias
+from . import medir
+from .datos import crear_institucion
+
+DIAS = 200
+
+def hasta_primeras_filas(contenido, formato):
+    """
+    Lee la respuesta hasta el primer bloque con filas de datos. El CSV
+    entrega el BOM y el encabezado antes de consultar la base; el XLSX no
+    entrega nada hasta haber escrito un bloque de filas.
+    """
+    if formato == 'xlsx':
+        next(contenido)
+        return
+    lineas = 0
+    for bloque in contenido:
+        lineas += bloque.count(b'\n')
+        if lineas > 1:
+            return
+
+def run(opciones):
+    datos = crear_institucion(grupos=max(1, opciones['tamano'] // 40), estudiantes_por_grupo=min(40, opciones['tamano']))
+    admin = User.objects.create(
+        email='bench.admin@sise.test', nombre='Admin', apellido='Bench',
+        password=datos.docente.password, rol=datos.docente.rol, is_staff=True
+    )
+    fechas = []
+    fecha = datetime.date(2025, 1, 20)
+    while len(fechas) < DIAS:
+        if fecha.weekday() < 5:
+            fechas.append(fecha)
+        fecha += datetime.timedelta(days=1)
+    Asistencia.objects.bulk_create(
+        [
+            Asistencia(estudiante=estudiante, fecha=dia, estado='PATJ'[n % 4], registrada_por=datos.docente)
+            for dia in fechas for n, estudiante in enumerate(datos.estudiantes)
+        ],
+        batch_size=5000
+    )
+
+    fabrica = RequestFactory()
+    parametros = {'desde': fechas[0].isoformat(), 'hasta': fechas[-1].isoformat()}
+
+    def exportar(formato, completo):
+        def pedir():
+            peticion = fabrica.get('/api/exportar/asistencias/', {**parametros, 'formato': formato})
+            force_authenticate(peticion, user=admin)
+            contenido = iter(api_exportar_asistencias(peticion).streaming_content)
+            hasta_primeras_filas(contenido, formato)
+            if completo:
+                for _ in contenido:
+                    pass
+        return pedir
+
+    repeticiones = opciones['repeticiones']
+    return [
+        medir('csv primer bloque', exportar('csv', False), repeticiones),
+        medir('csv completo', exportar('csv', True), repeticiones),
+        medir('xlsx primer bloque', exportar('xlsx', False), repeticiones),
+        medir('xlsx completo', exportar('xlsx', True), repeticiones),
+    ]
@@ -0,0 +1,78 @@
+"""
+Latencia de /api/login/ según cómo se escriben los eventos de registro.
+
+Compara el registro desactivado, un StreamHandler síncrono (equivalente a
+los print que había antes en cada petición) y el NonBlockingHandler. El
+destino simula una salida lenta (una tubería o un recolector de logs
+congestionado) con una espera fija por escritura. El hash de contraseñas se
+cambia por MD5 para que la medición refleje el costo de la petición y no el
+de PBKDF2.
+"""
+import io
+import logging
+import time
+from django.contrib.auth.hashers import make_password
+from django.test import RequestFactory, override_settings
+from ..logs import JsonFormatter, NonBlockingHandler, RedactingFilter
+from ..models import Rol, User
+from ..views import api_login
+from . import medir
+
+# Espera por escritura del destino simulado, en segundos
+LATENCIA_ESCRITURA = 0.0005
+
+class SalidaLenta(io.StringIO):
+    def write(self, texto):
+        time.sleep(LATENCIA_ESCRITURA)
+        return super().write(texto)
+
+def run(opciones):
+    with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+        return _run(opciones)
+
+def _run(opciones):
+    rol, _ = Rol.objects.get_or_create(nombre='Administrador')
+    User.objects.create(
+        email='bench.login@sise.test', nombre='Bench', apellido='Login',
+        password=make_password('benchmark123'), rol=rol
+    )
+    fabrica = RequestFactory()
+    logger = logging.getLogger('sise')
+    nivel, manejadores, propagar = logger.level, logger.handlers[:], logger.propagate
+    archivo = SalidaLenta()
+
+    def login():
+        # Se repite el login varias veces por medición para reducir el ruido
+        for _ in range(opciones['tamano']):
+            peticion = fabrica.post(
+                '/api/login/', {'email': 'bench.login@sise.test', 'password': 'benchmark123'},
+                content_type='application/json'
+            )
+            api_login(peticion)
+
+    def con_manejador(manejador, nivel_log):
+        logger.handlers = [manejador] if manejador else []
+        logger.setLevel(nivel_log)
+        logger.propagate = False
+        if manejador:
+            manejador.setFormatter(JsonFormatter())
+            manejador.addFilter(RedactingFilter())
+
+    resultados = []
+    try:
+        for nombre, fabrica_manejador, nivel_log in [
+            ('sin registro', lambda: None, logging.CRITICAL),
+            ('síncrono (DEBUG)', lambda: logging.StreamHandler(archivo), logging.DEBUG),
+            ('no bloqueante (DEBUG)', lambda: NonBlockingHandler(archivo), logging.DEBUG),
+            ('no bloqueante (INFO)', lambda: NonBlockingHandler(archivo), logging.INFO),
+        ]:
+            manejador = fabrica_manejador()
+            con_manejador(manejador, nivel_log)
+            resultados.append(medir(nombre, login, opciones['repeticiones']))
+            if manejador:
+                manejador.close()
+    finally:
+        logger.handlers, logger.propagate = manejadores, propagar
+        logger.setLevel(nivel)
+        archivo.close()
+    return resultados
@@ -0,0 +1,78 @@
+"""
+Revisión de ``--tamano`` planeaciones (500 en la línea base): envío y
+aprobación guardando cada planeación por separado frente a
+``PlaneacionService.transicionar`` y al endpoint /api/planeaciones/transiciones/.
+"""
+import datetime
+from django.db import transaction
+from django.test import Client
+from rest_framework.authtoken.models import Token
+from .. import roles
+from ..models import Planeacion, Rol, TransicionPlaneacion, User
+from ..services.planeacion_service import PlaneacionService
+from . import medir
+from .datos import crear_institucion
+
+def run(opciones):
+    datos = crear_institucion(grupos=1, estudiantes_por_grupo=1)
+    coordinador = User.objects.create(
+        email='bench.coordinador@sise.test', nombre='Coordinador', apellido='Bench', password='!',
+        rol=Rol.objects.get_or_create(nombre=roles.COORDINADOR)[0]
+    )
+    total = opciones['tamano']
+    Planeacion.objects.bulk_create([
+        Planeacion(
+            docente=datos.docente, asignatura=datos.asignatura, grupo=datos.grupos[0],
+            fecha=datetime.date(2025, 2, 3) + datetime.timedelta(days=n % 60), tema=f'Tema {n}',
+            objetivos='-', competencias='-', actividades='-', recursos='-', evaluacion='-'
+        )
+        for n in range(total)
+    ])
+    ids = list(Planeacion.objects.filter(docente=datos.docente).order_by('id').values_list('id', flat=True))
+
+    def reiniciar(estado):
+        def preparar():
+            Planeacion.objects.filter(pk__in=ids).update(estado=estado)
+            TransicionPlaneacion.objects.filter(planeacion_id__in=ids).delete()
+        return preparar
+
+    def fila_a_fila(estado_nuevo, usuario):
+        # Comportamiento previo: leer, validar y guardar cada planeación
+        def ejecutar():
+            with transaction.atomic():
+                for planeacion_id in ids:
+                    planeacion = Planeacion.objects.select_for_update().get(pk=planeacion_id)
+                    estado_anterior = planeacion.estado
+                    if estado_nuevo in PlaneacionService.TRANSICIONES[estado_anterior]:
+                        planeacion.estado = estado_nuevo
+                        planeacion.save()
+                        TransicionPlaneacion.objects.create(
+                            planeacion=planeacion, estado_anterior=estado_anterior,
+                            estado_nuevo=estado_nuevo, usuario=usuario
+                        )
+        return ejecutar
+
+    def masivo(estado_nuevo, usuario):
+        transiciones = [{"id": planeacion_id, "estado": estado_nuevo} for planeacion_id in ids]
+
+        def ejecutar():
+            resultado = PlaneacionService.transicionar(transiciones, usuario)
+            assert resultado['aplicadas'] == total, resultado['aplicadas']
+        return ejecutar
+
+    token = Token.objects.create(user=coordinador)
+    cliente = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+    cuerpo = {"transiciones": [{"id": planeacion_id, "estado": 'A'} for planeacion_id in ids]}
+
+    def endpoint():
+        respuesta = cliente.post('/api/planeaciones/transiciones/', cuerpo, content_type='application/json')
+        assert respuesta.status_code == 200 and respuesta.json()['aplicadas'] == total, respuesta.status_code
+
+    repeticiones = opciones['repeticiones']
+    return [
+        medir('enviar fila a fila', fila_a_fila('E', datos.docente), repeticiones, preparar=reiniciar('B')),
+        medir('enviar masivo', masivo('E', datos.docente), repeticiones, preparar=reiniciar('B')),
+        medir('aprobar fila a fila', fila_a_fila('A', coordinador), repeticiones, preparar=reiniciar('E')),
+        medir('aprobar masivo', masivo('A', coordinador), repeticiones, preparar=reiniciar('E')),
+        medir('aprobar endpoint', endpoint, repeticiones, preparar=reiniciar('E')),
+    ]
@@ -0,0 +1,63 @@
+"""
+Listado de /api/usuarios/ a distintas profundidades: paginación por número
+de página (COUNT + OFFSET) frente a paginación por cursor.
+
+``--tamano`` es el número de usuarios creados.
+"""
+import base64
+import json
+from django.contrib.auth.hashers import make_password
+from django.test import RequestFactory
+from rest_framework.test import force_authenticate
+from ..models import Rol, User
+from ..search import texto_busqueda
+from ..views import UserViewSet
+from . import medir
+
+def run(opciones):
+    total = opciones['tamano']
+    password = make_password('benchmark123')
+    rol, _ = Rol.objects.get_or_create(nombre='Estudiante')
+    admin_rol, _ = Rol.objects.get_or_create(nombre='Administrador')
+    admin = User.objects.create(
+        email='bench.admin@sise.test', nombre='Admin', apellido='Bench',
+        password=password, rol=admin_rol, is_staff=True
+    )
+    usuarios = [
+        User(
+            email=f'bench.usuario.{i}@sise.test', nombre=f'Nombre {i % 97}',
+            apellido=f'Apellido {i % 1013:04d}', password=password, rol=rol
+        )
+        for i in range(total)
+    ]
+    for usuario in usuarios:
+        usuario.busqueda = texto_busqueda(usuario.nombre, usuario.apellido, usuario.email)
+    User.objects.bulk_create(usuarios, batch_size=1000)
+
+    fabrica = RequestFactory()
+    vista = UserViewSet.as_view({'get': 'list'})
+    ordenados = User.objects.order_by('apellido', 'nombre', 'id')
+
+    def listar(parametros):
+        def pedir():
+            peticion = fabrica.get('/api/usuarios/', parametros)
+            force_authenticate(peticion, user=admin)
+            vista(peticion).render()
+        return pedir
+
+    def cursor_en(posicion):
+        fila = ordenados.values_list('apellido', 'nombre', 'id')[posicion]
+        datos = json.dumps({'v': list(fila), 'a': False})
+        return base64.urlsafe_b64encode(datos.encode()).decode()
+
+    ultima = max(1, total // 10)
+    repeticiones = opciones['repeticiones']
+    return [
+        medir('página 1', listar({'page': 1}), repeticiones),
+        medir(f'página {ultima // 2}', listar({'page': ultima // 2}), repeticiones),
+        medir(f'página {ultima}', listar({'page': ultima}), repeticiones),
+        medir('cursor inicio', listar({}), repeticiones),
+        medir('cursor mitad', listar({'cursor': cursor_en(total // 2)}), repeticiones),
+        medir('cursor final', listar({'cursor': cursor_en(total - 11)}), repeticiones),
+        medir('cursor exportación (1000)', listar({'page_size': 1000}), repeticiones),
+    ]
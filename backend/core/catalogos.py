@@ -0,0 +1,125 @@
+"""
+Caché de respuestas de los catálogos (roles, grados, grupos, asignaturas,
+períodos y tipos de observación) con ETag y GET condicional.
+
+Cada modelo de catálogo tiene un número de versión en el caché de Django que
+las señales post_save/post_delete incrementan (core/signals.py). El ETag de
+una respuesta se calcula con las versiones de los modelos de los que depende
+y la URL pedida, sin consultar la base: si el cliente ya lo tiene se responde
+304 y si no, la respuesta sale del caché mientras las versiones no cambien.
+
+La versión inicial se toma del reloj, así un contador que el caché descarta
+nunca vuelve a un valor ya usado. Los contadores vencen a los
+``SISE_CATALOGOS_TTL`` segundos de creados: con el caché por defecto
+(LocMemCache) son por proceso, y al vencer el proceso estrena una versión,
+con lo que cambia el ETag y la respuesta se vuelve a leer de la base. Así un
+cambio hecho en otro proceso se ve, como mucho, a ese plazo; con un caché
+compartido (Redis, Memcached) se ve de inmediato.
+"""
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+def _clave_version(modelo):
+    return f'sise:catalogo:version:{modelo._meta.label_lower}'
+
+def versiones_de(claves, ttl=None):
+    """
+    Valor actual de cada contador de versión (claves del caché), en el mismo
+    orden. Los contadores nuevos vencen a los ``ttl`` segundos (por defecto
+    SISE_CATALOGOS_TTL); incrementarlos no cambia el vencimiento.
+    """
+    actuales = cache.get_many(claves)
+    for clave in claves:
+        if clave not in actuales:
+            cache.add(clave, time.time_ns(), timeout=ttl or settings.SISE_CATALOGOS_TTL)
+            actuales[clave] = cache.get(clave, time.time_ns())
+    return [actuales[clave] for clave in claves]
+
+def incrementar(claves, ttl=None):
+    for clave in claves:
+        try:
+            cache.incr(clave)
+        except ValueError:
+            cache.set(clave, time.time_ns(), timeout=ttl or settings.SISE_CATALOGOS_TTL)
+
+def versiones(modelos):
+    """
+    Versión actual de cada modelo, en el mismo orden
+    """
+    return versiones_de([_clave_version(modelo) for modelo in modelos])
+
+def _incrementar(modelos):
+    incrementar([_clave_version(modelo) for modelo in modelos])
+
+def invalidar(*modelos):
+    """
+    Invalida las respuestas de los catálogos que dependen de ``modelos``.
+
+    Se incrementa la versión de inmediato y otra vez al confirmar la
+    transacción, por si otra petición guardó en el caché los datos anteriores
+    al cambio antes del commit.
+    """
+    _incrementar(modelos)
+    transaction.on_commit(lambda: _incrementar(modelos))
+
+class CatalogoCacheMixin:
+    """
+    Para ViewSets de catálogos: list y retrieve responden con ETag, admiten
+    If-None-Match (304) y guardan la respuesta en el caché.
+
+    ``catalogo_modelos`` son los modelos cuyas modificaciones cambian la
+    respuesta (por defecto, el del queryset). Solo se guarda la respuesta
+    JSON: la API navegable incluye datos del usuario.
+    """
+    catalogo_modelos = ()
+
+    def list(self, request, *args, **kwargs):
+        base = super().list
+        return self._respuesta_catalogo(request, lambda: base(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        base = super().retrieve
+        return self._respuesta_catalogo(request, lambda: base(request, *args, **kwargs))
+
+    def _huella(self, request):
+        modelos = self.catalogo_modelos or (self.queryset.model,)
+        partes = [
+            self.basename, request.get_host(), request.get_full_path(), request.accepted_media_type,
+            *map(str, versiones(modelos))
+        ]
+        return hashlib.sha1('|'.join(partes).encode()).hexdigest()
+
+    def _respuesta_catalogo(self, request, generar):
+        if request.accepted_renderer.format != 'json':
+            return generar()
+
+        huella = self._huella(request)
+        etag = f'"{huella}"'
+        conocidas = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in conocidas:
+            respuesta = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            clave = f'sise:catalogo:respuesta:{huella}'
+            datos = cache.get(clave)
+            if datos is not None:
+                respuesta = Response(datos)
+            else:
+                respuesta = generar()
+                if respuesta.status_code != status.HTTP_200_OK:
+                    return respuesta
+                cache.set(clave, respuesta.data, settings.SISE_CATALOGOS_TTL)
+            # '*' solo vale si el recurso existe: un 404 se responde como tal
+            if '*' in conocidas:
+                respuesta = Response(status=status.HTTP_304_NOT_MODIFIED)
+
+        respuesta['ETag'] = etag
+        respuesta['Cache-Control'] = f'private, max-age={settings.SISE_CATALOGOS_MAX_AGE}, must-revalidate'
+        patch_vary_headers(respuesta, ['Accept'])
+        return respuesta
@@ -0,0 +1,171 @@
+"""
+Exportaciones en CSV y XLSX que se transmiten fila a fila.
+
+Las filas llegan de un iterador (normalmente ``QuerySet.iterator``) y se
+escriben en la respuesta a medida que se leen, así que la memoria usada no
+depende del número de filas. El XLSX se genera con la librería estándar:
+un ZIP escrito en modo streaming con una hoja de cadenas en línea.
+"""
+import csv
+import datetime
+import zipfile
+from decimal import Decimal
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Filas que se acumulan antes de entregar un bloque al servidor
+FILAS_POR_BLOQUE = 500
+
+class _Eco:
+    """
+    Objeto con write() que devuelve lo escrito, para usar csv.writer
+    sin búfer (patrón de la documentación de Django)
+    """
+    def write(self, valor):
+        return valor
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime.datetime):
+        return timezone.localtime(valor).strftime('%Y-%m-%d %H:%M') if timezone.is_aware(valor) else valor.isoformat()
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    return str(valor)
+
+def filas_csv(encabezados, filas):
+    escritor = csv.writer(_Eco())
+    # BOM para que Excel reconozca el UTF-8 (tildes y eñes)
+    yield '\ufeff' + escritor.writerow(encabezados)
+    bloque = []
+    for fila in filas:
+        bloque.append(escritor.writerow([_texto(valor) for valor in fila]))
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+class _Salida:
+    """
+    Destino no posicionable del ZIP: acumula los bytes hasta que se leen
+    """
+    def __init__(self):
+        self.partes = []
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def leer(self):
+        datos = b''.join(self.partes)
+        self.partes = []
+        return datos
+
+# Escape XML y eliminación de los caracteres de control no permitidos en
+# una sola pasada (str.translate)
+_ESCAPE_XML = {
+    **{codigo: None for codigo in range(0x20) if codigo not in (0x09, 0x0a, 0x0d)},
+    ord('&'): '&amp;', ord('<'): '&lt;', ord('>'): '&gt;',
+}
+
+def _celda(valor):
+    if type(valor) is not str:
+        if isinstance(valor, (int, float, Decimal)) and not isinstance(valor, bool):
+            return f'<c><v>{valor}</v></c>'
+        valor = _texto(valor)
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{valor.translate(_ESCAPE_XML)}</t></is></c>'
+
+def _fila_xml(valores):
+    return '<row>' + ''.join([_celda(valor) for valor in valores]) + '</row>'
+
+_XLSX_ESTATICOS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Datos" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+def filas_xlsx(encabezados, filas):
+    salida = _Salida()
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as archivo:
+        for nombre, contenido in _XLSX_ESTATICOS.items():
+            archivo.writestr(nombre, contenido)
+        with archivo.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as hoja:
+            hoja.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            bloque = [_fila_xml(encabezados)]
+            for fila in filas:
+                bloque.append(_fila_xml(fila))
+                if len(bloque) >= FILAS_POR_BLOQUE:
+                    # Una sola escritura por bloque: el compresor trabaja mejor
+                    # con trozos grandes que con una llamada por fila
+                    hoja.write(''.join(bloque).encode())
+                    bloque = []
+                    datos = salida.leer()
+                    if datos:
+                        yield datos
+            bloque.append('</sheetData></worksheet>')
+            hoja.write(''.join(bloque).encode())
+    yield salida.leer()
+
+def nombre_exportacion(nombre, formato):
+    return f'{nombre}-{timezone.localdate().isoformat()}.{formato}'
+
+def respuesta_exportacion(nombre, formato, encabezados, filas):
+    """
+    StreamingHttpResponse con las filas en el formato pedido ('csv' o 'xlsx')
+    """
+    generador = filas_xlsx if formato == 'xlsx' else filas_csv
+    respuesta = StreamingHttpResponse(generador(encabezados, filas), content_type=FORMATOS[formato])
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre_exportacion(nombre, formato)}"'
+    return respuesta
+
+def escribir_exportacion(archivo, formato, encabezados, filas):
+    """
+    Escribe la exportación en un archivo binario abierto (exportaciones en
+    segundo plano, ver core/trabajos.py)
+    """
+    generador = filas_xlsx if formato == 'xlsx' else filas_csv
+    for bloque in generador(encabezados, filas):
+        archivo.write(bloque.encode('utf-8') if isinstance(bloque, str) else bloque)
@@ -0,0 +1,289 @@
+"""
+Generador de una institución sintética para pruebas de carga y de escala.
+
+A partir de una semilla produce siempre los mismos datos: grados, grupos,
+asignaturas, los cuatro períodos del año, docentes con sus asignaciones,
+estudiantes, un año completo de asistencia, calificaciones, observaciones y
+planeaciones. Todo se inserta en lotes y los usuarios comparten un hash de
+contraseña calculado una sola vez. Las dos tablas más grandes (asistencia y
+calificaciones, cerca de un millón de filas para 5.000 estudiantes) se
+insertan como tuplas con executemany: crear una instancia de modelo por fila
+para bulk_create triplicaba el tiempo total.
+"""
+import datetime
+import math
+import random
+import time
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from . import catalogos, roles
+from .models import (
+    User, Grado, Grupo, Asignatura, Estudiante, DocenteAsignaturaGrupo, Periodo,
+    Asistencia, Calificacion, TipoObservacion, Observador, Planeacion
+)
+from .search import texto_busqueda
+from .services.resumen_service import ResumenService
+from .services.resumen_asistencia_service import ResumenAsistenciaService
+
+GRADOS = [
+    'Primero', 'Segundo', 'Tercero', 'Cuarto', 'Quinto', 'Sexto',
+    'Séptimo', 'Octavo', 'Noveno', 'Décimo', 'Undécimo'
+]
+ASIGNATURAS = [
+    'Matemáticas', 'Lengua Castellana', 'Ciencias Naturales', 'Ciencias Sociales', 'Inglés',
+    'Educación Física', 'Educación Artística', 'Tecnología e Informática', 'Ética y Valores',
+    'Educación Religiosa'
+]
+TIPOS_OBSERVACION = ['Académica', 'Convivencia', 'Felicitación', 'Llamado de atención']
+NOMBRES = [
+    'Santiago', 'Valentina', 'Sebastián', 'Mariana', 'Matías', 'Isabella', 'Samuel', 'Sofía',
+    'Nicolás', 'Gabriela', 'Alejandro', 'Daniela', 'Juan José', 'Salomé', 'David', 'Luciana',
+    'Emmanuel', 'María José', 'Tomás', 'Antonella', 'Martín', 'Sara', 'Jerónimo', 'Manuela',
+    'Andrés', 'Camila', 'Felipe', 'Laura', 'Esteban', 'Ana Sofía'
+]
+APELLIDOS = [
+    'Rodríguez', 'Gómez', 'González', 'Martínez', 'García', 'López', 'Hernández', 'Sánchez',
+    'Ramírez', 'Pérez', 'Díaz', 'Muñoz', 'Rojas', 'Moreno', 'Jiménez', 'Vargas', 'Castro',
+    'Gutiérrez', 'Álvarez', 'Ruiz', 'Ortiz', 'Suárez', 'Torres', 'Quintero', 'Peña', 'Zapata',
+    'Cárdenas', 'Osorio', 'Mejía', 'Restrepo'
+]
+# Probabilidad acumulada de cada estado de asistencia
+ESTADOS_ASISTENCIA = [('P', 0.90), ('A', 0.95), ('T', 0.98), ('J', 1.0)]
+# Mes y día de inicio y fin de los cuatro períodos del calendario A
+PERIODOS = [((1, 27), (4, 4)), ((4, 21), (6, 13)), ((7, 7), (9, 12)), ((9, 22), (11, 28))]
+
+class GeneradorInstitucion:
+    """
+    ``progreso(mensaje)`` recibe un aviso al terminar cada etapa
+    """
+    BATCH_SIZE = 5000
+
+    def __init__(self, estudiantes=5000, por_grupo=35, anio=2025, semilla=42,
+                 password='sise12345', dominio='sintetico.sise.test', resumenes=True, progreso=None):
+        self.estudiantes = estudiantes
+        self.por_grupo = por_grupo
+        self.anio = anio
+        self.password = password
+        self.dominio = dominio
+        self.resumenes = resumenes
+        self.rng = random.Random(semilla)
+        self.progreso = progreso or (lambda mensaje: None)
+        self.totales = {}
+
+    def _etapa(self, nombre, funcion):
+        inicio = time.perf_counter()
+        total = funcion()
+        self.totales[nombre] = total
+        self.progreso(f'{nombre}: {total} en {time.perf_counter() - inicio:.1f} s')
+
+    def _insertar(self, modelo, filas):
+        """
+        Inserta un iterable de instancias por lotes sin materializarlo completo
+        """
+        total = 0
+        lote = []
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) >= self.BATCH_SIZE:
+                modelo.objects.bulk_create(lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            modelo.objects.bulk_create(lote)
+            total += len(lote)
+        return total
+
+    def _insertar_tuplas(self, modelo, campos, filas):
+        """
+        INSERT con executemany de tuplas en el orden de ``campos``; los valores
+        ya deben estar adaptados a la base (ver connection.ops.adapt_*)
+        """
+        qn = connection.ops.quote_name
+        columnas = ', '.join(qn(modelo._meta.get_field(campo).column) for campo in campos)
+        marcadores = ', '.join(['%s'] * len(campos))
+        sql = f'INSERT INTO {qn(modelo._meta.db_table)} ({columnas}) VALUES ({marcadores})'
+        total = 0
+        lote = []
+        with connection.cursor() as cursor:
+            for fila in filas:
+                lote.append(fila)
+                if len(lote) >= self.BATCH_SIZE:
+                    cursor.executemany(sql, lote)
+                    total += len(lote)
+                    lote = []
+            if lote:
+                cursor.executemany(sql, lote)
+                total += len(lote)
+        return total
+
+    def _usuarios(self, rol_id, prefijo, cantidad):
+        usuarios = []
+        for n in range(cantidad):
+            nombre = self.rng.choice(NOMBRES)
+            apellido = f'{self.rng.choice(APELLIDOS)} {self.rng.choice(APELLIDOS)}'
+            email = f'{prefijo}{n + 1:05d}@{self.dominio}'
+            usuarios.append(User(
+                email=email, nombre=nombre, apellido=apellido, password=self.hash,
+                rol_id=rol_id, busqueda=texto_busqueda(nombre, apellido, email)
+            ))
+        self._insertar(User, usuarios)
+        return list(User.objects.filter(email__endswith=f'@{self.dominio}', email__startswith=prefijo).order_by('email'))
+
+    def generar(self):
+        inicio = time.perf_counter()
+        # Un solo hash para todos los usuarios: PBKDF2 por usuario tardaría horas
+        self.hash = make_password(self.password)
+        with transaction.atomic():
+            self._etapa('estructura', self._estructura)
+            self._etapa('docentes', self._docentes)
+            self._etapa('estudiantes', self._estudiantes)
+            self._etapa('asistencias', self._asistencias)
+            self._etapa('calificaciones', self._calificaciones)
+            self._etapa('observaciones', self._observaciones)
+            self._etapa('planeaciones', self._planeaciones)
+            if self.resumenes:
+                self._etapa('resúmenes', self._resumenes)
+        self.totales['segundos'] = round(time.perf_counter() - inicio, 1)
+        return self.totales
+
+    def _estructura(self):
+        total_grupos = math.ceil(self.estudiantes / self.por_grupo)
+        self.grados = Grado.objects.bulk_create([Grado(nombre=nombre) for nombre in GRADOS])
+        # Los grupos se reparten entre los grados; los primeros reciben el sobrante
+        grupos = []
+        for indice, grado in enumerate(self.grados):
+            cantidad = total_grupos // len(self.grados) + (1 if indice < total_grupos % len(self.grados) else 0)
+            grupos.extend(Grupo(nombre=f'{indice + 1:02d}{letra + 1:02d}', grado=grado) for letra in range(cantidad))
+        self.grupos = Grupo.objects.bulk_create(grupos)
+        self.asignaturas = Asignatura.objects.bulk_create([Asignatura(nombre=nombre) for nombre in ASIGNATURAS])
+        self.tipos = TipoObservacion.objects.bulk_create([TipoObservacion(nombre=nombre) for nombre in TIPOS_OBSERVACION])
+        self.periodos = Periodo.objects.bulk_create([
+            Periodo(
+                nombre=f'Período {numero} - {self.anio}',
+                fecha_inicio=datetime.date(self.anio, *inicio),
+                fecha_fin=datetime.date(self.anio, *fin)
+            )
+            for numero, (inicio, fin) in enumerate(PERIODOS, start=1)
+        ])
+        # bulk_create no emite las señales que invalidan los catálogos
+        catalogos.invalidar(Grado, Grupo, Asignatura, TipoObservacion, Periodo)
+        # Días hábiles de cada período
+        self.dias = {
+            periodo.id: [
+                periodo.fecha_inicio + datetime.timedelta(days=n)
+                for n in range((periodo.fecha_fin - periodo.fecha_inicio).days + 1)
+                if (periodo.fecha_inicio + datetime.timedelta(days=n)).weekday() < 5
+            ]
+            for periodo in self.periodos
+        }
+        return len(self.grados) + len(self.grupos) + len(self.asignaturas) + len(self.periodos)
+
+    def _docentes(self):
+        # Cada docente dicta una asignatura en hasta seis grupos
+        grupos_por_docente = 6
+        por_asignatura = math.ceil(len(self.grupos) / grupos_por_docente)
+        docentes = self._usuarios(
+            roles.registro.asegurar(roles.DOCENTE), 'docente', por_asignatura * len(self.asignaturas)
+        )
+        asignaciones = []
+        self.director = {}
+        for a, asignatura in enumerate(self.asignaturas):
+            for g, grupo in enumerate(self.grupos):
+                docente = docentes[a * por_asignatura + g // grupos_por_docente]
+                asignaciones.append(DocenteAsignaturaGrupo(docente=docente, asignatura=asignatura, grupo=grupo))
+                # El docente de la primera asignatura registra la asistencia del grupo
+                self.director.setdefault(grupo.id, docente.id)
+        self.asignaciones = DocenteAsignaturaGrupo.objects.bulk_create(asignaciones, batch_size=self.BATCH_SIZE)
+        return len(docentes)
+
+    def _estudiantes(self):
+        usuarios = self._usuarios(roles.registro.asegurar(roles.ESTUDIANTE), 'estudiante', self.estudiantes)
+        self._insertar(Estudiante, (
+            Estudiante(user_id=usuario.id, grupo=self.grupos[n // self.por_grupo])
+            for n, usuario in enumerate(usuarios)
+        ))
+        self.lista_estudiantes = list(
+            Estudiante.objects.filter(user__email__endswith=f'@{self.dominio}').order_by('user__email')
+            .values_list('id', 'grupo_id')
+        )
+        # Disposición de cada estudiante: define su asistencia y su rendimiento
+        self.perfil = {estudiante_id: self.rng.gauss(0, 1) for estudiante_id, _ in self.lista_estudiantes}
+        return len(self.lista_estudiantes)
+
+    def _estado(self, perfil):
+        valor = self.rng.random() * (1.3 if perfil < -1 else 1.0)
+        for estado, limite in ESTADOS_ASISTENCIA:
+            if valor < limite:
+                return estado
+        return 'A'
+
+    def _asistencias(self):
+        def filas():
+            for periodo in self.periodos:
+                for fecha in self.dias[periodo.id]:
+                    fecha = connection.ops.adapt_datefield_value(fecha)
+                    for estudiante_id, grupo_id in self.lista_estudiantes:
+                        estado = self._estado(self.perfil[estudiante_id])
+                        yield (
+                            estudiante_id, fecha, estado, 'Excusa médica' if estado == 'J' else None,
+                            self.director[grupo_id]
+                        )
+        campos = ['estudiante', 'fecha', 'estado', 'observaciones', 'registrada_por']
+        return self._insertar_tuplas(Asistencia, campos, filas())
+
+    def _calificaciones(self):
+        # Notas posibles (1.0 a 5.0) ya adaptadas a la base
+        notas = {
+            decimas: connection.ops.adapt_decimalfield_value(Decimal(decimas) / 10, 3, 1)
+            for decimas in range(10, 51)
+        }
+
+        def filas():
+            for periodo in self.periodos:
+                for estudiante_id, _ in self.lista_estudiantes:
+                    base = 3.7 + 0.5 * self.perfil[estudiante_id]
+                    for asignatura in self.asignaturas:
+                        nota = min(5.0, max(1.0, self.rng.gauss(base, 0.5)))
+                        yield (estudiante_id, asignatura.id, periodo.id, notas[round(nota * 10)], None)
+        campos = ['estudiante', 'asignatura', 'periodo', 'nota', 'observaciones']
+        return self._insertar_tuplas(Calificacion, campos, filas())
+
+    def _observaciones(self):
+        def filas():
+            for periodo in self.periodos:
+                dias = self.dias[periodo.id]
+                for estudiante_id, grupo_id in self.lista_estudiantes:
+                    # En promedio una observación por estudiante y período
+                    for _ in range(self.rng.choice((0, 0, 1, 1, 1, 2, 2))):
+                        tipo = self.rng.choice(self.tipos)
+                        yield Observador(
+                            estudiante_id=estudiante_id, tipo_observacion=tipo,
+                            registrada_por_id=self.director[grupo_id], fecha=self.rng.choice(dias),
+                            descripcion=f'Observación {tipo.nombre.lower()} del {periodo.nombre.lower()}'
+                        )
+        return self._insertar(Observador, filas())
+
+    def _planeaciones(self):
+        def filas():
+            # Una planeación por asignación cada dos semanas; las más recientes
+            # quedan enviadas o en borrador
+            semanas = [dia for dias in self.dias.values() for dia in dias if dia.weekday() == 0][::2]
+            for asignacion in self.asignaciones:
+                for numero, fecha in enumerate(semanas, start=1):
+                    restante = len(semanas) - numero
+                    estado = 'A' if restante > 2 else self.rng.choice('BEA')
+                    yield Planeacion(
+                        docente_id=asignacion.docente_id, asignatura_id=asignacion.asignatura_id,
+                        grupo_id=asignacion.grupo_id, fecha=fecha, tema=f'Unidad {numero}',
+                        objetivos='Objetivos de la unidad', competencias='Competencias del área',
+                        actividades='Actividades de clase', recursos='Guía y tablero',
+                        evaluacion='Evaluación formativa', estado=estado
+                    )
+        return self._insertar(Planeacion, filas())
+
+    def _resumenes(self):
+        # bulk_create no envía señales: los resúmenes se reconstruyen al final
+        total = ResumenService.reconstruir(self.periodos)
+        ResumenAsistenciaService.reconstruir()
+        return total
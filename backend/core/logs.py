@@ -0,0 +1,137 @@
+"""
+Registro estructurado de eventos de la aplicación.
+
+Los eventos se emiten con ``evento(logger, 'nombre', **campos)`` y se
+escriben como una línea JSON por evento. El manejador ``NonBlockingHandler``
+solo encola el registro: la escritura la hace un hilo aparte
+(QueueListener), de modo que los hilos de las peticiones nunca esperan por
+E/S. La configuración vive en ``LOGGING`` (sise/settings.py).
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+REDACTADO = '[REDACTADO]'
+
+# Atributos estándar de LogRecord que no forman parte de los campos del evento
+_ATRIBUTOS_RECORD = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'evento', 'campos'}
+
+def get_logger(nombre):
+    return logging.getLogger(f'sise.{nombre}')
+
+def evento(logger, nombre, nivel=logging.INFO, exc_info=None, **campos):
+    """
+    Emite un evento estructurado. Si el nivel no está habilitado no se
+    construye nada, por lo que los eventos de depuración no cuestan.
+    """
+    if logger.isEnabledFor(nivel):
+        logger.log(nivel, nombre, exc_info=exc_info, extra={'evento': nombre, 'campos': campos})
+
+def redactar(valor, patron):
+    """
+    Reemplaza recursivamente los valores cuyas claves parecen credenciales,
+    incluidos los números (un PIN numérico es una contraseña válida). Solo
+    se conservan los booleanos y None (p. ej. ``token_nuevo=True``).
+    """
+    if isinstance(valor, dict):
+        return {
+            clave: (
+                REDACTADO
+                if patron.search(str(clave)) and not isinstance(dato, (bool, type(None)))
+                else redactar(dato, patron)
+            )
+            for clave, dato in valor.items()
+        }
+    if isinstance(valor, (list, tuple)):
+        return [redactar(dato, patron) for dato in valor]
+    return valor
+
+class RedactingFilter(logging.Filter):
+    """
+    Oculta contraseñas, tokens, cookies y cabeceras de autorización
+    """
+    def __init__(self, claves=('password', 'token', 'authorization', 'cookie', 'secret', 'csrf')):
+        super().__init__()
+        self.patron = re.compile('|'.join(re.escape(clave) for clave in claves), re.IGNORECASE)
+
+    def filter(self, record):
+        campos = getattr(record, 'campos', None)
+        if campos:
+            record.campos = redactar(campos, self.patron)
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Deja pasar solo una fracción de los eventos de alto volumen.
+    ``tasas`` asocia el nombre del evento con la fracción a conservar (0 a 1).
+    Las advertencias y errores nunca se descartan.
+    """
+    def __init__(self, tasas=None):
+        super().__init__()
+        self.tasas = tasas or {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        tasa = self.tasas.get(getattr(record, 'evento', None))
+        if tasa is None:
+            return True
+        if tasa < 1:
+            record.muestreo = tasa
+        return random.random() < tasa
+
+class JsonFormatter(logging.Formatter):
+    """
+    Una línea JSON por evento con los campos del evento al primer nivel
+    """
+    def format(self, record):
+        datos = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'evento': getattr(record, 'evento', None) or record.getMessage(),
+        }
+        datos.update(getattr(record, 'campos', None) or {})
+        # Campos añadidos con extra= por código que no usa evento()
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and clave not in datos:
+                datos[clave] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, default=str, ensure_ascii=False)
+
+class NonBlockingHandler(QueueHandler):
+    """
+    Encola los registros ya formateados y los escribe desde un hilo aparte.
+    Si la cola está llena el registro se descarta y se cuenta en
+    ``descartados`` en lugar de bloquear la petición.
+    """
+    def __init__(self, stream=None, tamano_cola=10000):
+        super().__init__(queue.Queue(tamano_cola))
+        destino = logging.StreamHandler(stream or sys.stderr)
+        destino.setFormatter(logging.Formatter('%(message)s'))
+        self.descartados = 0
+        self.listener = QueueListener(self.queue, destino)
+        self.listener.start()
+        atexit.register(self.detener)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+    def detener(self):
+        # Vacía la cola y detiene el hilo escritor; se puede llamar varias veces
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        # dictConfig cierra los manejadores anteriores al reconfigurar
+        self.detener()
+        super().close()
@@ -0,0 +1,81 @@
+import importlib
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from core.benchmarks import ESCENARIOS, cargar_base, comparar, guardar_base, ruta_base
+
+class Command(BaseCommand):
+    help = 'Ejecuta un escenario de benchmark sobre datos temporales'
+
+    def add_arguments(self, parser):
+        parser.add_argument('escenario', choices=sorted(ESCENARIOS))
+        parser.add_argument('--tamano', type=int, default=40,
+                            help='Tamaño de los datos de prueba (depende del escenario)')
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--json', action='store_true',
+                            help='Imprime los resultados en formato JSON')
+        parser.add_argument('--guardar-base', action='store_true',
+                            help='Guarda los resultados como línea base del escenario')
+        parser.add_argument('--comparar', action='store_true',
+                            help='Compara con la línea base y falla si hay regresiones')
+        parser.add_argument('--base',
+                            help='Archivo de la línea base (por defecto core/benchmarks/bases/<escenario>.json)')
+        parser.add_argument('--tolerancia', type=float, default=0.25,
+                            help='Aumento relativo de la mediana admitido al comparar (0.25 = 25%%)')
+        parser.add_argument('--margen-ms', type=float, default=1.0,
+                            help='Aumento absoluto de la mediana admitido al comparar, en ms')
+
+    def handle(self, *args, **options):
+        escenario = options['escenario']
+        modulo = importlib.import_module(ESCENARIOS[escenario])
+        ruta = options['base'] or ruta_base(escenario)
+        base = None
+        if options['comparar']:
+            try:
+                base = cargar_base(ruta)
+            except FileNotFoundError:
+                raise CommandError(f'No existe la línea base {ruta}; ejecute antes con --guardar-base')
+            if base['tamano'] != options['tamano']:
+                raise CommandError(
+                    f"La línea base se midió con --tamano {base['tamano']}; use el mismo tamaño"
+                )
+
+        # Todo el escenario corre en una transacción que se revierte al final.
+        # Las peticiones simuladas usan el host 'testserver'
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            with transaction.atomic():
+                resultados = modulo.run(options)
+                transaction.set_rollback(True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultados, indent=2))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Escenario '{escenario}' (tamaño {options['tamano']})"
+            ))
+            for resultado in resultados:
+                # Rango de consultas si no todas las repeticiones hicieron las mismas
+                consultas = str(resultado['consultas'])
+                if resultado['consultas_min'] != resultado['consultas']:
+                    consultas = f"{resultado['consultas_min']}-{consultas}"
+                self.stdout.write(
+                    f"  {resultado['nombre']:<30} mediana {resultado['mediana_ms']:>9.2f} ms"
+                    f"  p95 {resultado['p95_ms']:>9.2f} ms  p99 {resultado['p99_ms']:>9.2f} ms"
+                    f"  {resultado['por_segundo'] or 0:>8.1f}/s  consultas {consultas:>9}"
+                )
+
+        if options['guardar_base']:
+            guardar_base(ruta, escenario, options, resultados)
+            self.stdout.write(f'Línea base guardada en {ruta}')
+        if base is not None:
+            regresiones = comparar(resultados, base, options['tolerancia'], options['margen_ms'])
+            for regresion in regresiones:
+                self.stderr.write(
+                    f"  regresión en {regresion['nombre']}: {regresion['metrica']} "
+                    f"{regresion['base']} -> {regresion['actual']}"
+                )
+            if regresiones:
+                raise CommandError(f'{len(regresiones)} regresiones frente a {ruta}')
+            self.stdout.write(self.style.SUCCESS(f'Sin regresiones frente a {ruta}'))
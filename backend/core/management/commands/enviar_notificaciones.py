@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from core.services.notificacion_service import NotificacionService
+
+class Command(BaseCommand):
+    help = 'Envía a los acudientes los resúmenes diarios de ausencias y observaciones pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=NotificacionService.LOTE,
+                            help='Acudientes reservados por iteración')
+        parser.add_argument('--continuo', action='store_true',
+                            help='No termina: vuelve a revisar la bandeja cada --intervalo segundos')
+        parser.add_argument('--intervalo', type=int, default=60,
+                            help='Segundos entre revisiones en modo continuo')
+
+    def handle(self, *args, **options):
+        while True:
+            totales = NotificacionService.enviar_pendientes(options['lote'])
+            if totales['correos'] or not options['continuo']:
+                self.stdout.write(
+                    f"{totales['correos']} correos enviados ({totales['avisos']} avisos); "
+                    f"{totales['reintentos']} reprogramados, {totales['fallidos']} fallidos"
+                )
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.generador import GeneradorInstitucion
+from core.models import User
+
+class Command(BaseCommand):
+    help = 'Genera una institución sintética (estudiantes, docentes y un año de registros) para pruebas de carga'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estudiantes', type=int, default=5000,
+                            help='Número de estudiantes')
+        parser.add_argument('--por-grupo', type=int, default=35,
+                            help='Estudiantes por grupo')
+        parser.add_argument('--anio', type=int, default=2025,
+                            help='Año lectivo de los períodos y registros')
+        parser.add_argument('--semilla', type=int, default=42,
+                            help='Semilla: la misma semilla genera los mismos datos')
+        parser.add_argument('--password', default='sise12345',
+                            help='Contraseña de todos los usuarios generados')
+        parser.add_argument('--dominio', default='sintetico.sise.test',
+                            help='Dominio de los emails generados')
+        parser.add_argument('--sin-resumenes', action='store_true',
+                            help='No reconstruye los resúmenes de boletín y asistencia')
+
+    def handle(self, *args, **options):
+        if options['estudiantes'] < 1 or options['por_grupo'] < 1:
+            raise CommandError('El número de estudiantes y de estudiantes por grupo debe ser positivo')
+        if User.objects.filter(email__endswith=f"@{options['dominio']}").exists():
+            raise CommandError(
+                f"Ya existen usuarios con el dominio {options['dominio']}; use otro --dominio"
+            )
+
+        generador = GeneradorInstitucion(
+            estudiantes=options['estudiantes'],
+            por_grupo=options['por_grupo'],
+            anio=options['anio'],
+            semilla=options['semilla'],
+            password=options['password'],
+            dominio=options['dominio'],
+            resumenes=not options['sin_resumenes'],
+            progreso=lambda mensaje: self.stdout.write(f'  {mensaje}')
+        )
+        totales = generador.generar()
+        self.stdout.write(self.style.SUCCESS(
+            f"Institución generada en {totales['segundos']} s "
+            f"({totales['estudiantes']} estudiantes, {totales['asistencias']} asistencias)"
+        ))
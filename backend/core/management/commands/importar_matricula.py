@@ -0,0 +1,57 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from core.services.matricula_service import MatriculaService
+
+class Command(BaseCommand):
+    help = 'Importa estudiantes (usuario + estudiante + grupo) desde un archivo CSV o JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo CSV (con encabezados) o JSON')
+        parser.add_argument('--formato', choices=MatriculaService.FORMATOS,
+                            help='Formato del archivo; por defecto según la extensión')
+        parser.add_argument('--password-por-defecto',
+                            help='Contraseña para las filas que no traen una')
+        parser.add_argument('--parcial', action='store_true',
+                            help='Importa las filas válidas aunque otras tengan errores')
+        parser.add_argument('--simular', action='store_true',
+                            help='Solo valida el archivo, no escribe nada')
+        parser.add_argument('--procesos', type=int,
+                            help='Procesos para el hash de contraseñas (por defecto, núcleos disponibles)')
+        parser.add_argument('--limite', type=int, default=20,
+                            help='Número máximo de errores a mostrar')
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or MatriculaService.formato_de(options['archivo'])
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                registros = MatriculaService.leer_archivo(archivo.read(), formato)
+        except (OSError, ValueError, UnicodeDecodeError) as exc:
+            raise CommandError(f'No se pudo leer el archivo: {exc}')
+
+        resultado = MatriculaService.importar(
+            registros,
+            password_por_defecto=options['password_por_defecto'],
+            parcial=options['parcial'],
+            simular=options['simular'],
+            procesos=options['procesos']
+        )
+
+        errores = resultado['errores']
+        if errores:
+            self.stdout.write(self.style.WARNING(f'{len(errores)} filas con errores'))
+            for error in errores[:options['limite']]:
+                detalle = json.dumps(error['detalle'], ensure_ascii=False)
+                self.stdout.write(f"  fila {error['fila']} ({error['email']}): {detalle}")
+
+        tiempos = resultado['tiempos']
+        resumen = (
+            f"{resultado['creados']} de {resultado['total']} estudiantes importados en {tiempos['total_s']:.1f} s "
+            f"(validación {tiempos['validacion_s']:.1f} s, hash {tiempos['hash_s']:.1f} s, "
+            f"escritura {tiempos['escritura_s']:.1f} s; {resultado['filas_por_segundo']} filas/s)"
+        )
+        if resultado['simulado']:
+            self.stdout.write(self.style.SUCCESS(f"Simulación: {resultado['validos']} filas válidas de {resultado['total']}"))
+        elif errores and not options['parcial']:
+            raise CommandError('No se importó nada; corrija los errores o use --parcial')
+        else:
+            self.stdout.write(self.style.SUCCESS(resumen))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from core.services.carga_adjunto_service import CargaAdjuntoService
+
+class Command(BaseCommand):
+    help = 'Elimina las cargas por partes de adjuntos abandonadas y sus archivos parciales'
+
+    def handle(self, *args, **options):
+        eliminadas = CargaAdjuntoService.limpiar_vencidas()
+        self.stdout.write(self.style.SUCCESS(f'{eliminadas} cargas vencidas eliminadas'))
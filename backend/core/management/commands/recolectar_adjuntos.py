@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from core.services.blob_adjunto_service import BlobAdjuntoService
+
+def _tamano(bytes_):
+    for unidad in ('bytes', 'KB', 'MB', 'GB'):
+        if bytes_ < 1024 or unidad == 'GB':
+            return f'{bytes_:.0f} {unidad}' if unidad == 'bytes' else f'{bytes_:.1f} {unidad}'
+        bytes_ /= 1024
+
+class Command(BaseCommand):
+    help = 'Elimina los blobs de adjuntos de planeaciones sin referencias e informa el espacio liberado'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--simular', action='store_true',
+                            help='Solo informa lo que se eliminaría')
+        parser.add_argument('--recontar', action='store_true',
+                            help='Recalcula las referencias desde las planeaciones antes de recolectar')
+        parser.add_argument('--importar', action='store_true',
+                            help='Pasa al almacenamiento deduplicado los adjuntos guardados antes de la deduplicación')
+
+    def handle(self, *args, **options):
+        if options['importar'] and not options['simular']:
+            archivos, liberados = BlobAdjuntoService.importar_existentes()
+            self.stdout.write(f'{archivos} adjuntos importados; {_tamano(liberados)} en copias repetidas')
+        if options['recontar'] and not options['simular']:
+            corregidos = BlobAdjuntoService.recontar()
+            self.stdout.write(f'{corregidos} blobs con referencias corregidas')
+
+        blobs, liberados = BlobAdjuntoService.recolectar(simular=options['simular'])
+        verbo = 'se eliminarían' if options['simular'] else 'eliminados'
+        self.stdout.write(self.style.SUCCESS(
+            f'{blobs} blobs sin referencias {verbo}; {_tamano(liberados)} liberados'
+        ))
@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import Periodo
+from core.services.resumen_service import ResumenService
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero los resúmenes de boletín por estudiante y período'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periodo', type=int, action='append',
+                            help='Id del período a reconstruir (se puede repetir)')
+
+    def handle(self, *args, **options):
+        periodos = Periodo.objects.all()
+        if options['periodo']:
+            periodos = periodos.filter(id__in=options['periodo'])
+
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            total = ResumenService.reconstruir(periodos)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} resúmenes reconstruidos en {time.perf_counter() - inicio:.1f} s'
+        ))
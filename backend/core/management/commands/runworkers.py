@@ -0,0 +1,91 @@
+import multiprocessing
+import signal
+import threading
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+def _proceso(detener, intervalo, una_vez):
+    # Con 'spawn' el proceso hijo arranca sin Django configurado y sin heredar
+    # el estado del supervisor (hilo del QueueListener, conexiones, archivos)
+    django.setup()
+    # Import diferido: el hijo importa este módulo antes de configurar Django,
+    # así que los modelos no pueden importarse a nivel de módulo
+    from core.services.trabajo_service import TrabajoService
+    # Ctrl+C y SIGTERM los atiende el supervisor: el hijo termina el trabajo
+    # en curso, y terminate() (tiempo agotado) lo detiene de inmediato
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    TrabajoService.trabajar(detener, intervalo, una_vez)
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos en segundo plano con un grupo de hilos o de procesos'
+
+    def add_arguments(self, parser):
+        grupo = parser.add_mutually_exclusive_group()
+        grupo.add_argument('--hilos', type=int,
+                           help='Trabajadores en hilos (por defecto SISE_TRABAJOS_HILOS)')
+        grupo.add_argument('--procesos', type=int,
+                           help='Trabajadores en procesos; los que agotan su tiempo se terminan y se reemplazan')
+        parser.add_argument('--intervalo', type=float, default=settings.SISE_TRABAJOS_INTERVALO_S,
+                            help='Segundos entre revisiones de la cola cuando está vacía')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Termina cuando la cola queda vacía')
+
+    def handle(self, *args, **options):
+        # Import diferido (ver _proceso)
+        from core.services.trabajo_service import TrabajoService
+        procesos = options['procesos']
+        cantidad = procesos or options['hilos'] or settings.SISE_TRABAJOS_HILOS
+        if cantidad < 1:
+            raise CommandError('Se necesita al menos un trabajador')
+        intervalo, una_vez = options['intervalo'], options['una_vez']
+
+        if procesos:
+            contexto = multiprocessing.get_context('spawn')
+            detener = contexto.Event()
+
+            def iniciar(_):
+                # No daemon: la importación de matrícula usa su propio grupo de procesos
+                trabajador = contexto.Process(target=_proceso, args=(detener, intervalo, una_vez))
+                trabajador.start()
+                return trabajador
+        else:
+            detener = threading.Event()
+
+            def iniciar(numero):
+                trabajador = threading.Thread(
+                    target=TrabajoService.trabajar, args=(detener, intervalo, una_vez), name=f'trabajador-{numero}'
+                )
+                trabajador.start()
+                return trabajador
+
+        signal.signal(signal.SIGTERM, lambda *args: detener.set())
+        trabajadores = [iniciar(numero) for numero in range(cantidad)]
+        self.stdout.write(f"{cantidad} trabajadores en {'procesos' if procesos else 'hilos'}")
+        try:
+            while any(trabajador.is_alive() for trabajador in trabajadores):
+                self._supervisar(trabajadores, procesos, iniciar, detener, una_vez)
+                detener.wait(intervalo)
+        except KeyboardInterrupt:
+            detener.set()
+        self.stdout.write('Deteniendo: se espera a que terminen los trabajos en curso')
+        detener.set()
+        for trabajador in trabajadores:
+            trabajador.join()
+
+    def _supervisar(self, trabajadores, procesos, iniciar, detener, una_vez):
+        from core.services.trabajo_service import TrabajoService  # ver _proceso
+        recuperados = TrabajoService.recuperar_vencidos()
+        if not procesos:
+            # Un hilo no se puede interrumpir: su intento queda vencido y el
+            # resultado tardío se descarta al terminar
+            return
+        pids = {TrabajoService.pid_de(trabajo.trabajador) for trabajo in recuperados}
+        for numero, trabajador in enumerate(trabajadores):
+            if trabajador.is_alive() and trabajador.pid in pids:
+                trabajador.terminate()
+                trabajador.join()
+                self.stderr.write(f'Trabajador {trabajador.pid} terminado por tiempo agotado')
+            if not trabajador.is_alive() and not detener.is_set() and (not una_vez or trabajador.exitcode):
+                trabajadores[numero] = iniciar(numero)
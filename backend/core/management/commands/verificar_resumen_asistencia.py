@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.services.resumen_asistencia_service import ResumenAsistenciaService
+
+class Command(BaseCommand):
+    help = 'Compara los resúmenes de asistencia por grupo con las asistencias registradas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reparar', action='store_true',
+                            help='Reconstruye los resúmenes si se encuentran diferencias')
+        parser.add_argument('--limite', type=int, default=20,
+                            help='Número máximo de diferencias a mostrar')
+
+    def handle(self, *args, **options):
+        diferencias = ResumenAsistenciaService.verificar()
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('Los resúmenes de asistencia están al día'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'{len(diferencias)} diferencias encontradas'))
+        for diferencia in diferencias[:options['limite']]:
+            self.stdout.write(
+                f"  {diferencia['tipo']} grupo={diferencia['grupo']} {diferencia['clave']}: "
+                f"esperado {diferencia['esperado']} actual {diferencia['actual']}"
+            )
+
+        if options['reparar']:
+            with transaction.atomic():
+                total = ResumenAsistenciaService.reconstruir()
+            self.stdout.write(self.style.SUCCESS(f'Resúmenes reconstruidos ({total} días con registros)'))
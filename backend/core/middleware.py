@@ -0,0 +1,166 @@
+"""
+Instrumentación de rendimiento por petición.
+
+``InstrumentacionMiddleware`` mide el tiempo total de cada petición y, con un
+execute_wrapper sobre las conexiones a la base de datos, el número de
+consultas, su tiempo, las más lentas y las repetidas. El resultado se envía
+en la cabecera ``Server-Timing`` y en el evento ``request.metricas``; si la
+vista supera su presupuesto (``SISE_PRESUPUESTOS``) se emite además
+``request.presupuesto_excedido`` como advertencia.
+
+Con ``SISE_INSTRUMENTACION`` desactivado el middleware lanza
+MiddlewareNotUsed y Django lo quita de la cadena, así que no cuesta nada.
+Funciona en modo síncrono y asíncrono para no obligar a las vistas de
+core/async_views.py a pasar por un hilo bajo ASGI.
+"""
+import heapq
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from .logs import evento, get_logger
+
+logger = get_logger('request')
+
+# Longitud máxima del SQL incluido en el evento
+MAX_SQL = 300
+
+def _recortar(sql):
+    return sql if len(sql) <= MAX_SQL else sql[:MAX_SQL] + '…'
+
+class RegistroConsultas:
+    """
+    execute_wrapper que acumula tiempo y número de consultas, conserva las
+    ``lentas`` más lentas y cuenta cuántas veces se repite cada consulta
+    """
+    def __init__(self, lentas=5):
+        self.lentas = lentas
+        self.total = 0
+        self.segundos = 0.0
+        self.mas_lentas = []
+        self.repeticiones = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.total += 1
+            self.segundos += duracion
+            self.repeticiones[(sql, repr(params))] += 1
+            # Montículo de tamaño fijo con las consultas más lentas
+            entrada = (duracion, self.total, sql)
+            if len(self.mas_lentas) < self.lentas:
+                heapq.heappush(self.mas_lentas, entrada)
+            elif duracion > self.mas_lentas[0][0]:
+                heapq.heapreplace(self.mas_lentas, entrada)
+
+    def lentas_ordenadas(self):
+        return [
+            {"sql": _recortar(sql), "ms": round(duracion * 1000, 2)}
+            for duracion, _, sql in sorted(self.mas_lentas, reverse=True)
+        ]
+
+    def duplicadas(self):
+        """
+        Consultas idénticas (mismo SQL y parámetros) ejecutadas más de una vez
+        """
+        return [
+            {"sql": _recortar(sql), "veces": veces}
+            for (sql, _), veces in self.repeticiones.most_common()
+            if veces > 1
+        ]
+
+def presupuesto_de(vista):
+    presupuestos = settings.SISE_PRESUPUESTOS
+    return presupuestos.get(vista) or presupuestos.get('*') or {}
+
+class InstrumentacionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SISE_INSTRUMENTACION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.muestreo = settings.SISE_INSTRUMENTACION_MUESTREO
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _omitir(self):
+        return self.muestreo < 1 and random.random() >= self.muestreo
+
+    def _envolver(self, pila, registro):
+        for conexion in connections.all():
+            pila.enter_context(conexion.execute_wrapper(registro))
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self._omitir():
+            return self.get_response(request)
+
+        registro = RegistroConsultas()
+        inicio = time.perf_counter()
+        with ExitStack() as pila:
+            self._envolver(pila, registro)
+            response = self.get_response(request)
+        return self._registrar(request, response, registro, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        if self._omitir():
+            return await self.get_response(request)
+
+        registro = RegistroConsultas()
+        inicio = time.perf_counter()
+        with ExitStack() as pila:
+            # Las consultas (del ORM asíncrono y de las vistas síncronas) corren
+            # en el hilo de sync_to_async, que tiene sus propias conexiones
+            await sync_to_async(self._envolver)(pila, registro)
+            response = await self.get_response(request)
+        return self._registrar(request, response, registro, time.perf_counter() - inicio)
+
+    def _registrar(self, request, response, registro, total):
+        total_ms = total * 1000
+        sql_ms = registro.segundos * 1000
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={total_ms:.1f}',
+            f'db;dur={sql_ms:.1f};desc="{registro.total} consultas"',
+            f'app;dur={max(total_ms - sql_ms, 0):.1f}',
+        ])
+
+        match = getattr(request, 'resolver_match', None)
+        vista = (match.view_name or match._func_path) if match else None
+        duplicadas = registro.duplicadas()
+        campos = {
+            "vista": vista,
+            "metodo": request.method,
+            "ruta": request.path,
+            "estado": response.status_code,
+            "total_ms": round(total_ms, 1),
+            "consultas": registro.total,
+            "sql_ms": round(sql_ms, 1),
+            "lentas": registro.lentas_ordenadas(),
+            "duplicadas": duplicadas[:5],
+        }
+        evento(logger, 'request.metricas', **campos)
+
+        presupuesto = presupuesto_de(vista)
+        excedido = []
+        if registro.total > presupuesto.get('consultas', float('inf')):
+            excedido.append('consultas')
+        if total_ms > presupuesto.get('ms', float('inf')):
+            excedido.append('ms')
+        if excedido:
+            evento(
+                logger, 'request.presupuesto_excedido', logging.WARNING,
+                excedido=excedido, presupuesto=presupuesto, **campos
+            )
+        return response
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenPeriodo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notas', models.JSONField(default=dict)),
+                ('promedio_general', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('presentes', models.PositiveIntegerField(default=0)),
+                ('ausencias', models.PositiveIntegerField(default=0)),
+                ('tardanzas', models.PositiveIntegerField(default=0)),
+                ('justificadas', models.PositiveIntegerField(default=0)),
+                ('observaciones', models.PositiveIntegerField(default=0)),
+                ('observaciones_por_tipo', models.JSONField(default=dict)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='core.estudiante')),
+                ('periodo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='core.periodo')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Período',
+                'verbose_name_plural': 'Resúmenes de Período',
+                'unique_together': {('estudiante', 'periodo')},
+            },
+        ),
+    ]
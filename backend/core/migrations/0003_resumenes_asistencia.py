@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_resumenperiodo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenAsistenciaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('presentes', models.PositiveIntegerField(default=0)),
+                ('ausencias', models.PositiveIntegerField(default=0)),
+                ('tardanzas', models.PositiveIntegerField(default=0)),
+                ('justificadas', models.PositiveIntegerField(default=0)),
+                ('fecha', models.DateField()),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_asistencia', to='core.grupo')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Asistencia',
+                'verbose_name_plural': 'Resúmenes Diarios de Asistencia',
+                'unique_together': {('grupo', 'fecha')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenAsistenciaPeriodo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('presentes', models.PositiveIntegerField(default=0)),
+                ('ausencias', models.PositiveIntegerField(default=0)),
+                ('tardanzas', models.PositiveIntegerField(default=0)),
+                ('justificadas', models.PositiveIntegerField(default=0)),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_asistencia_periodo', to='core.grupo')),
+                ('periodo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_asistencia', to='core.periodo')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Asistencia por Período',
+                'verbose_name_plural': 'Resúmenes de Asistencia por Período',
+                'unique_together': {('grupo', 'periodo')},
+            },
+        ),
+    ]
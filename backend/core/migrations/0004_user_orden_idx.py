@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0003_resumenes_asistencia'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['apellido', 'nombre', 'id'], name='core_user_orden_idx'),
+        ),
+    ]
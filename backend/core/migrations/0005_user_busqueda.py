@@ -0,0 +1,121 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:55
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import core.search
+
+
+SQLITE_CREAR = [
+    """
+    CREATE VIRTUAL TABLE core_user_fts USING fts5(
+        busqueda, content='core_user', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER core_user_fts_ai AFTER INSERT ON core_user BEGIN
+        INSERT INTO core_user_fts(rowid, busqueda) VALUES (new.id, new.busqueda);
+    END
+    """,
+    """
+    CREATE TRIGGER core_user_fts_ad AFTER DELETE ON core_user BEGIN
+        INSERT INTO core_user_fts(core_user_fts, rowid, busqueda) VALUES ('delete', old.id, old.busqueda);
+    END
+    """,
+    """
+    CREATE TRIGGER core_user_fts_au AFTER UPDATE OF busqueda ON core_user BEGIN
+        INSERT INTO core_user_fts(core_user_fts, rowid, busqueda) VALUES ('delete', old.id, old.busqueda);
+        INSERT INTO core_user_fts(rowid, busqueda) VALUES (new.id, new.busqueda);
+    END
+    """,
+    "INSERT INTO core_user_fts(core_user_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BORRAR = [
+    "DROP TRIGGER IF EXISTS core_user_fts_au",
+    "DROP TRIGGER IF EXISTS core_user_fts_ad",
+    "DROP TRIGGER IF EXISTS core_user_fts_ai",
+    "DROP TABLE IF EXISTS core_user_fts",
+]
+
+POSTGRESQL_CREAR = [
+    "CREATE INDEX core_user_busqueda_fts ON core_user USING GIN (to_tsvector('simple', busqueda))",
+]
+
+POSTGRESQL_BORRAR = [
+    "DROP INDEX IF EXISTS core_user_busqueda_fts",
+]
+
+
+def texto_busqueda(nombre, apellido, email):
+    # Copia de core.search.texto_busqueda al momento de esta migración
+    texto = unicodedata.normalize('NFKD', f'{nombre} {apellido} {email}')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', texto))
+
+
+def llenar_busqueda(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    usuarios = list(User.objects.only('id', 'nombre', 'apellido', 'email'))
+    for usuario in usuarios:
+        usuario.busqueda = texto_busqueda(usuario.nombre, usuario.apellido, usuario.email)
+    User.objects.bulk_update(usuarios, ['busqueda'], batch_size=1000)
+
+
+def _ejecutar(schema_editor, sentencias):
+    for sentencia in sentencias:
+        schema_editor.execute(sentencia)
+
+
+def crear_indice(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                # Sin FTS5 la búsqueda usa LIKE sobre la columna normalizada
+                return
+        _ejecutar(schema_editor, SQLITE_CREAR)
+    elif vendor == 'postgresql':
+        _ejecutar(schema_editor, POSTGRESQL_CREAR)
+
+
+def borrar_indice(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _ejecutar(schema_editor, SQLITE_BORRAR)
+    elif vendor == 'postgresql':
+        _ejecutar(schema_editor, POSTGRESQL_BORRAR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_user_orden_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='busqueda',
+            field=models.CharField(blank=True, default='', editable=False, max_length=400),
+        ),
+        migrations.RunPython(llenar_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice, borrar_indice),
+        migrations.CreateModel(
+            name='UserFTS',
+            fields=[
+                ('user', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='fts', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('busqueda', core.search.CampoFTS5()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'core_user_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_user_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['fecha', 'estudiante'], name='core_asist_fecha_idx'),
+        ),
+    ]
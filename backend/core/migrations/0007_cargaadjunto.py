@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:32
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_asistencia_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CargaAdjunto',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=255)),
+                ('tamano', models.PositiveBigIntegerField()),
+                ('recibido', models.PositiveBigIntegerField(default=0)),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+                ('actualizada', models.DateTimeField(auto_now=True)),
+                ('planeacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cargas', to='core.planeacion')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cargas_adjunto', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Carga de Adjunto',
+                'verbose_name_plural': 'Cargas de Adjuntos',
+            },
+        ),
+    ]
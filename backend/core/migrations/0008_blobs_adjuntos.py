@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:35
+
+import core.almacenamiento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_cargaadjunto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlobAdjunto',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('tamano', models.PositiveBigIntegerField()),
+                ('referencias', models.PositiveIntegerField(default=0)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('usado', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Blob de Adjunto',
+                'verbose_name_plural': 'Blobs de Adjuntos',
+            },
+        ),
+        migrations.AlterField(
+            model_name='planeacion',
+            name='archivo_adjunto',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=core.almacenamiento.almacenamiento_adjuntos, upload_to='planeaciones/'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_blobs_adjuntos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransicionPlaneacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado_anterior', models.CharField(choices=[('B', 'Borrador'), ('E', 'Enviado'), ('A', 'Aprobado')], max_length=1)),
+                ('estado_nuevo', models.CharField(choices=[('B', 'Borrador'), ('E', 'Enviado'), ('A', 'Aprobado')], max_length=1)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('planeacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transiciones', to='core.planeacion')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transiciones_planeacion', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Transición de Planeación',
+                'verbose_name_plural': 'Transiciones de Planeaciones',
+                'indexes': [models.Index(fields=['planeacion', 'fecha'], name='core_transicion_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_transiciones_planeacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estudiante',
+            name='acudientes',
+            field=models.ManyToManyField(blank=True, related_name='acudidos', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='Notificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('ausencia', 'Ausencia'), ('observacion', 'Observación')], max_length=20)),
+                ('fecha', models.DateField()),
+                ('mensaje', models.TextField()),
+                ('estado', models.CharField(choices=[('P', 'Pendiente'), ('E', 'Enviada'), ('F', 'Fallida')], default='P', max_length=1)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('disponible', models.DateTimeField()),
+                ('lote', models.UUIDField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+                ('enviada', models.DateTimeField(blank=True, null=True)),
+                ('acudiente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificaciones', to=settings.AUTH_USER_MODEL)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificaciones', to='core.estudiante')),
+            ],
+            options={
+                'verbose_name': 'Notificación',
+                'verbose_name_plural': 'Notificaciones',
+                'indexes': [models.Index(fields=['estado', 'disponible'], name='core_notif_pendiente_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:45
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_notificaciones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trabajo',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tipo', models.CharField(max_length=50)),
+                ('parametros', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('estado', models.CharField(choices=[('P', 'Pendiente'), ('E', 'En ejecución'), ('C', 'Completado'), ('F', 'Fallido')], default='P', max_length=1)),
+                ('prioridad', models.SmallIntegerField(default=0)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('max_intentos', models.PositiveSmallIntegerField(default=1)),
+                ('tiempo_limite', models.PositiveIntegerField()),
+                ('disponible', models.DateTimeField(default=django.utils.timezone.now)),
+                ('vence', models.DateTimeField(blank=True, null=True)),
+                ('trabajador', models.CharField(blank=True, default='', max_length=100)),
+                ('resultado', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('archivo', models.FileField(blank=True, max_length=255, null=True, upload_to='trabajos/')),
+                ('error', models.TextField(blank=True, default='')),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('iniciado', models.DateTimeField(blank=True, null=True)),
+                ('terminado', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trabajos', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Trabajo',
+                'verbose_name_plural': 'Trabajos',
+                'indexes': [models.Index(fields=['estado', '-prioridad', 'creado'], name='core_trabajo_cola_idx'), models.Index(fields=['estado', 'vence'], name='core_trabajo_vence_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_trabajos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cargaadjunto',
+            name='archivo_adjunto',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='cargaadjunto',
+            name='completa',
+            field=models.BooleanField(default=False),
+        ),
+    ]
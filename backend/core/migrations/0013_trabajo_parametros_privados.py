@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_cargaadjunto_completa'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajo',
+            name='parametros_privados',
+            field=models.BooleanField(default=False),
+        ),
+    ]
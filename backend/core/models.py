@@ -1,5 +1,11 @@
+import uuid
+from decimal import Decimal
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from .almacenamiento import almacenamiento_adjuntos
+from .search import CampoFTS5, texto_busqueda
 
 class Rol(models.Model):
     nombre = models.CharField(max_length=50)
@@ -39,6 +45,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     rol = models.ForeignKey(Rol, on_delete=models.CASCADE)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Nombre, apellido y email normalizados para la búsqueda (ver core/search.py)
+    busqueda = models.CharField(max_length=400, blank=True, default='', editable=False)
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['nombre', 'apellido']
@@ -51,9 +59,36 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_full_name(self):
         return f"{self.nombre} {self.apellido}"
     
+    def save(self, *args, **kwargs):
+        self.busqueda = texto_busqueda(self.nombre, self.apellido, self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'nombre', 'apellido', 'email'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'busqueda'}
+        super().save(*args, **kwargs)
+    
     class Meta:
         verbose_name = "Usuario"
         verbose_name_plural = "Usuarios"
+        indexes = [
+            # Ordenamiento por defecto del listado y paginación por cursor
+            models.Index(fields=['apellido', 'nombre', 'id'], name='core_user_orden_idx'),
+        ]
+
+class UserFTS(models.Model):
+    """
+    Tabla virtual FTS5 de búsqueda de usuarios (solo SQLite). La crea la
+    migración 0005_user_busqueda y la mantienen triggers sobre core_user.
+    """
+    user = models.OneToOneField(
+        User, primary_key=True, db_column='rowid', db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name='fts'
+    )
+    busqueda = CampoFTS5()
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = 'core_user_fts'
 
 class Grado(models.Model):
     nombre = models.CharField(max_length=50)
@@ -81,6 +116,8 @@ class Asignatura(models.Model):
 class Estudiante(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE, related_name='estudiantes')
+    # Usuarios con rol Acudiente que reciben los avisos del estudiante
+    acudientes = models.ManyToManyField(User, blank=True, related_name='acudidos')
     
     def __str__(self):
         return f"{self.user.nombre} {self.user.apellido} - {self.grupo}"
@@ -135,8 +172,16 @@ class Asistencia(models.Model):
         verbose_name = "Asistencia"
         verbose_name_plural = "Asistencias"
         unique_together = ['estudiante', 'fecha']
+        indexes = [
+            # Consultas y exportaciones por rango de fechas
+            models.Index(fields=['fecha', 'estudiante'], name='core_asist_fecha_idx'),
+        ]
 
 class Calificacion(models.Model):
+    # Escala de valoración institucional
+    NOTA_MINIMA = Decimal('1.0')
+    NOTA_MAXIMA = Decimal('5.0')
+    
     estudiante = models.ForeignKey(Estudiante, on_delete=models.CASCADE, related_name='calificaciones')
     asignatura = models.ForeignKey(Asignatura, on_delete=models.CASCADE)
     periodo = models.ForeignKey(Periodo, on_delete=models.CASCADE)
@@ -192,7 +237,10 @@ class Planeacion(models.Model):
     actividades = models.TextField()
     recursos = models.TextField()
     evaluacion = models.TextField()
-    archivo_adjunto = models.FileField(upload_to='planeaciones/', blank=True, null=True)
+    # Deduplicado por contenido (core/almacenamiento.py); el nombre incluye el hash
+    archivo_adjunto = models.FileField(
+        upload_to='planeaciones/', storage=almacenamiento_adjuntos, max_length=255, blank=True, null=True
+    )
     estado = models.CharField(max_length=1, choices=ESTADO_CHOICES, default='B')
     
     def __str__(self):
@@ -201,3 +249,233 @@ class Planeacion(models.Model):
     class Meta:
         verbose_name = "Planeación"
         verbose_name_plural = "Planeaciones"
+
+class ResumenPeriodo(models.Model):
+    """
+    Resumen materializado del boletín de un estudiante en un período.
+    Se mantiene al día desde ResumenService cada vez que cambian sus
+    calificaciones, asistencias u observaciones.
+    """
+    estudiante = models.ForeignKey(Estudiante, on_delete=models.CASCADE, related_name='resumenes')
+    periodo = models.ForeignKey(Periodo, on_delete=models.CASCADE, related_name='resumenes')
+    # {asignatura_id: nota} con la nota como texto para conservar el decimal
+    notas = models.JSONField(default=dict)
+    promedio_general = models.DecimalField(max_digits=4, decimal_places=2, blank=True, null=True)
+    presentes = models.PositiveIntegerField(default=0)
+    ausencias = models.PositiveIntegerField(default=0)
+    tardanzas = models.PositiveIntegerField(default=0)
+    justificadas = models.PositiveIntegerField(default=0)
+    observaciones = models.PositiveIntegerField(default=0)
+    # {tipo_observacion_id: cantidad}
+    observaciones_por_tipo = models.JSONField(default=dict)
+    actualizado = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.estudiante_id} - {self.periodo_id}: {self.promedio_general}"
+    
+    class Meta:
+        verbose_name = "Resumen de Período"
+        verbose_name_plural = "Resúmenes de Período"
+        unique_together = ['estudiante', 'periodo']
+
+class ConteoAsistencia(models.Model):
+    """
+    Conteos de asistencia por estado compartidos por los resúmenes de grupo
+    """
+    presentes = models.PositiveIntegerField(default=0)
+    ausencias = models.PositiveIntegerField(default=0)
+    tardanzas = models.PositiveIntegerField(default=0)
+    justificadas = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+
+class ResumenAsistenciaDiaria(ConteoAsistencia):
+    grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE, related_name='resumenes_asistencia')
+    fecha = models.DateField()
+    
+    def __str__(self):
+        return f"{self.grupo_id} - {self.fecha}"
+    
+    class Meta:
+        verbose_name = "Resumen Diario de Asistencia"
+        verbose_name_plural = "Resúmenes Diarios de Asistencia"
+        unique_together = ['grupo', 'fecha']
+
+class ResumenAsistenciaPeriodo(ConteoAsistencia):
+    grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE, related_name='resumenes_asistencia_periodo')
+    periodo = models.ForeignKey(Periodo, on_delete=models.CASCADE, related_name='resumenes_asistencia')
+    
+    def __str__(self):
+        return f"{self.grupo_id} - {self.periodo_id}"
+    
+    class Meta:
+        verbose_name = "Resumen de Asistencia por Período"
+        verbose_name_plural = "Resúmenes de Asistencia por Período"
+        unique_together = ['grupo', 'periodo']
+
+class CargaAdjunto(models.Model):
+    """
+    Carga por partes (reanudable) del adjunto de una planeación. Los
+    fragmentos se escriben en su posición dentro de un archivo parcial en
+    MEDIA_ROOT; ``recibido`` es el número de bytes consecutivos ya escritos.
+    Las cargas completas se conservan (``completa``) hasta que limpiar_cargas
+    las elimina, para responder igual si el cliente repite el último fragmento.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    planeacion = models.ForeignKey(Planeacion, on_delete=models.CASCADE, related_name='cargas')
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cargas_adjunto')
+    nombre = models.CharField(max_length=255)
+    tamano = models.PositiveBigIntegerField()
+    recibido = models.PositiveBigIntegerField(default=0)
+    completa = models.BooleanField(default=False)
+    # Nombre del adjunto que quedó en la planeación al completar la carga
+    archivo_adjunto = models.CharField(max_length=255, blank=True)
+    creada = models.DateTimeField(auto_now_add=True)
+    actualizada = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.nombre} ({self.recibido}/{self.tamano})"
+    
+    class Meta:
+        verbose_name = "Carga de Adjunto"
+        verbose_name_plural = "Cargas de Adjuntos"
+
+class BlobAdjunto(models.Model):
+    """
+    Contenido único de los adjuntos de planeaciones (core/almacenamiento.py)
+    con el número de planeaciones que lo usan
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    tamano = models.PositiveBigIntegerField()
+    referencias = models.PositiveIntegerField(default=0)
+    creado = models.DateTimeField(auto_now_add=True)
+    # Último alta o baja de una referencia; la recolección respeta un margen desde aquí
+    usado = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.referencias} referencias)"
+    
+    class Meta:
+        verbose_name = "Blob de Adjunto"
+        verbose_name_plural = "Blobs de Adjuntos"
+
+class TransicionPlaneacion(models.Model):
+    """
+    Historial de cambios de estado de las planeaciones: quién y cuándo
+    """
+    planeacion = models.ForeignKey(Planeacion, on_delete=models.CASCADE, related_name='transiciones')
+    estado_anterior = models.CharField(max_length=1, choices=Planeacion.ESTADO_CHOICES)
+    estado_nuevo = models.CharField(max_length=1, choices=Planeacion.ESTADO_CHOICES)
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transiciones_planeacion')
+    fecha = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.planeacion_id}: {self.estado_anterior} → {self.estado_nuevo}"
+    
+    class Meta:
+        verbose_name = "Transición de Planeación"
+        verbose_name_plural = "Transiciones de Planeaciones"
+        indexes = [
+            # Historial de una planeación en orden
+            models.Index(fields=['planeacion', 'fecha'], name='core_transicion_fecha_idx'),
+        ]
+
+class Notificacion(models.Model):
+    """
+    Bandeja de salida (outbox) de los avisos a acudientes. Las filas se
+    escriben en la misma transacción que la asistencia u observación que las
+    origina y las envía el comando ``enviar_notificaciones``, agrupadas en un
+    resumen por acudiente y día.
+    """
+    TIPO_CHOICES = [
+        ('ausencia', 'Ausencia'),
+        ('observacion', 'Observación')
+    ]
+    ESTADO_CHOICES = [
+        ('P', 'Pendiente'),
+        ('E', 'Enviada'),
+        ('F', 'Fallida')
+    ]
+    
+    acudiente = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notificaciones')
+    estudiante = models.ForeignKey(Estudiante, on_delete=models.CASCADE, related_name='notificaciones')
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    # Día del hecho: agrupa el resumen diario
+    fecha = models.DateField()
+    mensaje = models.TextField()
+    estado = models.CharField(max_length=1, choices=ESTADO_CHOICES, default='P')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    # No se envía antes: hora del resumen del día, fin de una reserva o reintento
+    disponible = models.DateTimeField()
+    # Envío que tiene reservada la fila
+    lote = models.UUIDField(blank=True, null=True)
+    error = models.TextField(blank=True, default='')
+    creada = models.DateTimeField(auto_now_add=True)
+    enviada = models.DateTimeField(blank=True, null=True)
+    
+    def __str__(self):
+        return f"{self.acudiente_id} - {self.get_tipo_display()} - {self.fecha}"
+    
+    class Meta:
+        verbose_name = "Notificación"
+        verbose_name_plural = "Notificaciones"
+        indexes = [
+            # Pendientes listas para enviar
+            models.Index(fields=['estado', 'disponible'], name='core_notif_pendiente_idx'),
+        ]
+
+
+class Trabajo(models.Model):
+    """
+    Trabajo en segundo plano (reportes, importaciones, reconstrucciones).
+    Se crea con ``TrabajoService.encolar`` y lo ejecuta el comando
+    ``runworkers``; los tipos disponibles están en core/trabajos.py.
+    """
+    ESTADO_CHOICES = [
+        ('P', 'Pendiente'),
+        ('E', 'En ejecución'),
+        ('C', 'Completado'),
+        ('F', 'Fallido')
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=50)
+    parametros = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    # Los parámetros traen credenciales: ``parametros`` los guarda redactados y
+    # los completos están en un archivo privado (ver TrabajoService)
+    parametros_privados = models.BooleanField(default=False)
+    estado = models.CharField(max_length=1, choices=ESTADO_CHOICES, default='P')
+    # Mayor prioridad se ejecuta primero
+    prioridad = models.SmallIntegerField(default=0)
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='trabajos')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=1)
+    # Segundos que puede durar cada intento
+    tiempo_limite = models.PositiveIntegerField()
+    # No se ejecuta antes (reintentos con espera)
+    disponible = models.DateTimeField(default=timezone.now)
+    # Fin del plazo del intento en curso: pasado este momento el trabajo se
+    # considera abandonado (tiempo agotado o proceso caído)
+    vence = models.DateTimeField(blank=True, null=True)
+    # host:pid:hilo del proceso que ejecuta el intento en curso
+    trabajador = models.CharField(max_length=100, blank=True, default='')
+    resultado = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    archivo = models.FileField(upload_to='trabajos/', max_length=255, blank=True, null=True)
+    error = models.TextField(blank=True, default='')
+    creado = models.DateTimeField(auto_now_add=True)
+    iniciado = models.DateTimeField(blank=True, null=True)
+    terminado = models.DateTimeField(blank=True, null=True)
+    
+    def __str__(self):
+        return f"{self.tipo} - {self.get_estado_display()} - {self.creado}"
+    
+    class Meta:
+        verbose_name = "Trabajo"
+        verbose_name_plural = "Trabajos"
+        indexes = [
+            # Cola: pendientes por prioridad y antigüedad
+            models.Index(fields=['estado', '-prioridad', 'creado'], name='core_trabajo_cola_idx'),
+            # Intentos en curso vencidos
+            models.Index(fields=['estado', 'vence'], name='core_trabajo_vence_idx'),
+        ]
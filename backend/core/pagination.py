@@ -0,0 +1,197 @@
+"""
+Paginación por cursor (keyset) para listados grandes.
+
+En lugar de ``COUNT(*)`` + ``OFFSET`` cada página filtra a partir de los
+valores de ordenamiento de la última fila vista, así que el costo de una
+página no depende de su profundidad. El cursor es opaco para el cliente.
+"""
+import base64
+import json
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación keyset sobre el ordenamiento del queryset (el que aplique
+    OrderingFilter o ``default_ordering``) con ``id`` como desempate.
+
+    Las peticiones con ``?page=`` siguen usando PageNumberPagination para no
+    romper a los clientes que ya paginan por número de página.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # Límite de página para exportaciones de administradores (is_staff)
+    max_page_size_staff = 5000
+    cursor_query_param = 'cursor'
+    default_ordering = ('id',)
+    legacy_pagination_class = PageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.legacy = None
+        if self.legacy_pagination_class.page_query_param in request.query_params:
+            self.legacy = self.legacy_pagination_class()
+            return self.legacy.paginate_queryset(queryset, request, view)
+        return self._pagina(list(self._consulta(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset para vistas asíncronas; la paginación por número de
+        página (Paginator de Django) no tiene versión asíncrona y corre en un hilo
+        """
+        self.request = request
+        self.legacy = None
+        if self.legacy_pagination_class.page_query_param in request.query_params:
+            self.legacy = self.legacy_pagination_class()
+            return await sync_to_async(self.legacy.paginate_queryset)(queryset, request, view)
+        return self._pagina([fila async for fila in self._consulta(queryset, request)])
+
+    def _consulta(self, queryset, request):
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.modelo = queryset.model
+        cursor = self.decode_cursor(request)
+        self.hay_cursor = cursor is not None
+        self.hacia_atras = bool(cursor and cursor['atras'])
+
+        ordering = self.ordering
+        if self.hacia_atras:
+            ordering = [(campo, not descendente) for campo, descendente in ordering]
+        queryset = queryset.order_by(*[('-' if d else '') + c for c, d in ordering])
+        if cursor:
+            queryset = queryset.filter(self.keyset_filter(ordering, cursor['valores']))
+        return queryset[:self.page_size + 1]
+
+    def _pagina(self, filas):
+        self.hay_mas = len(filas) > self.page_size
+        filas = filas[:self.page_size]
+        if self.hacia_atras:
+            filas.reverse()
+        self.page = filas
+        return filas
+
+    def get_page_size(self, request):
+        maximo = self.max_page_size
+        if request.user and request.user.is_staff:
+            maximo = self.max_page_size_staff
+        try:
+            solicitado = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(solicitado, maximo))
+
+    def get_ordering(self, queryset):
+        ordering = []
+        for campo in queryset.query.order_by or self.default_ordering:
+            campo = str(campo)
+            descendente = campo.startswith('-')
+            ordering.append((campo.lstrip('-'), descendente))
+        if not any(campo in ('id', 'pk') for campo, _ in ordering):
+            ordering.append(('id', False))
+        return ordering
+
+    def keyset_filter(self, ordering, valores):
+        """
+        (c1, c2, ..., cn) > (v1, v2, ..., vn) respetando el sentido de cada
+        columna, más la condición redundante sobre c1 para que el motor pueda
+        usar el índice compuesto como rango.
+        """
+        condicion = Q()
+        iguales = Q()
+        for (campo, descendente), valor in zip(ordering, valores):
+            condicion |= iguales & Q(**{f"{campo}__{'lt' if descendente else 'gt'}": valor})
+            iguales &= Q(**{campo: valor})
+        primero, descendente = ordering[0]
+        return condicion & Q(**{f"{primero}__{'lte' if descendente else 'gte'}": valores[0]})
+
+    def valores_de(self, instancia):
+        valores = []
+        for campo, _ in self.ordering:
+            valor = instancia
+            for parte in campo.split('__'):
+                valor = getattr(valor, parte)
+            valores.append(valor)
+        return valores
+
+    def encode_cursor(self, instancia, atras):
+        datos = json.dumps({'v': self.valores_de(instancia), 'a': atras}, default=str)
+        cursor = base64.urlsafe_b64encode(datos.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            valores, atras = datos['v'], bool(datos['a'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound('Cursor inválido')
+        if not isinstance(valores, list) or len(valores) != len(self.ordering):
+            raise NotFound('Cursor inválido')
+        try:
+            valores = [self.convertir(campo, valor) for (campo, _), valor in zip(self.ordering, valores)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound('Cursor inválido')
+        return {'valores': valores, 'atras': atras}
+
+    def convertir(self, campo, valor):
+        """
+        Convierte un valor del cursor con el ``to_python`` del campo de
+        ordenamiento: un cursor manipulado no debe llegar a la consulta
+        """
+        if valor is None:
+            # El filtro keyset no admite comparaciones con NULL
+            raise ValueError(campo)
+        modelo = self.modelo
+        try:
+            for parte in campo.split('__'):
+                campo_modelo = modelo._meta.pk if parte == 'pk' else modelo._meta.get_field(parte)
+                modelo = campo_modelo.related_model
+        except (FieldDoesNotExist, AttributeError):
+            # Anotaciones y expresiones: el valor pasa como llegó
+            return valor
+        return campo_modelo.to_python(valor)
+
+    def get_next_link(self):
+        if not self.page:
+            return None
+        if self.hacia_atras or self.hay_mas:
+            return self.encode_cursor(self.page[-1], atras=False)
+        return None
+
+    def get_previous_link(self):
+        if not self.page:
+            return None
+        if (self.hacia_atras and self.hay_mas) or (not self.hacia_atras and self.hay_cursor):
+            return self.encode_cursor(self.page[0], atras=True)
+        return None
+
+    def get_paginated_response(self, data):
+        if self.legacy:
+            return self.legacy.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+class UserKeysetPagination(KeysetPagination):
+    default_ordering = ('apellido', 'nombre', 'id')
@@ -0,0 +1,35 @@
+"""
+Hash de contraseñas en lote usando varios procesos.
+
+PBKDF2 es deliberadamente costoso (cientos de milisegundos por contraseña)
+y mantiene el GIL ocupado, así que con hilos no se gana nada. Este módulo
+no importa modelos para que los procesos hijos (iniciados con 'spawn')
+puedan cargarlo sin inicializar las aplicaciones de Django.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+# Por debajo de este número de contraseñas no compensa iniciar procesos
+MINIMO_PARALELO = 8
+
+def _hashear(password):
+    return make_password(password)
+
+def procesos_por_defecto():
+    return getattr(settings, 'PASSWORD_HASH_PROCESOS', None) or os.cpu_count() or 1
+
+def hashear_passwords(passwords, procesos=None):
+    """
+    Devuelve la lista de hashes en el mismo orden que ``passwords``
+    """
+    passwords = list(passwords)
+    procesos = min(procesos or procesos_por_defecto(), len(passwords))
+    if procesos <= 1 or len(passwords) < MINIMO_PARALELO:
+        return [_hashear(password) for password in passwords]
+    # 'spawn' evita heredar hilos y conexiones abiertas del proceso web
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+        return list(pool.map(_hashear, passwords, chunksize=max(1, len(passwords) // (procesos * 4))))
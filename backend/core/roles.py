@@ -0,0 +1,127 @@
+"""
+Registro de roles en memoria (por proceso).
+
+La tabla Rol tiene unas pocas filas que casi nunca cambian, así que se lee
+una sola vez y se consulta en memoria por id o por nombre. Las señales de
+Rol (core/signals.py) invalidan el registro del proceso que hizo el cambio;
+los demás procesos lo recargan al vencer ``ROLES_CACHE_TTL`` o, antes, al
+buscar el nombre de un id que no conocen (un rol creado en otro proceso).
+
+Las vistas asíncronas llaman antes a ``acargar()`` para que la recarga use el
+ORM asíncrono; después las búsquedas no tocan la base.
+"""
+import threading
+import time
+from django.conf import settings
+from .models import Rol
+
+ADMINISTRADOR = 'Administrador'
+DOCENTE = 'Docente'
+ESTUDIANTE = 'Estudiante'
+ACUDIENTE = 'Acudiente'
+COORDINADOR = 'Coordinador'
+
+# Nombre canónico de cada rol conocido, por nombre en minúsculas
+NOMBRES = {
+    nombre.lower(): nombre
+    for nombre in (ADMINISTRADOR, DOCENTE, ESTUDIANTE, ACUDIENTE, COORDINADOR)
+}
+
+def normalizar(nombre):
+    """
+    Nombre canónico del rol; los vacíos o desconocidos se tratan como Estudiante
+    """
+    if not nombre:
+        return ESTUDIANTE
+    return NOMBRES.get(nombre.lower(), ESTUDIANTE)
+
+class RegistroRoles:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._por_id = None
+        self._por_nombre = None
+        self._vence = 0.0
+
+    def _vigente(self):
+        return self._por_id is not None and time.monotonic() < self._vence
+
+    def _guardar(self, por_id):
+        # Búsqueda por nombre sin distinguir mayúsculas; ante nombres
+        # repetidos gana el rol más antiguo
+        por_nombre = {}
+        for rol_id in sorted(por_id, reverse=True):
+            por_nombre[por_id[rol_id].lower()] = rol_id
+        self._por_id, self._por_nombre = por_id, por_nombre
+        self._vence = time.monotonic() + self.ttl
+
+    def _datos(self):
+        por_id, por_nombre = self._por_id, self._por_nombre
+        if por_id is not None and time.monotonic() < self._vence:
+            return por_id, por_nombre
+        with self._lock:
+            if not self._vigente():
+                self._guardar(dict(Rol.objects.values_list('id', 'nombre')))
+            return self._por_id, self._por_nombre
+
+    def _recargar(self, por_id):
+        # Solo recarga si nadie lo hizo desde que se leyó ``por_id``
+        with self._lock:
+            if self._por_id is por_id:
+                self._guardar(dict(Rol.objects.values_list('id', 'nombre')))
+            return self._por_id, self._por_nombre
+
+    async def acargar(self, rol_id=None):
+        """
+        Recarga el registro con el ORM asíncrono si venció o si no conoce
+        ``rol_id``, para que ``nombre(rol_id)`` no tenga que consultar la base
+        """
+        if self._vigente() and (rol_id is None or rol_id in self._por_id):
+            return
+        por_id = {rol_id: nombre async for rol_id, nombre in Rol.objects.values_list('id', 'nombre')}
+        with self._lock:
+            self._guardar(por_id)
+
+    def roles(self):
+        """
+        Pares (id, nombre) de todos los roles, ordenados por id
+        """
+        return sorted(self._datos()[0].items())
+
+    def nombre(self, rol_id):
+        """
+        Nombre del rol con ese id, o None si no existe. Si el id no está se
+        recarga una vez: puede ser un rol creado en otro proceso
+        """
+        por_id = self._datos()[0]
+        if rol_id is not None and rol_id not in por_id:
+            por_id = self._recargar(por_id)[0]
+        return por_id.get(rol_id)
+
+    def id(self, nombre):
+        """
+        Id del rol con ese nombre (sin distinguir mayúsculas), o None
+        """
+        return self._datos()[1].get((nombre or '').lower())
+
+    def nombre_normalizado(self, rol_id):
+        """
+        Nombre canónico del rol del usuario (ver ``normalizar``)
+        """
+        return normalizar(self.nombre(rol_id))
+
+    def asegurar(self, nombre):
+        """
+        Id del rol, creándolo si todavía no existe
+        """
+        rol_id = self.id(nombre)
+        if rol_id is None:
+            rol_id = Rol.objects.get_or_create(nombre=nombre)[0].id
+        return rol_id
+
+    def invalidar(self):
+        with self._lock:
+            self._por_id = None
+            self._por_nombre = None
+
+registro = RegistroRoles(settings.ROLES_CACHE_TTL)
@@ -0,0 +1,128 @@
+"""
+Sondas de vida (liveness) y de disponibilidad (readiness) para el balanceador.
+
+La sonda de disponibilidad comprueba la conexión y la latencia de la base de
+datos, el caché, que el directorio de medios admita escritura y que no haya
+migraciones pendientes. El resultado se guarda ``SISE_SALUD_TTL`` segundos
+por proceso: con varias sondas por segundo solo una de ellas llega a la base
+y las demás esperan a esa o reciben el resultado guardado.
+
+Una vez que no quedan migraciones pendientes no se vuelven a buscar en el
+proceso: las nuevas migraciones llegan con un despliegue, que arranca
+procesos nuevos.
+"""
+import logging
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from .logs import evento, get_logger
+
+logger = get_logger('salud')
+
+def _base_datos():
+    inicio = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    latencia = (time.perf_counter() - inicio) * 1000
+    if latencia > settings.SISE_SALUD_DB_MAX_MS:
+        return False, f'latencia de {latencia:.1f} ms (máximo {settings.SISE_SALUD_DB_MAX_MS} ms)'
+    return True, None
+
+def _cache():
+    clave = f'sise:salud:{uuid.uuid4().hex}'
+    cache.set(clave, 'ok', 10)
+    leido = cache.get(clave)
+    cache.delete(clave)
+    if leido != 'ok':
+        return False, 'el caché no devolvió el valor escrito'
+    return True, None
+
+def _media():
+    directorio = Path(settings.MEDIA_ROOT)
+    # FileSystemStorage crea el directorio al guardar el primer archivo
+    directorio.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directorio, prefix='.salud-') as archivo:
+        archivo.write(b'ok')
+        archivo.flush()
+    return True, None
+
+class Sondas:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._resultado = None
+        self._vence = 0.0
+        self._generado = 0.0
+        self._migraciones_al_dia = False
+
+    def _migraciones(self):
+        if self._migraciones_al_dia:
+            return True, None
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if plan:
+            pendientes = [f'{migracion.app_label}.{migracion.name}' for migracion, _ in plan]
+            return False, f'{len(pendientes)} pendientes: {", ".join(pendientes[:5])}'
+        self._migraciones_al_dia = True
+        return True, None
+
+    def _evaluar(self):
+        comprobaciones = {}
+        for nombre, funcion in [
+            ('base_datos', _base_datos),
+            ('cache', _cache),
+            ('media', _media),
+            ('migraciones', self._migraciones),
+        ]:
+            inicio = time.perf_counter()
+            try:
+                ok, detalle = funcion()
+            except Exception as exc:
+                ok, detalle = False, f'{type(exc).__name__}: {exc}'
+            comprobaciones[nombre] = {
+                "ok": ok,
+                "ms": round((time.perf_counter() - inicio) * 1000, 2),
+            }
+            if detalle:
+                comprobaciones[nombre]["detalle"] = detalle
+        fallidas = [nombre for nombre, resultado in comprobaciones.items() if not resultado['ok']]
+        if fallidas:
+            evento(logger, 'salud.no_disponible', logging.WARNING, fallidas=fallidas, comprobaciones=comprobaciones)
+        return {
+            "status": 'error' if fallidas else 'ok',
+            "checks": comprobaciones,
+        }
+
+    def disponibilidad(self):
+        """
+        Resultado de la sonda de disponibilidad, con ``en_cache`` y ``edad_s``
+        (antigüedad del resultado)
+        """
+        resultado, en_cache = self._resultado, True
+        if resultado is None or time.monotonic() >= self._vence:
+            with self._lock:
+                # Otra petición pudo evaluar mientras se esperaba el lock
+                if self._resultado is None or time.monotonic() >= self._vence:
+                    self._resultado = self._evaluar()
+                    self._generado = time.monotonic()
+                    self._vence = self._generado + self.ttl
+                    en_cache = False
+                resultado = self._resultado
+        return {
+            **resultado,
+            "en_cache": en_cache,
+            "edad_s": round(time.monotonic() - self._generado, 2),
+        }
+
+    def invalidar(self):
+        with self._lock:
+            self._resultado = None
+
+sondas = Sondas(settings.SISE_SALUD_TTL)
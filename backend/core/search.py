@@ -0,0 +1,129 @@
+"""
+Búsqueda de usuarios por nombre, apellido y email sin distinguir tildes.
+
+Cada usuario guarda en ``User.busqueda`` su texto normalizado (minúsculas,
+sin tildes ni signos). Sobre esa columna:
+
+* SQLite usa la tabla FTS5 ``core_user_fts``, sincronizada por triggers.
+* PostgreSQL usa un índice GIN sobre ``to_tsvector('simple', busqueda)``.
+* Otros motores filtran con LIKE sobre la columna normalizada.
+
+Cada término se busca como prefijo ("gom" encuentra "Gómez") y los
+resultados se ordenan por relevancia cuando no se pide otro orden.
+"""
+import re
+import unicodedata
+from django.db import connections, models
+from django.db.models import BooleanField, F, FloatField, Lookup, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+def normalizar(texto):
+    """
+    Minúsculas, sin tildes y con cualquier signo convertido en espacio
+    """
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', texto))
+
+def texto_busqueda(nombre, apellido, email):
+    """
+    Valor de User.busqueda. Quien cree usuarios con bulk_create debe
+    asignarlo explícitamente porque no pasa por las señales.
+    """
+    return normalizar(f'{nombre} {apellido} {email}')
+
+# Objetos creados por la migración 0005_user_busqueda
+OBJETOS_FTS5 = ('core_user_fts', 'core_user_fts_ai', 'core_user_fts_ad', 'core_user_fts_au')
+
+class Match(Lookup):
+    """
+    ``columna MATCH consulta`` de FTS5
+    """
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+class CampoFTS5(models.TextField):
+    """
+    Columna de una tabla virtual FTS5; admite el lookup ``__match``
+    """
+
+CampoFTS5.register_lookup(Match)
+
+def fts5_disponible(connection):
+    """
+    Indica si la base SQLite tiene la tabla FTS5 de usuarios y sus triggers.
+    Si una migración reconstruye core_user, SQLite borra los triggers: en ese
+    caso se usa la búsqueda genérica en lugar de un índice desactualizado.
+    """
+    if not hasattr(connection, '_sise_fts5'):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(OBJETOS_FTS5))})",
+                OBJETOS_FTS5
+            )
+            connection._sise_fts5 = cursor.fetchone()[0] == len(OBJETOS_FTS5)
+    return connection._sise_fts5
+
+class UserSearch:
+    """
+    Filtra y anota con ``rango`` un queryset de usuarios. ``orden`` indica
+    cómo ordenar por relevancia en el motor activo.
+    """
+    @staticmethod
+    def buscar(queryset, texto):
+        terminos = normalizar(texto).split()
+        if not terminos:
+            return queryset, None
+        connection = connections[queryset.db]
+        if connection.vendor == 'sqlite' and fts5_disponible(connection):
+            return UserSearch._sqlite(queryset, terminos)
+        if connection.vendor == 'postgresql':
+            return UserSearch._postgresql(queryset, terminos)
+        return UserSearch._generica(queryset, terminos)
+
+    @staticmethod
+    def _sqlite(queryset, terminos):
+        consulta = ' '.join(f'"{termino}"*' for termino in terminos)
+        # El filtro sobre la relación fts produce un INNER JOIN, así SQLite
+        # recorre primero el índice FTS5 y luego busca cada usuario por id
+        queryset = queryset.filter(fts__busqueda__match=consulta).annotate(rango=F('fts__rank'))
+        # rank (bm25) es menor para los resultados más relevantes
+        return queryset, 'rango'
+
+    @staticmethod
+    def _postgresql(queryset, terminos):
+        consulta = ' & '.join(f'{termino}:*' for termino in terminos)
+        tabla = queryset.model._meta.db_table
+        vector = f"to_tsvector('simple', \"{tabla}\".\"busqueda\")"
+        queryset = queryset.filter(
+            RawSQL(f"{vector} @@ to_tsquery('simple', %s)", [consulta], output_field=BooleanField())
+        ).annotate(rango=RawSQL(
+            f"ts_rank({vector}, to_tsquery('simple', %s))", [consulta], output_field=FloatField()
+        ))
+        return queryset, '-rango'
+
+    @staticmethod
+    def _generica(queryset, terminos):
+        for termino in terminos:
+            queryset = queryset.filter(
+                Q(busqueda__startswith=termino) | Q(busqueda__contains=f' {termino}')
+            )
+        return queryset.annotate(rango=Value(0.0, output_field=FloatField())), None
+
+class UserSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter de DRF respaldado por UserSearch. Debe ir después de
+    OrderingFilter: si el cliente no pidió un orden, ordena por relevancia.
+    """
+    def filter_queryset(self, request, queryset, view):
+        texto = ' '.join(self.get_search_terms(request))
+        queryset, orden = UserSearch.buscar(queryset, texto)
+        if orden and not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by(orden, *queryset.query.order_by)
+        return queryset
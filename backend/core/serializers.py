@@ -1,11 +1,46 @@
+import os
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.urls import reverse
+from django.utils.text import get_valid_filename
 from rest_framework import serializers
-from .models import User, Rol
+from .models import (
+    User, Rol, Grado, Grupo, Asignatura, Asistencia, Calificacion, CargaAdjunto, DocenteAsignaturaGrupo,
+    Periodo, Planeacion, ResumenPeriodo, TipoObservacion, Trabajo
+)
 
 class RolSerializer(serializers.ModelSerializer):
     class Meta:
         model = Rol
         fields = ['id', 'nombre']
 
+class GradoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Grado
+        fields = ['id', 'nombre']
+
+class GrupoSerializer(serializers.ModelSerializer):
+    grado_nombre = serializers.CharField(source='grado.nombre', read_only=True)
+    
+    class Meta:
+        model = Grupo
+        fields = ['id', 'nombre', 'grado', 'grado_nombre']
+
+class AsignaturaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Asignatura
+        fields = ['id', 'nombre']
+
+class PeriodoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Periodo
+        fields = ['id', 'nombre', 'fecha_inicio', 'fecha_fin']
+
+class TipoObservacionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TipoObservacion
+        fields = ['id', 'nombre']
+
 class UserSerializer(serializers.ModelSerializer):
     rol_nombre = serializers.CharField(source='rol.nombre', read_only=True)
     password = serializers.CharField(write_only=True, required=False)
@@ -56,8 +91,8 @@ class UserDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
-        fields = ['id', 'email', 'nombre', 'apellido', 'rol', 'rol_nombre', 'is_active', 'is_staff', 'date_joined', 'last_login']
-        read_only_fields = ['date_joined', 'last_login']
+        fields = ['id', 'email', 'nombre', 'apellido', 'rol', 'rol_nombre', 'is_active', 'is_staff', 'last_login']
+        read_only_fields = ['last_login']
 
 class UserUpdateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -78,4 +113,173 @@ class ChangePasswordSerializer(serializers.Serializer):
     def validate(self, attrs):
         if attrs['new_password'] != attrs['confirm_password']:
             raise serializers.ValidationError({"detail": "Las contraseñas nuevas no coinciden"})
-        return attrs 
\ No newline at end of file
+        return attrs
+
+class RegistroAsistenciaSerializer(serializers.Serializer):
+    estudiante = serializers.IntegerField()
+    estado = serializers.ChoiceField(choices=Asistencia.ESTADO_CHOICES)
+    observaciones = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+class AsistenciaMasivaSerializer(serializers.Serializer):
+    grupo = serializers.PrimaryKeyRelatedField(queryset=Grupo.objects.all())
+    fecha = serializers.DateField()
+    registros = RegistroAsistenciaSerializer(many=True, allow_empty=False)
+
+class RegistroCalificacionSerializer(serializers.Serializer):
+    estudiante = serializers.IntegerField()
+    nota = serializers.DecimalField(
+        max_digits=3, decimal_places=1,
+        min_value=Calificacion.NOTA_MINIMA, max_value=Calificacion.NOTA_MAXIMA
+    )
+    observaciones = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+class PlanillaCalificacionesSerializer(serializers.Serializer):
+    asignacion = serializers.PrimaryKeyRelatedField(queryset=DocenteAsignaturaGrupo.objects.all())
+    periodo = serializers.PrimaryKeyRelatedField(queryset=Periodo.objects.all())
+    # Las filas se validan una a una en CalificacionService para informar
+    # los errores por fila sin rechazar la planilla completa
+    registros = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+class ResumenPeriodoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResumenPeriodo
+        fields = [
+            'estudiante', 'periodo', 'notas', 'promedio_general', 'presentes', 'ausencias',
+            'tardanzas', 'justificadas', 'observaciones', 'observaciones_por_tipo', 'actualizado'
+        ]
+
+class ConsultaResumenAsistenciaSerializer(serializers.Serializer):
+    agrupacion = serializers.ChoiceField(choices=['dia', 'semana', 'periodo'], default='dia')
+    grupo = serializers.PrimaryKeyRelatedField(queryset=Grupo.objects.all(), required=False)
+    desde = serializers.DateField(required=False)
+    hasta = serializers.DateField(required=False)
+    
+    def validate(self, attrs):
+        if attrs['agrupacion'] != 'periodo' and not (attrs.get('desde') and attrs.get('hasta')):
+            raise serializers.ValidationError({"detail": "Debe indicar las fechas desde y hasta"})
+        if attrs.get('desde') and attrs.get('hasta') and attrs['desde'] > attrs['hasta']:
+            raise serializers.ValidationError({"detail": "La fecha desde es posterior a la fecha hasta"})
+        return attrs
+
+class ExportacionSerializer(serializers.Serializer):
+    formato = serializers.ChoiceField(choices=['csv', 'xlsx'], default='csv')
+
+class ExportacionCalificacionesSerializer(ExportacionSerializer):
+    periodo = serializers.PrimaryKeyRelatedField(queryset=Periodo.objects.all())
+    grupo = serializers.PrimaryKeyRelatedField(queryset=Grupo.objects.all(), required=False)
+
+class ExportacionAsistenciasSerializer(ExportacionSerializer):
+    desde = serializers.DateField()
+    hasta = serializers.DateField()
+    grupo = serializers.PrimaryKeyRelatedField(queryset=Grupo.objects.all(), required=False)
+    
+    def validate(self, attrs):
+        if attrs['desde'] > attrs['hasta']:
+            raise serializers.ValidationError({"detail": "La fecha desde es posterior a la fecha hasta"})
+        return attrs
+
+class RegistroMatriculaSerializer(serializers.Serializer):
+    email = serializers.EmailField(max_length=254)
+    nombre = serializers.CharField(max_length=100)
+    apellido = serializers.CharField(max_length=100)
+    password = serializers.CharField(required=False, allow_blank=True, trim_whitespace=False)
+    # El grupo se indica por id o por nombre de grado y grupo
+    grupo_id = serializers.IntegerField(required=False)
+    grado = serializers.CharField(required=False)
+    grupo = serializers.CharField(required=False)
+    
+    def validate(self, attrs):
+        if 'grupo_id' not in attrs and not (attrs.get('grado') and attrs.get('grupo')):
+            raise serializers.ValidationError({"detail": "Debe indicar grupo_id o grado y grupo"})
+        return attrs
+
+class ImportarMatriculaSerializer(serializers.Serializer):
+    archivo = serializers.FileField(required=False)
+    registros = serializers.ListField(child=serializers.DictField(), required=False, allow_empty=False)
+    password_por_defecto = serializers.CharField(required=False, trim_whitespace=False)
+    parcial = serializers.BooleanField(default=False)
+    simular = serializers.BooleanField(default=False)
+    
+    def validate(self, attrs):
+        if ('archivo' in attrs) == ('registros' in attrs):
+            raise serializers.ValidationError({"detail": "Debe enviar un archivo CSV/JSON o la lista de registros"})
+        return attrs
+
+class NuevaCargaAdjuntoSerializer(serializers.Serializer):
+    nombre = serializers.CharField(max_length=255)
+    tamano = serializers.IntegerField(min_value=1)
+    
+    def validate_nombre(self, valor):
+        # Mismo saneamiento que el almacenamiento al completar la carga: un
+        # nombre sin caracteres válidos fallaría después de subir todo el archivo
+        try:
+            get_valid_filename(os.path.basename(valor))
+        except SuspiciousFileOperation:
+            raise serializers.ValidationError("El nombre no es un nombre de archivo válido")
+        return valor
+    
+    def validate_tamano(self, valor):
+        if valor > settings.SISE_ADJUNTO_MAX_BYTES:
+            raise serializers.ValidationError(
+                f"El archivo supera el tamaño máximo de {settings.SISE_ADJUNTO_MAX_BYTES} bytes"
+            )
+        return valor
+
+class CargaAdjuntoSerializer(serializers.ModelSerializer):
+    # Tamaño máximo de cada fragmento que acepta el servidor
+    fragmento_maximo = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = CargaAdjunto
+        fields = [
+            'id', 'planeacion', 'nombre', 'tamano', 'recibido', 'completa', 'archivo_adjunto', 'fragmento_maximo',
+            'creada', 'actualizada'
+        ]
+    
+    def get_fragmento_maximo(self, obj):
+        return settings.SISE_CARGA_FRAGMENTO_MAX_BYTES
+
+class TransicionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    estado = serializers.ChoiceField(choices=[estado for estado, _ in Planeacion.ESTADO_CHOICES])
+
+class TransicionesPlaneacionSerializer(serializers.Serializer):
+    # Planeaciones por petición
+    MAXIMO = 1000
+    
+    transiciones = serializers.ListField(child=TransicionSerializer(), allow_empty=False, max_length=MAXIMO)
+
+class ReconstruirResumenesSerializer(serializers.Serializer):
+    # Ids de los períodos; todos si no se indican
+    periodos = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+class NuevoTrabajoSerializer(serializers.Serializer):
+    tipo = serializers.CharField(max_length=50)
+    parametros = serializers.DictField(required=False, default=dict)
+    prioridad = serializers.IntegerField(min_value=-10, max_value=10, default=0)
+    
+    def validate(self, attrs):
+        # Import diferido: core.trabajos importa este módulo
+        from .trabajos import TAREAS
+        tarea = TAREAS.get(attrs['tipo'])
+        if tarea is None:
+            raise serializers.ValidationError({"tipo": f"Tipo de trabajo desconocido: {attrs['tipo']}"})
+        _, errores = tarea.validar(attrs['parametros'])
+        if errores:
+            raise serializers.ValidationError({"parametros": errores})
+        return attrs
+
+class TrabajoSerializer(serializers.ModelSerializer):
+    # URL de descarga del archivo generado, si lo hay
+    archivo = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Trabajo
+        fields = [
+            'id', 'tipo', 'estado', 'prioridad', 'intentos', 'max_intentos', 'creado', 'iniciado',
+            'terminado', 'resultado', 'error', 'archivo'
+        ]
+    
+    def get_archivo(self, obj):
+        return reverse('api:trabajo-archivo', args=[obj.id]) if obj.archivo else None
+
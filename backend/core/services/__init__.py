@@ -1,4 +1,22 @@
 from .auth_service import AuthService
 from .user_service import UserService
+from .asistencia_service import AsistenciaService
+from .calificacion_service import CalificacionService
+from .resumen_service import ResumenService
+from .resumen_asistencia_service import ResumenAsistenciaService
+from .exportacion_service import ExportacionService
+from .matricula_service import MatriculaService
+from .panel_service import PanelService
+from .carga_docente_service import CargaDocenteService
+from .carga_adjunto_service import CargaAdjuntoService
+from .blob_adjunto_service import BlobAdjuntoService
+from .planeacion_service import PlaneacionService
+from .notificacion_service import NotificacionService
+from .trabajo_service import TrabajoService
 
-__all__ = ['AuthService', 'UserService'] 
\ No newline at end of file
+__all__ = [
+    'AuthService', 'UserService', 'AsistenciaService', 'CalificacionService',
+    'ResumenService', 'ResumenAsistenciaService', 'ExportacionService', 'MatriculaService',
+    'PanelService', 'CargaDocenteService', 'CargaAdjuntoService', 'BlobAdjuntoService',
+    'PlaneacionService', 'NotificacionService', 'TrabajoService'
+] 
\ No newline at end of file
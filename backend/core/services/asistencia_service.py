@@ -0,0 +1,100 @@
+from django.db import transaction
+from ..models import Asistencia, DocenteAsignaturaGrupo, Estudiante
+from .notificacion_service import NotificacionService
+from .resumen_service import ResumenService
+from .resumen_asistencia_service import ResumenAsistenciaService
+
+class AsistenciaService:
+    # Tamaño de lote para los INSERT ... ON CONFLICT del registro masivo
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def puede_registrar(usuario, grupo):
+        """
+        Indica si el usuario puede tomar asistencia en el grupo
+        """
+        if usuario.is_staff:
+            return True
+        return DocenteAsignaturaGrupo.objects.filter(docente=usuario, grupo=grupo).exists()
+
+    @staticmethod
+    def registrar_grupo(grupo, fecha, registros, usuario):
+        """
+        Registra la asistencia de todo un grupo en una sola transacción.
+
+        Cada registro es un dict con ``estudiante``, ``estado`` y ``observaciones``.
+        Las filas se insertan o actualizan con un único upsert sobre la
+        restricción (estudiante, fecha); el resultado se informa por fila.
+        """
+        ids = [registro['estudiante'] for registro in registros]
+        ids_grupo = set(
+            Estudiante.objects.filter(grupo=grupo, id__in=ids).values_list('id', flat=True)
+        )
+
+        resultados = []
+        filas = {}
+        for registro in registros:
+            estudiante_id = registro['estudiante']
+            if estudiante_id not in ids_grupo:
+                resultados.append({
+                    "estudiante": estudiante_id,
+                    "resultado": "error",
+                    "detalle": "El estudiante no pertenece al grupo"
+                })
+                continue
+            if estudiante_id in filas:
+                resultados.append({
+                    "estudiante": estudiante_id,
+                    "resultado": "error",
+                    "detalle": "El estudiante está repetido en la solicitud"
+                })
+                continue
+            filas[estudiante_id] = Asistencia(
+                estudiante_id=estudiante_id,
+                fecha=fecha,
+                estado=registro['estado'],
+                observaciones=registro.get('observaciones') or None,
+                registrada_por=usuario
+            )
+            resultados.append({"estudiante": estudiante_id, "resultado": None})
+
+        with transaction.atomic():
+            existentes = dict(
+                Asistencia.objects.filter(fecha=fecha, estudiante_id__in=filas.keys())
+                .values_list('estudiante_id', 'estado')
+            )
+            if filas:
+                Asistencia.objects.bulk_create(
+                    filas.values(),
+                    batch_size=AsistenciaService.BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=['estudiante', 'fecha'],
+                    update_fields=['estado', 'observaciones', 'registrada_por']
+                )
+                # bulk_create no emite señales: los resúmenes se actualizan aquí
+                ResumenService.recalcular_por_fecha(filas.keys(), fecha)
+                ResumenAsistenciaService.recalcular([(grupo.id, fecha)])
+                # Avisos a acudientes de quienes pasan a ausentes, en la misma
+                # transacción; los de quienes dejan de estarlo se retiran
+                NotificacionService.encolar_ausencias([
+                    estudiante_id for estudiante_id, fila in filas.items()
+                    if fila.estado == 'A' and existentes.get(estudiante_id) != 'A'
+                ], fecha)
+                NotificacionService.retirar_ausencias([
+                    estudiante_id for estudiante_id, fila in filas.items()
+                    if fila.estado != 'A' and existentes.get(estudiante_id) == 'A'
+                ], fecha)
+
+        for resultado in resultados:
+            if resultado["resultado"] is None:
+                existia = resultado["estudiante"] in existentes
+                resultado["resultado"] = "actualizado" if existia else "creado"
+
+        return {
+            "grupo": grupo.id,
+            "fecha": fecha,
+            "creados": sum(1 for r in resultados if r["resultado"] == "creado"),
+            "actualizados": sum(1 for r in resultados if r["resultado"] == "actualizado"),
+            "errores": sum(1 for r in resultados if r["resultado"] == "error"),
+            "resultados": resultados
+        }
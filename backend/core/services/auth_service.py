@@ -1,7 +1,13 @@
+import logging
 from rest_framework.authtoken.models import Token
 from rest_framework import status
 from rest_framework.response import Response
+from ..authentication import token_expirado
+from ..logs import evento, get_logger
 from ..models import User
+from .. import roles
+
+logger = get_logger('auth')
 
 class AuthService:
     @staticmethod
@@ -9,32 +15,28 @@ class AuthService:
         """
         Normaliza el nombre del rol para asegurar consistencia
         """
-        if not role:
-            return "Estudiante"
-            
-        # Diccionario de conversión de roles
-        roles = {
-            "administrador": "Administrador",
-            "docente": "Docente",
-            "estudiante": "Estudiante",
-            "acudiente": "Acudiente",
-            "coordinador": "Coordinador"
-        }
-        
-        # Normalizar a minúsculas y buscar en el diccionario
-        normalized_role = roles.get(role.lower(), "Estudiante")
-        return normalized_role
+        return roles.normalizar(role)
+    
+    @staticmethod
+    def emitir_token(user):
+        """
+        Devuelve ``(token, creado)``: el token vigente del usuario, o uno nuevo
+        si no tenía o el anterior venció
+        """
+        token, created = Token.objects.get_or_create(user=user)
+        if not created and token_expirado(token):
+            token.delete()
+            token = Token.objects.create(user=user)
+            created = True
+        return token, created
     
     @staticmethod
     def login(email, password):
         """
         Maneja el proceso de inicio de sesión
         """
-        print(f"\n=== INICIO DE LOGIN ===")
-        print(f"Email recibido: {email}")
-        
         if not email or not password:
-            print("Email o contraseña no proporcionados")
+            evento(logger, 'auth.login', logging.WARNING, resultado='sin_credenciales', email=email)
             return Response(
                 {"detail": "Por favor proporcione email y contraseña"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -42,32 +44,24 @@ class AuthService:
         
         try:
             user_obj = User.objects.get(email=email)
-            print(f"Usuario encontrado: {user_obj.email}")
-            print(f"Rol del usuario (DB): {user_obj.rol.nombre if user_obj.rol else 'Sin rol'}")
-            print(f"¿Está activo? {user_obj.is_active}")
             
             if not user_obj.is_active:
-                print("Usuario inactivo")
+                evento(logger, 'auth.login', logging.WARNING, resultado='inactivo', user_id=user_obj.id)
                 return Response(
                     {"detail": "El usuario está inactivo"},
                     status=status.HTTP_401_UNAUTHORIZED
                 )
             
             if user_obj.check_password(password):
-                print("Contraseña correcta")
-                # Obtener y normalizar el rol
-                raw_role = user_obj.rol.nombre if user_obj.rol else "Estudiante"
-                rol = AuthService.normalize_role(raw_role)
-                print(f"Rol original: {raw_role}")
-                print(f"Rol normalizado: {rol}")
+                # Obtener y normalizar el rol desde el registro (sin consultar Rol)
+                raw_role = roles.registro.nombre(user_obj.rol_id)
+                rol = roles.normalizar(raw_role)
                 
-                # Crear o obtener el token
-                token, created = Token.objects.get_or_create(user=user_obj)
-                print(f"Token generado: {token.key[:10]}... {'(creado nuevo)' if created else '(existente)'}")
+                # Crear u obtener el token (uno nuevo si el anterior venció)
+                token, created = AuthService.emitir_token(user_obj)
                 
                 # Determinar si es admin basado en el rol normalizado
-                is_admin = rol == "Administrador"
-                print(f"¿Es administrador?: {is_admin}")
+                is_admin = rol == roles.ADMINISTRADOR
                 
                 user_data = {
                     "id": user_obj.id,
@@ -81,23 +75,26 @@ class AuthService:
                     "token": token.key
                 }
                 
-                print(f"Datos del usuario enviados: {user_data}")
-                print("=== FIN DE LOGIN ===\n")
+                evento(
+                    logger, 'auth.login', resultado='ok', user_id=user_obj.id,
+                    rol=rol, rol_original=raw_role, token_nuevo=created
+                )
+                evento(logger, 'auth.login.respuesta', logging.DEBUG, datos=user_data)
                 return Response(user_data)
             else:
-                print("Contraseña incorrecta")
+                evento(logger, 'auth.login', logging.WARNING, resultado='password_incorrecto', user_id=user_obj.id)
                 return Response(
                     {"detail": "Contraseña incorrecta"},
                     status=status.HTTP_401_UNAUTHORIZED
                 )
         except User.DoesNotExist:
-            print("Usuario no encontrado")
+            evento(logger, 'auth.login', logging.WARNING, resultado='no_existe', email=email)
             return Response(
                 {"detail": "No existe un usuario con este correo electrónico"},
                 status=status.HTTP_401_UNAUTHORIZED
             )
-        except Exception as e:
-            print(f"Error inesperado: {str(e)}")
+        except Exception:
+            evento(logger, 'auth.login', logging.ERROR, exc_info=True, resultado='error', email=email)
             return Response(
                 {"detail": "Error durante el proceso de autenticación"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -108,16 +105,11 @@ class AuthService:
         """
         Obtiene la información del usuario actual
         """
-        print(f"\n=== OBTENER USUARIO ACTUAL ===")
         try:
-            # Obtener y normalizar el rol
-            raw_role = user.rol.nombre if user.rol else "Estudiante"
-            rol = AuthService.normalize_role(raw_role) 
-            print(f"Rol original: {raw_role}")
-            print(f"Rol normalizado: {rol}")
+            # Obtener y normalizar el rol desde el registro (sin consultar Rol)
+            rol = roles.registro.nombre_normalizado(user.rol_id)
             
-            is_admin = rol == "Administrador"
-            print(f"¿Es administrador?: {is_admin}")
+            is_admin = rol == roles.ADMINISTRADOR
             
             data = {
                 "id": user.id,
@@ -130,11 +122,10 @@ class AuthService:
                 "is_admin": is_admin
             }
             
-            print(f"Datos del usuario actual enviados: {data}")
-            print("=== FIN DE OBTENER USUARIO ===\n")
+            evento(logger, 'auth.usuario_actual', logging.DEBUG, user_id=user.id, rol=rol)
             return Response(data)
-        except Exception as e:
-            print(f"Error al obtener usuario: {str(e)}")
+        except Exception:
+            evento(logger, 'auth.usuario_actual', logging.ERROR, exc_info=True, user_id=user.id)
             return Response(
                 {"detail": "Error al obtener información del usuario"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -145,9 +136,8 @@ class AuthService:
         """
         Maneja el proceso de cierre de sesión
         """
-        print(f"\n=== LOGOUT ===")
-        if hasattr(user, 'auth_token'):
+        token_eliminado = hasattr(user, 'auth_token')
+        if token_eliminado:
             user.auth_token.delete()
-            print("Token eliminado")
-        print("=== FIN DE LOGOUT ===\n")
+        evento(logger, 'auth.logout', user_id=user.id, token_eliminado=token_eliminado)
         return Response({"detail": "Sesión cerrada correctamente"}) 
\ No newline at end of file
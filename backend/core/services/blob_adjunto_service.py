@@ -0,0 +1,98 @@
+import datetime
+import os
+from collections import Counter
+from django.conf import settings
+from django.utils import timezone
+from ..almacenamiento import ArchivoEnDisco, ajustar_referencias, almacenamiento_adjuntos, hash_de_nombre
+from ..models import BlobAdjunto, Planeacion
+
+class BlobAdjuntoService:
+    @staticmethod
+    def _adjuntos():
+        return (
+            Planeacion.objects.exclude(archivo_adjunto__isnull=True).exclude(archivo_adjunto='')
+            .values_list('archivo_adjunto', flat=True)
+        )
+
+    @staticmethod
+    def recontar():
+        """
+        Recalcula las referencias de todos los blobs a partir de las
+        planeaciones (por si alguna escritura masiva no pasó por las señales)
+        y devuelve cuántos blobs se corrigieron
+        """
+        conteo = Counter(hash_de_nombre(nombre) for nombre in BlobAdjuntoService._adjuntos().iterator())
+        corregidos = []
+        for blob in BlobAdjunto.objects.all().iterator():
+            referencias = conteo.get(blob.sha256, 0)
+            if blob.referencias != referencias:
+                blob.referencias = referencias
+                corregidos.append(blob)
+        BlobAdjunto.objects.bulk_update(corregidos, ['referencias'], batch_size=500)
+        return len(corregidos)
+
+    @staticmethod
+    def recolectar(simular=False):
+        """
+        Borra los blobs sin referencias desde hace más de
+        ``SISE_BLOBS_GRACIA_HORAS`` y devuelve ``(blobs, bytes)`` liberados.
+
+        El archivo se aparta antes de borrar la fila: si entretanto una carga
+        volvió a usar el blob, la fila ya no cumple la condición y el archivo
+        se devuelve a su lugar.
+        """
+        almacenamiento = almacenamiento_adjuntos()
+        limite = timezone.now() - datetime.timedelta(hours=settings.SISE_BLOBS_GRACIA_HORAS)
+        candidatos = BlobAdjunto.objects.filter(referencias=0, usado__lt=limite)
+        blobs = liberados = 0
+        for sha256 in list(candidatos.values_list('sha256', flat=True)):
+            ruta = almacenamiento.ruta_blob(sha256)
+            try:
+                tamano = os.path.getsize(ruta)
+            except FileNotFoundError:
+                tamano = 0
+            if simular:
+                blobs += 1
+                liberados += tamano
+                continue
+
+            apartado = f'{ruta}.borrar'
+            if tamano:
+                os.replace(ruta, apartado)
+            borradas, _ = candidatos.filter(sha256=sha256).delete()
+            if not borradas:
+                if tamano:
+                    os.replace(apartado, ruta)
+                continue
+            if tamano:
+                os.remove(apartado)
+            blobs += 1
+            liberados += tamano
+        return blobs, liberados
+
+    @staticmethod
+    def importar_existentes():
+        """
+        Pasa al almacenamiento deduplicado los adjuntos guardados con su nombre
+        original y devuelve ``(archivos, bytes)``, donde bytes es el espacio de
+        las copias que ya existían como blob
+        """
+        almacenamiento = almacenamiento_adjuntos()
+        existentes = set(BlobAdjunto.objects.values_list('sha256', flat=True))
+        nombres = {nombre for nombre in BlobAdjuntoService._adjuntos() if not hash_de_nombre(nombre)}
+        archivos = liberados = 0
+        for nombre in sorted(nombres):
+            ruta = almacenamiento.path(nombre)
+            if not os.path.exists(ruta):
+                continue
+            tamano = os.path.getsize(ruta)
+            with open(ruta, 'rb') as archivo:
+                nuevo = almacenamiento.save(nombre, ArchivoEnDisco(archivo))
+            sha256 = hash_de_nombre(nuevo)
+            if sha256 in existentes:
+                liberados += tamano
+            existentes.add(sha256)
+            # update no emite señales: las referencias se suman aquí
+            ajustar_referencias(sha256, Planeacion.objects.filter(archivo_adjunto=nombre).update(archivo_adjunto=nuevo))
+            archivos += 1
+        return archivos, liberados
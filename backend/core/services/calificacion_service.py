@@ -0,0 +1,102 @@
+from django.db import transaction
+from ..models import Calificacion, Estudiante
+from ..serializers import RegistroCalificacionSerializer
+from .resumen_service import ResumenService
+
+class CalificacionService:
+    # Tamaño de lote para los INSERT ... ON CONFLICT de la planilla
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def puede_calificar(usuario, asignacion):
+        """
+        Indica si el usuario puede registrar notas para la asignación
+        """
+        return usuario.is_staff or asignacion.docente_id == usuario.id
+
+    @staticmethod
+    def registrar_planilla(asignacion, periodo, registros):
+        """
+        Valida y guarda la planilla de notas de una asignación en un período.
+
+        Todas las filas se validan antes de escribir (rango de la nota y
+        pertenencia del estudiante al grupo). Las filas válidas se insertan o
+        actualizan con un único upsert sobre (estudiante, asignatura, periodo);
+        las inválidas se informan por fila sin abortar el resto de la planilla.
+        El número de consultas no depende del tamaño de la planilla (solo el
+        upsert se divide en lotes de ``BATCH_SIZE`` filas).
+        """
+        resultados = []
+        validos = []
+        for indice, registro in enumerate(registros):
+            serializer = RegistroCalificacionSerializer(data=registro)
+            if serializer.is_valid():
+                datos = serializer.validated_data
+                validos.append((indice, datos))
+                resultados.append({"fila": indice, "estudiante": datos['estudiante'], "resultado": None})
+            else:
+                resultados.append({
+                    "fila": indice,
+                    "estudiante": registro.get('estudiante'),
+                    "resultado": "error",
+                    "detalle": serializer.errors
+                })
+
+        ids_grupo = set(
+            Estudiante.objects.filter(
+                grupo_id=asignacion.grupo_id,
+                id__in=[datos['estudiante'] for _, datos in validos]
+            ).values_list('id', flat=True)
+        )
+
+        filas = {}
+        for indice, datos in validos:
+            estudiante_id = datos['estudiante']
+            error = None
+            if estudiante_id not in ids_grupo:
+                error = "El estudiante no pertenece al grupo de la asignación"
+            elif estudiante_id in filas:
+                error = "El estudiante está repetido en la planilla"
+            if error:
+                resultados[indice].update({"resultado": "error", "detalle": error})
+                continue
+            filas[estudiante_id] = Calificacion(
+                estudiante_id=estudiante_id,
+                asignatura_id=asignacion.asignatura_id,
+                periodo=periodo,
+                nota=datos['nota'],
+                observaciones=datos.get('observaciones') or None
+            )
+
+        with transaction.atomic():
+            existentes = set(
+                Calificacion.objects.filter(
+                    asignatura_id=asignacion.asignatura_id,
+                    periodo=periodo,
+                    estudiante_id__in=filas.keys()
+                ).values_list('estudiante_id', flat=True)
+            )
+            if filas:
+                Calificacion.objects.bulk_create(
+                    filas.values(),
+                    batch_size=CalificacionService.BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=['estudiante', 'asignatura', 'periodo'],
+                    update_fields=['nota', 'observaciones']
+                )
+                # bulk_create no emite señales: el resumen se actualiza aquí
+                ResumenService.recalcular(filas.keys(), periodo)
+
+        for resultado in resultados:
+            if resultado["resultado"] is None:
+                existia = resultado["estudiante"] in existentes
+                resultado["resultado"] = "actualizado" if existia else "creado"
+
+        return {
+            "asignacion": asignacion.id,
+            "periodo": periodo.id,
+            "creados": sum(1 for r in resultados if r["resultado"] == "creado"),
+            "actualizados": sum(1 for r in resultados if r["resultado"] == "actualizado"),
+            "errores": sum(1 for r in resultados if r["resultado"] == "error"),
+            "resultados": resultados
+        }
@@ -0,0 +1,116 @@
+import datetime
+import os
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from ..almacenamiento import ArchivoEnDisco
+from ..logs import evento, get_logger
+from ..models import CargaAdjunto
+
+logger = get_logger('cargas')
+
+class CargaAdjuntoService:
+    """
+    Carga por partes del adjunto de una planeación.
+
+    El cliente crea la carga con el nombre y el tamaño del archivo y envía
+    los fragmentos en orden con ``Content-Range: bytes inicio-fin/total``;
+    si se interrumpe, consulta ``recibido`` y continúa desde ahí. Cada
+    fragmento se copia del cuerpo de la petición al archivo parcial en
+    bloques de ``BLOQUE`` bytes, así que la memoria usada no depende del
+    tamaño del archivo. Con el último fragmento el parcial se entrega al
+    almacenamiento del campo (que lo deduplica) y pasa a ser el adjunto; la
+    carga queda marcada como completa hasta que ``limpiar_vencidas`` la
+    elimina, así que repetir el último fragmento devuelve el mismo resultado.
+    """
+    # Bytes copiados por iteración del cuerpo de la petición al archivo
+    BLOQUE = 64 * 1024
+    DIRECTORIO = 'cargas'
+
+    @staticmethod
+    def ruta_parcial(carga):
+        return default_storage.path(f'{CargaAdjuntoService.DIRECTORIO}/{carga.id}.part')
+
+    @staticmethod
+    def crear(planeacion, usuario, nombre, tamano):
+        carga = CargaAdjunto.objects.create(
+            planeacion=planeacion, usuario=usuario, nombre=os.path.basename(nombre), tamano=tamano
+        )
+        ruta = CargaAdjuntoService.ruta_parcial(carga)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        open(ruta, 'wb').close()
+        return carga
+
+    @staticmethod
+    def vencida(carga):
+        limite = timezone.now() - datetime.timedelta(hours=settings.SISE_CARGA_VIGENCIA_HORAS)
+        return carga.actualizada < limite
+
+    @staticmethod
+    def escribir(carga, inicio, longitud, flujo):
+        """
+        Escribe un fragmento de ``longitud`` bytes leído de ``flujo`` en la
+        posición ``inicio`` (que debe ser ``carga.recibido``).
+
+        Devuelve la planeación si el fragmento completó el archivo, o None.
+        Lanza ValueError si el cuerpo trae menos bytes de los anunciados y
+        CargaAdjunto.DoesNotExist si otra petición ya escribió esa posición
+        (la carga se debe consultar de nuevo).
+        """
+        with open(CargaAdjuntoService.ruta_parcial(carga), 'r+b') as parcial:
+            parcial.seek(inicio)
+            restante = longitud
+            while restante:
+                datos = flujo.read(min(CargaAdjuntoService.BLOQUE, restante)) if flujo else b''
+                if not datos:
+                    raise ValueError('El cuerpo de la petición es más corto que el fragmento')
+                parcial.write(datos)
+                restante -= len(datos)
+
+        # Si dos peticiones envían el mismo fragmento, solo una avanza la carga;
+        # escribieron los mismos bytes en la misma posición
+        avanzadas = CargaAdjunto.objects.filter(pk=carga.pk, recibido=inicio).update(
+            recibido=inicio + longitud, actualizada=timezone.now()
+        )
+        if not avanzadas:
+            raise CargaAdjunto.DoesNotExist()
+        carga.recibido = inicio + longitud
+        if carga.recibido == carga.tamano:
+            return CargaAdjuntoService._completar(carga)
+        return None
+
+    @staticmethod
+    def _completar(carga):
+        planeacion = carga.planeacion
+        with open(CargaAdjuntoService.ruta_parcial(carga), 'rb') as parcial:
+            with transaction.atomic():
+                # save=False y luego save(update_fields): solo se escribe la columna del adjunto
+                planeacion.archivo_adjunto.save(carga.nombre, ArchivoEnDisco(parcial), save=False)
+                planeacion.save(update_fields=['archivo_adjunto'])
+                carga.completa = True
+                carga.archivo_adjunto = planeacion.archivo_adjunto.name
+                carga.save(update_fields=['completa', 'archivo_adjunto', 'actualizada'])
+        nombre = planeacion.archivo_adjunto.name
+        evento(logger, 'carga.completada', planeacion=planeacion.id, archivo=nombre, bytes=carga.tamano)
+        return planeacion
+
+    @staticmethod
+    def cancelar(carga):
+        try:
+            os.remove(CargaAdjuntoService.ruta_parcial(carga))
+        except FileNotFoundError:
+            pass
+        carga.delete()
+
+    @staticmethod
+    def limpiar_vencidas():
+        """
+        Elimina las cargas sin actividad en ``SISE_CARGA_VIGENCIA_HORAS`` y
+        sus archivos parciales; devuelve cuántas se eliminaron
+        """
+        limite = timezone.now() - datetime.timedelta(hours=settings.SISE_CARGA_VIGENCIA_HORAS)
+        vencidas = list(CargaAdjunto.objects.filter(actualizada__lt=limite))
+        for carga in vencidas:
+            CargaAdjuntoService.cancelar(carga)
+        return len(vencidas)
@@ -0,0 +1,73 @@
+from ..models import Asistencia, DocenteAsignaturaGrupo, Estudiante, Planeacion
+
+class CargaDocenteService:
+    # Estados de planeación que el docente todavía tiene pendientes
+    PLANEACIONES_PENDIENTES = ('B', 'E')
+
+    @staticmethod
+    def obtener(docente, fecha):
+        """
+        Obtiene las asignaciones del docente, la lista de estudiantes de cada
+        grupo, la asistencia de ``fecha`` y las planeaciones pendientes.
+
+        Cada grupo aparece una sola vez aunque el docente tenga varias
+        asignaturas en él, y los nombres de los estudiantes se envían una
+        vez en ``estudiantes``; los grupos solo llevan los ids. Usa cuatro
+        consultas sin importar cuántos grupos tenga el docente.
+        """
+        asignaciones = (
+            DocenteAsignaturaGrupo.objects.filter(docente=docente)
+            .select_related('asignatura', 'grupo__grado')
+            .order_by('grupo__grado__nombre', 'grupo__nombre', 'asignatura__nombre')
+        )
+        grupos = {}
+        lista_asignaciones = []
+        for asignacion in asignaciones:
+            grupo = asignacion.grupo
+            grupos.setdefault(grupo.id, {
+                "id": grupo.id,
+                "nombre": grupo.nombre,
+                "grado": grupo.grado.nombre,
+                "estudiantes": [],
+            })
+            lista_asignaciones.append({
+                "id": asignacion.id,
+                "asignatura_id": asignacion.asignatura_id,
+                "asignatura": asignacion.asignatura.nombre,
+                "grupo_id": grupo.id,
+            })
+
+        estudiantes = {}
+        asistencia = {}
+        if grupos:
+            filas = (
+                Estudiante.objects.filter(grupo_id__in=grupos)
+                .order_by('user__apellido', 'user__nombre', 'id')
+                .values_list('id', 'grupo_id', 'user__nombre', 'user__apellido')
+            )
+            for estudiante_id, grupo_id, nombre, apellido in filas:
+                grupos[grupo_id]["estudiantes"].append(estudiante_id)
+                estudiantes[str(estudiante_id)] = {"nombre": nombre, "apellido": apellido}
+
+            asistencia = {
+                str(estudiante_id): estado
+                for estudiante_id, estado in Asistencia.objects.filter(
+                    estudiante__grupo_id__in=grupos, fecha=fecha
+                ).values_list('estudiante_id', 'estado')
+            }
+
+        planeaciones = (
+            Planeacion.objects.filter(docente=docente, estado__in=CargaDocenteService.PLANEACIONES_PENDIENTES)
+            .order_by('fecha', 'id')
+            .values('id', 'asignatura_id', 'grupo_id', 'fecha', 'tema', 'estado')
+        )
+
+        return {
+            "docente": {"id": docente.id, "nombre": docente.nombre, "apellido": docente.apellido},
+            "fecha": fecha,
+            "asignaciones": lista_asignaciones,
+            "grupos": list(grupos.values()),
+            "estudiantes": estudiantes,
+            "asistencia": asistencia,
+            "planeaciones_pendientes": list(planeaciones),
+        }
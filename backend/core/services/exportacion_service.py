@@ -0,0 +1,51 @@
+from ..models import User, Calificacion, Asistencia
+
+class ExportacionService:
+    """
+    Encabezados y filas de las exportaciones de Secretaría. Las filas se leen
+    con iterator() en bloques de CHUNK_SIZE y values_list, así que cada bloque
+    es una sola consulta con sus JOIN y no se instancian modelos. El orden de
+    cada consulta coincide con un índice para que la primera fila salga sin
+    esperar a que el motor ordene toda la tabla.
+    """
+    CHUNK_SIZE = 2000
+
+    @staticmethod
+    def usuarios():
+        encabezados = ['ID', 'Apellido', 'Nombre', 'Email', 'Rol', 'Activo', 'Administrador', 'Último acceso']
+        filas = User.objects.order_by('apellido', 'nombre', 'id').values_list(
+            'id', 'apellido', 'nombre', 'email', 'rol__nombre', 'is_active', 'is_staff', 'last_login'
+        )
+        return encabezados, filas.iterator(chunk_size=ExportacionService.CHUNK_SIZE)
+
+    @staticmethod
+    def calificaciones(periodo, grupo=None):
+        encabezados = ['Estudiante ID', 'Apellido', 'Nombre', 'Grado', 'Grupo', 'Asignatura', 'Período', 'Nota', 'Observaciones']
+        filas = Calificacion.objects.filter(periodo=periodo)
+        if grupo is not None:
+            filas = filas.filter(estudiante__grupo=grupo)
+        # Orden del índice único (estudiante, asignatura, periodo)
+        filas = filas.order_by('estudiante_id', 'asignatura_id').values_list(
+            'estudiante_id', 'estudiante__user__apellido', 'estudiante__user__nombre',
+            'estudiante__grupo__grado__nombre', 'estudiante__grupo__nombre',
+            'asignatura__nombre', 'periodo__nombre', 'nota', 'observaciones'
+        )
+        return encabezados, filas.iterator(chunk_size=ExportacionService.CHUNK_SIZE)
+
+    @staticmethod
+    def asistencias(desde, hasta, grupo=None):
+        encabezados = ['Fecha', 'Estudiante ID', 'Apellido', 'Nombre', 'Grado', 'Grupo', 'Estado', 'Observaciones', 'Registrada por']
+        filas = Asistencia.objects.filter(fecha__range=(desde, hasta))
+        if grupo is not None:
+            filas = filas.filter(estudiante__grupo=grupo)
+        # Orden del índice core_asist_fecha_idx
+        filas = filas.order_by('fecha', 'estudiante_id').values_list(
+            'fecha', 'estudiante_id', 'estudiante__user__apellido', 'estudiante__user__nombre',
+            'estudiante__grupo__grado__nombre', 'estudiante__grupo__nombre', 'estado',
+            'observaciones', 'registrada_por__email'
+        )
+        estados = dict(Asistencia.ESTADO_CHOICES)
+        return encabezados, (
+            (*fila[:6], estados.get(fila[6], fila[6]), *fila[7:])
+            for fila in filas.iterator(chunk_size=ExportacionService.CHUNK_SIZE)
+        )
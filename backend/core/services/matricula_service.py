@@ -0,0 +1,219 @@
+import csv
+import io
+import json
+import logging
+import time
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from ..logs import evento, get_logger
+from ..models import User, Grupo, Estudiante
+from .. import roles
+from ..passwords import hashear_passwords
+from ..search import texto_busqueda
+from ..serializers import RegistroMatriculaSerializer
+
+logger = get_logger('matricula')
+
+class MatriculaService:
+    # Tamaño de lote de los INSERT de usuarios y estudiantes
+    BATCH_SIZE = 500
+    FORMATOS = ['csv', 'json']
+
+    @staticmethod
+    def leer_archivo(contenido, formato):
+        """
+        Convierte el contenido de un archivo CSV (con encabezados) o JSON (lista
+        de objetos, o ``{"registros": [...]}``) en la lista de registros.
+        Las celdas vacías del CSV se omiten para que cuenten como no enviadas.
+        """
+        if isinstance(contenido, bytes):
+            contenido = contenido.decode('utf-8-sig')
+        if formato == 'json':
+            datos = json.loads(contenido)
+            if isinstance(datos, dict):
+                datos = datos.get('registros')
+            if not isinstance(datos, list):
+                raise ValueError('El JSON debe ser una lista de registros')
+            return datos
+        lector = csv.DictReader(io.StringIO(contenido.lstrip('\ufeff')))
+        return [
+            {clave.strip().lower(): valor.strip() for clave, valor in fila.items() if clave and valor and valor.strip()}
+            for fila in lector
+        ]
+
+    @staticmethod
+    def formato_de(nombre_archivo):
+        return 'json' if nombre_archivo.lower().endswith('.json') else 'csv'
+
+    @staticmethod
+    def _grupos():
+        """
+        Grupos por id y por (grado, grupo) en minúsculas, en una sola consulta
+        """
+        por_id = {}
+        por_nombre = {}
+        for grupo in Grupo.objects.select_related('grado'):
+            por_id[grupo.id] = grupo.id
+            por_nombre[(grupo.grado.nombre.strip().lower(), grupo.nombre.strip().lower())] = grupo.id
+        return por_id, por_nombre
+
+    @staticmethod
+    def importar(registros, password_por_defecto=None, parcial=False, simular=False, procesos=None):
+        """
+        Crea los usuarios con rol Estudiante y su Estudiante en el grupo indicado.
+
+        Todas las filas se validan antes de escribir: formato, email repetido en
+        el archivo o ya registrado, grupo existente y contraseña según
+        AUTH_PASSWORD_VALIDATORS. Si hay errores no se escribe nada, salvo con
+        ``parcial=True``, que importa las filas válidas. ``simular=True`` solo
+        valida. Las contraseñas se hashean en varios procesos (core.passwords)
+        y las filas se insertan con bulk_create en lotes de ``BATCH_SIZE``.
+        Los emails registrados por otra petición mientras se hasheaba se
+        informan como errores de fila (ver ``_guardar_filas``).
+        """
+        inicio = time.perf_counter()
+        grupos_por_id, grupos_por_nombre = MatriculaService._grupos()
+        errores = []
+        validos = []
+        for indice, registro in enumerate(registros):
+            serializer = RegistroMatriculaSerializer(data=registro)
+            if not serializer.is_valid():
+                errores.append({
+                    "fila": indice,
+                    "email": registro.get('email') if isinstance(registro, dict) else None,
+                    "detalle": serializer.errors
+                })
+                continue
+            datos = dict(serializer.validated_data)
+            datos['email'] = User.objects.normalize_email(datos['email'])
+            validos.append((indice, datos))
+
+        emails = [datos['email'] for _, datos in validos]
+        existentes = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+
+        filas = []
+        indices = {}
+        vistos = set()
+        for indice, datos in validos:
+            email = datos['email']
+            if 'grupo_id' in datos:
+                grupo_id = grupos_por_id.get(datos['grupo_id'])
+            else:
+                grupo_id = grupos_por_nombre.get((datos['grado'].strip().lower(), datos['grupo'].strip().lower()))
+            password = datos.get('password') or password_por_defecto
+            usuario = User(email=email, nombre=datos['nombre'], apellido=datos['apellido'])
+
+            error = None
+            if email in vistos:
+                error = "El email está repetido en el archivo"
+            elif email in existentes:
+                error = "Ya existe un usuario con este email"
+            elif grupo_id is None:
+                error = "El grupo no existe"
+            elif not password:
+                error = "Debe indicar una contraseña o una contraseña por defecto"
+            else:
+                try:
+                    validate_password(password, user=usuario)
+                except ValidationError as exc:
+                    error = list(exc.messages)
+            vistos.add(email)
+            if error:
+                errores.append({"fila": indice, "email": email, "detalle": error})
+            else:
+                filas.append((usuario, grupo_id, password))
+                indices[email] = indice
+        validacion = time.perf_counter() - inicio
+
+        errores.sort(key=lambda error: error['fila'])
+        resultado = {
+            "total": len(registros),
+            "validos": len(filas),
+            "creados": 0,
+            "errores": errores,
+            "simulado": simular,
+        }
+        tiempos = {"validacion_s": round(validacion, 3), "hash_s": 0.0, "escritura_s": 0.0}
+        if filas and not simular and (parcial or not errores):
+            inicio_hash = time.perf_counter()
+            hashes = hashear_passwords([password for _, _, password in filas], procesos)
+            tiempos['hash_s'] = round(time.perf_counter() - inicio_hash, 3)
+
+            inicio_escritura = time.perf_counter()
+            resultado['creados'] = MatriculaService._guardar_filas(filas, hashes, indices, errores, parcial)
+            tiempos['escritura_s'] = round(time.perf_counter() - inicio_escritura, 3)
+
+        total = time.perf_counter() - inicio
+        tiempos['total_s'] = round(total, 3)
+        resultado['tiempos'] = tiempos
+        resultado['filas_por_segundo'] = round(resultado['creados'] / total, 1) if resultado['creados'] else 0.0
+        evento(
+            logger, 'matricula.importar', total=resultado['total'], creados=resultado['creados'],
+            errores=len(errores), simulado=simular, **tiempos
+        )
+        return resultado
+
+    @staticmethod
+    def _guardar_filas(filas, hashes, indices, errores, parcial):
+        """
+        Guarda las filas y devuelve cuántas se crearon. Entre la validación y
+        el INSERT pasa todo el hash, así que otra petición puede registrar uno
+        de los emails: esas filas (``indices`` da la fila de cada email) se
+        agregan a ``errores`` y, con ``parcial``, se reintenta con las demás;
+        sin ``parcial`` no se escribe nada.
+        """
+        while filas:
+            try:
+                MatriculaService._guardar(filas, hashes)
+                return len(filas)
+            except IntegrityError:
+                ocupados = set(
+                    User.objects.filter(email__in=[usuario.email for usuario, _, _ in filas])
+                    .values_list('email', flat=True)
+                )
+                if not ocupados:
+                    raise
+            for email in ocupados:
+                errores.append({"fila": indices[email], "email": email, "detalle": "Ya existe un usuario con este email"})
+            errores.sort(key=lambda error: error['fila'])
+            evento(logger, 'matricula.conflicto', nivel=logging.WARNING, emails=len(ocupados))
+            if not parcial:
+                return 0
+            restantes = [(fila, hash_) for fila, hash_ in zip(filas, hashes) if fila[0].email not in ocupados]
+            filas = [fila for fila, _ in restantes]
+            hashes = [hash_ for _, hash_ in restantes]
+            for usuario, _, _ in filas:
+                # Los lotes insertados antes del error se deshicieron con la transacción
+                usuario.pk = None
+        return 0
+
+    @staticmethod
+    def _guardar(filas, hashes):
+        """
+        Inserta usuarios y estudiantes. bulk_create no envía señales, por eso
+        ``busqueda`` se calcula aquí (ver core.search.texto_busqueda).
+        """
+        with transaction.atomic():
+            rol_id = roles.registro.asegurar(roles.ESTUDIANTE)
+            usuarios = []
+            for (usuario, _, _), password in zip(filas, hashes):
+                usuario.password = password
+                usuario.rol_id = rol_id
+                usuario.busqueda = texto_busqueda(usuario.nombre, usuario.apellido, usuario.email)
+                usuarios.append(usuario)
+            User.objects.bulk_create(usuarios, batch_size=MatriculaService.BATCH_SIZE)
+
+            if any(usuario.pk is None for usuario in usuarios):
+                # Motores sin RETURNING: se releen los ids por email
+                ids = dict(
+                    User.objects.filter(email__in=[usuario.email for usuario in usuarios])
+                    .values_list('email', 'id')
+                )
+                for usuario in usuarios:
+                    usuario.pk = ids[usuario.email]
+
+            Estudiante.objects.bulk_create(
+                [Estudiante(user_id=usuario.pk, grupo_id=grupo_id) for usuario, (_, grupo_id, _) in zip(usuarios, filas)],
+                batch_size=MatriculaService.BATCH_SIZE
+            )
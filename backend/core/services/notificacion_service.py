@@ -0,0 +1,197 @@
+import datetime
+import logging
+import uuid
+from collections import defaultdict
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from ..logs import evento, get_logger
+from ..models import Estudiante, Notificacion
+
+logger = get_logger('notificaciones')
+
+class NotificacionService:
+    """
+    Avisos a acudientes por ausencias y observaciones.
+
+    Los avisos se escriben en la tabla Notificacion (outbox) dentro de la
+    misma transacción que el registro que los origina: si la transacción se
+    revierte no queda aviso, y si se confirma el aviso no se pierde aunque el
+    correo falle. ``enviar_pendientes`` los reserva por acudiente, envía un
+    solo correo por acudiente y día por una misma conexión SMTP y reprograma
+    los que fallan con espera exponencial.
+    """
+    # Acudientes reservados por iteración del envío
+    LOTE = 100
+
+    @staticmethod
+    def _disponible(fecha):
+        """
+        El resumen del día se envía desde la hora configurada. Un aviso
+        registrado después de esa hora (o con fecha pasada) espera al
+        siguiente resumen, para no enviar un correo por cada hecho.
+        """
+        hora = datetime.time(settings.SISE_NOTIFICACIONES_HORA)
+        ahora = timezone.now()
+        disponible = timezone.make_aware(datetime.datetime.combine(fecha, hora))
+        if disponible > ahora:
+            return disponible
+        hoy = timezone.localdate(ahora)
+        disponible = timezone.make_aware(datetime.datetime.combine(hoy, hora))
+        if disponible <= ahora:
+            disponible = timezone.make_aware(datetime.datetime.combine(hoy + datetime.timedelta(days=1), hora))
+        return disponible
+
+    @staticmethod
+    def _encolar(tipo, fecha, mensajes):
+        """
+        Crea un aviso por cada acudiente activo de los estudiantes de
+        ``mensajes`` ({estudiante_id: mensaje}); devuelve cuántos se crearon
+        """
+        if not mensajes:
+            return 0
+        acudientes = Estudiante.acudientes.through.objects.filter(
+            estudiante_id__in=mensajes.keys(), user__is_active=True
+        ).values_list('estudiante_id', 'user_id')
+        disponible = NotificacionService._disponible(fecha)
+        creadas = Notificacion.objects.bulk_create([
+            Notificacion(
+                acudiente_id=acudiente_id, estudiante_id=estudiante_id, tipo=tipo,
+                fecha=fecha, mensaje=mensajes[estudiante_id], disponible=disponible
+            )
+            for estudiante_id, acudiente_id in acudientes
+        ], batch_size=500)
+        return len(creadas)
+
+    @staticmethod
+    def encolar_ausencias(estudiante_ids, fecha):
+        estudiantes = Estudiante.objects.filter(pk__in=estudiante_ids, acudientes__isnull=False).distinct()
+        mensajes = {
+            estudiante_id: f'{nombre} {apellido} no asistió a clase.'
+            for estudiante_id, nombre, apellido in estudiantes.values_list('pk', 'user__nombre', 'user__apellido')
+        }
+        return NotificacionService._encolar('ausencia', fecha, mensajes)
+
+    @staticmethod
+    def retirar_ausencias(estudiante_ids, fecha):
+        """
+        Borra los avisos de ausencia aún pendientes de ``estudiante_ids`` en
+        ``fecha``: la asistencia se corrigió antes del resumen del día.
+        Devuelve cuántos se borraron.
+        """
+        estudiante_ids = list(estudiante_ids)
+        if not estudiante_ids:
+            return 0
+        borradas, _ = Notificacion.objects.filter(
+            estudiante_id__in=estudiante_ids, fecha=fecha, tipo='ausencia', estado='P'
+        ).delete()
+        return borradas
+
+    @staticmethod
+    def encolar_observacion(observacion):
+        estudiante = observacion.estudiante
+        mensaje = (
+            f'{estudiante.user.nombre} {estudiante.user.apellido} tiene una observación '
+            f'({observacion.tipo_observacion.nombre}): {observacion.descripcion}'
+        )
+        return NotificacionService._encolar('observacion', observacion.fecha, {estudiante.id: mensaje})
+
+    @staticmethod
+    def _reservar(limite):
+        """
+        Reserva los avisos vencidos de hasta ``limite`` acudientes. La reserva
+        es un UPDATE condicional que adelanta ``disponible``: dos procesos no
+        toman las mismas filas, y si el proceso muere vuelven a estar
+        disponibles al terminar ``SISE_NOTIFICACIONES_RESERVA_S``.
+        """
+        ahora = timezone.now()
+        vencidas = Notificacion.objects.filter(estado='P', disponible__lte=ahora)
+        acudientes = list(
+            vencidas.order_by('acudiente_id').values_list('acudiente_id', flat=True).distinct()[:limite]
+        )
+        if not acudientes:
+            return []
+        lote = uuid.uuid4()
+        reserva = ahora + datetime.timedelta(seconds=settings.SISE_NOTIFICACIONES_RESERVA_S)
+        vencidas.filter(acudiente_id__in=acudientes).update(lote=lote, disponible=reserva)
+        return list(
+            Notificacion.objects.filter(lote=lote, estado='P').select_related('acudiente')
+            .order_by('acudiente_id', 'fecha', 'id')
+        )
+
+    @staticmethod
+    def _resumen(acudiente, fecha, avisos):
+        lineas = [f'Hola {acudiente.nombre},', '', f'Novedades del {fecha:%d/%m/%Y}:', '']
+        # Un mismo mensaje no se repite en el resumen
+        lineas += [f'- {mensaje}' for mensaje in dict.fromkeys(aviso.mensaje for aviso in avisos)]
+        return EmailMessage(
+            subject=f'SISE: novedades del {fecha:%d/%m/%Y}',
+            body='\n'.join(lineas),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[acudiente.email]
+        )
+
+    @staticmethod
+    def _reprogramar(avisos, error):
+        # Todos los avisos del resumen quedan con el mismo número de intentos
+        intentos = max(aviso.intentos for aviso in avisos) + 1
+        ids = [aviso.id for aviso in avisos]
+        if intentos >= settings.SISE_NOTIFICACIONES_MAX_INTENTOS:
+            Notificacion.objects.filter(pk__in=ids).update(estado='F', intentos=intentos, error=error, lote=None)
+            return False
+        espera = settings.SISE_NOTIFICACIONES_REINTENTO_S * 2 ** (intentos - 1)
+        Notificacion.objects.filter(pk__in=ids).update(
+            intentos=intentos, error=error, lote=None,
+            disponible=timezone.now() + datetime.timedelta(seconds=espera)
+        )
+        return True
+
+    @staticmethod
+    def enviar_pendientes(limite=None):
+        """
+        Envía los avisos vencidos, un correo por acudiente y día, hasta que no
+        quede ninguno. Devuelve un dict con los correos enviados, los avisos
+        incluidos en ellos, los correos reprogramados y los fallidos.
+        """
+        limite = limite or NotificacionService.LOTE
+        totales = {"correos": 0, "avisos": 0, "reintentos": 0, "fallidos": 0}
+        conexion = None
+        try:
+            while True:
+                avisos = NotificacionService._reservar(limite)
+                if not avisos:
+                    break
+                if conexion is None:
+                    # Una sola conexión SMTP para todo el envío
+                    conexion = get_connection()
+                    conexion.open()
+
+                resumenes = defaultdict(list)
+                for aviso in avisos:
+                    resumenes[(aviso.acudiente_id, aviso.fecha)].append(aviso)
+                enviados = []
+                for (_, fecha), grupo in resumenes.items():
+                    mensaje = NotificacionService._resumen(grupo[0].acudiente, fecha, grupo)
+                    try:
+                        conexion.send_messages([mensaje])
+                    except Exception as exc:
+                        reintenta = NotificacionService._reprogramar(grupo, f'{type(exc).__name__}: {exc}')
+                        totales["reintentos" if reintenta else "fallidos"] += 1
+                        evento(
+                            logger, 'notificaciones.error', nivel=logging.WARNING if reintenta else logging.ERROR,
+                            acudiente=grupo[0].acudiente_id, fecha=fecha.isoformat(), avisos=len(grupo), error=str(exc)
+                        )
+                        continue
+                    enviados += [aviso.id for aviso in grupo]
+                    totales["correos"] += 1
+
+                Notificacion.objects.filter(pk__in=enviados).update(
+                    estado='E', enviada=timezone.now(), lote=None, error=''
+                )
+                totales["avisos"] += len(enviados)
+        finally:
+            if conexion is not None:
+                conexion.close()
+        if any(totales.values()):
+            evento(logger, 'notificaciones.envio', **totales)
+        return totales
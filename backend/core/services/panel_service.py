@@ -0,0 +1,157 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from .. import catalogos
+from ..models import Asignatura, Calificacion, Observador, Periodo, ResumenPeriodo, TipoObservacion
+
+class PanelService:
+    """
+    Panel de un estudiante: grupo, calificaciones y asistencia por período y
+    observaciones recientes en una sola respuesta.
+
+    Las notas salen de Calificacion y la asistencia y el promedio de los
+    resúmenes materializados (ResumenPeriodo), así que el panel usa un número
+    fijo de consultas. Lo que depende de los registros del estudiante se
+    guarda en el caché con una versión por estudiante que se incrementa al
+    escribir sus calificaciones, asistencias u observaciones (core/signals.py)
+    y al recalcular sus resúmenes. Los datos del estudiante y su grupo se leen
+    siempre: la vista los necesita para comprobar el permiso.
+    """
+    # Observaciones más recientes incluidas en el panel
+    OBSERVACIONES_RECIENTES = 10
+
+    # Catálogos cuyos nombres aparecen en el panel
+    CATALOGOS = (Periodo, Asignatura, TipoObservacion)
+
+    @staticmethod
+    def _clave_version(estudiante_id):
+        return f'sise:panel:version:{estudiante_id}'
+
+    @staticmethod
+    def invalidar(estudiante_ids):
+        """
+        Invalida los paneles de los estudiantes, ahora y al confirmar la transacción
+        """
+        claves = [PanelService._clave_version(estudiante_id) for estudiante_id in set(estudiante_ids)]
+        if not claves:
+            return
+        catalogos.incrementar(claves, settings.SISE_PANEL_TTL)
+        transaction.on_commit(lambda: catalogos.incrementar(claves, settings.SISE_PANEL_TTL))
+
+    @staticmethod
+    def obtener(estudiante, periodo_id=None):
+        """
+        Construye el panel del estudiante (con ``user`` y ``grupo__grado``
+        cargados), opcionalmente de un solo período
+        """
+        grupo = estudiante.grupo
+        return {
+            "estudiante": {
+                "id": estudiante.id,
+                "nombre": estudiante.user.nombre,
+                "apellido": estudiante.user.apellido,
+                "email": estudiante.user.email,
+            },
+            "grupo": {
+                "id": grupo.id,
+                "nombre": grupo.nombre,
+                "grado_id": grupo.grado_id,
+                "grado": grupo.grado.nombre,
+            },
+            **PanelService._registros(estudiante.id, periodo_id),
+        }
+
+    @staticmethod
+    def _registros(estudiante_id, periodo_id):
+        versiones = catalogos.versiones_de([PanelService._clave_version(estudiante_id)], settings.SISE_PANEL_TTL)
+        versiones += catalogos.versiones(PanelService.CATALOGOS)
+        clave = 'sise:panel:{}:{}:{}'.format(
+            estudiante_id, periodo_id or 'todos', ':'.join(map(str, versiones))
+        )
+        datos = cache.get(clave)
+        if datos is None:
+            datos = PanelService._consultar(estudiante_id, periodo_id)
+            cache.set(clave, datos, settings.SISE_PANEL_TTL)
+        return datos
+
+    @staticmethod
+    def _consultar(estudiante_id, periodo_id):
+        periodos = Periodo.objects.order_by('fecha_inicio', 'id')
+        calificaciones = Calificacion.objects.filter(estudiante_id=estudiante_id)
+        resumenes = ResumenPeriodo.objects.filter(estudiante_id=estudiante_id)
+        observaciones = Observador.objects.filter(estudiante_id=estudiante_id)
+        if periodo_id is not None:
+            periodos = periodos.filter(pk=periodo_id)
+            calificaciones = calificaciones.filter(periodo_id=periodo_id)
+            resumenes = resumenes.filter(periodo_id=periodo_id)
+        periodos = list(periodos)
+        if periodo_id is not None:
+            if not periodos:
+                observaciones = observaciones.none()
+            else:
+                observaciones = observaciones.filter(
+                    fecha__range=(periodos[0].fecha_inicio, periodos[0].fecha_fin)
+                )
+
+        por_periodo = {
+            periodo.id: {
+                "id": periodo.id,
+                "nombre": periodo.nombre,
+                "fecha_inicio": periodo.fecha_inicio.isoformat(),
+                "fecha_fin": periodo.fecha_fin.isoformat(),
+                "promedio_general": None,
+                "calificaciones": [],
+                "asistencia": PanelService._asistencia(None),
+            }
+            for periodo in periodos
+        }
+
+        for calificacion in calificaciones.select_related('asignatura').order_by('asignatura__nombre'):
+            if calificacion.periodo_id in por_periodo:
+                por_periodo[calificacion.periodo_id]["calificaciones"].append({
+                    "asignatura_id": calificacion.asignatura_id,
+                    "asignatura": calificacion.asignatura.nombre,
+                    "nota": str(calificacion.nota),
+                    "observaciones": calificacion.observaciones,
+                })
+
+        total = PanelService._asistencia(None)
+        for resumen in resumenes:
+            if resumen.periodo_id not in por_periodo:
+                continue
+            periodo = por_periodo[resumen.periodo_id]
+            if resumen.promedio_general is not None:
+                periodo["promedio_general"] = str(resumen.promedio_general)
+            periodo["asistencia"] = PanelService._asistencia(resumen)
+            for campo, valor in periodo["asistencia"].items():
+                total[campo] += valor
+
+        recientes = observaciones.select_related('tipo_observacion', 'registrada_por').order_by('-fecha', '-id')
+        return {
+            "periodos": list(por_periodo.values()),
+            "asistencia": total,
+            "observaciones_recientes": [
+                {
+                    "id": observacion.id,
+                    "fecha": observacion.fecha.isoformat(),
+                    "tipo_observacion_id": observacion.tipo_observacion_id,
+                    "tipo_observacion": observacion.tipo_observacion.nombre,
+                    "descripcion": observacion.descripcion,
+                    "registrada_por": (
+                        f'{observacion.registrada_por.nombre} {observacion.registrada_por.apellido}'
+                    ),
+                }
+                for observacion in recientes[:PanelService.OBSERVACIONES_RECIENTES]
+            ],
+        }
+
+    @staticmethod
+    def _asistencia(resumen):
+        conteos = {
+            "presentes": resumen.presentes if resumen else 0,
+            "ausencias": resumen.ausencias if resumen else 0,
+            "tardanzas": resumen.tardanzas if resumen else 0,
+            "justificadas": resumen.justificadas if resumen else 0,
+        }
+        conteos["total"] = sum(conteos.values())
+        return conteos
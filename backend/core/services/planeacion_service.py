@@ -0,0 +1,91 @@
+from collections import defaultdict
+from django.db import transaction
+from .. import roles
+from ..models import Planeacion, TransicionPlaneacion
+
+class PlaneacionService:
+    # Estados a los que puede pasar una planeación desde cada estado
+    TRANSICIONES = {
+        'B': {'E'},
+        'E': {'A', 'B'},
+        'A': set(),
+    }
+    # Roles que revisan planeaciones (aprueban o devuelven a borrador)
+    ROLES_REVISION = (roles.ADMINISTRADOR, roles.COORDINADOR)
+
+    @staticmethod
+    def puede_revisar(usuario):
+        return usuario.is_staff or roles.registro.nombre_normalizado(usuario.rol_id) in PlaneacionService.ROLES_REVISION
+
+    @staticmethod
+    def _permitida(usuario, revisor, docente_id, estado_nuevo):
+        # El docente envía sus propias planeaciones; la revisión es de coordinación
+        if estado_nuevo == 'E':
+            return revisor or docente_id == usuario.id
+        return revisor
+
+    @staticmethod
+    def transicionar(transiciones, usuario):
+        """
+        Cambia el estado de varias planeaciones en una sola transacción.
+
+        ``transiciones`` es una lista de dicts con ``id`` y ``estado``. Las
+        filas se bloquean con select_for_update (en orden de id) mientras se
+        validan las transiciones, se aplica un UPDATE por estado de destino y
+        se registra el historial con un bulk_create. Devuelve el resultado de
+        cada elemento: aplicada, sin_cambio, no_encontrada, duplicada,
+        sin_permiso o transicion_invalida; ``estado_anterior`` solo se incluye
+        en aplicada, sin_cambio y transicion_invalida.
+        """
+        ids = [item['id'] for item in transiciones]
+        revisor = PlaneacionService.puede_revisar(usuario)
+        resultados = []
+        por_estado = defaultdict(list)
+        historial = []
+
+        with transaction.atomic():
+            actuales = {
+                planeacion_id: (estado, docente_id)
+                for planeacion_id, estado, docente_id in Planeacion.objects.select_for_update()
+                .filter(pk__in=ids).order_by('pk').values_list('pk', 'estado', 'docente_id')
+            }
+
+            vistos = set()
+            for item in transiciones:
+                planeacion_id, estado_nuevo = item['id'], item['estado']
+                resultado = {"id": planeacion_id, "estado": estado_nuevo}
+                resultados.append(resultado)
+                if planeacion_id in vistos:
+                    resultado["resultado"] = 'duplicada'
+                    continue
+                vistos.add(planeacion_id)
+                if planeacion_id not in actuales:
+                    resultado["resultado"] = 'no_encontrada'
+                    continue
+
+                estado_anterior, docente_id = actuales[planeacion_id]
+                if not PlaneacionService._permitida(usuario, revisor, docente_id, estado_nuevo):
+                    # Sin estado_anterior: no se revela el estado de planeaciones ajenas
+                    resultado["resultado"] = 'sin_permiso'
+                    continue
+                resultado["estado_anterior"] = estado_anterior
+                if estado_anterior == estado_nuevo:
+                    resultado["resultado"] = 'sin_cambio'
+                elif estado_nuevo not in PlaneacionService.TRANSICIONES[estado_anterior]:
+                    resultado["resultado"] = 'transicion_invalida'
+                else:
+                    resultado["resultado"] = 'aplicada'
+                    por_estado[estado_nuevo].append(planeacion_id)
+                    historial.append(TransicionPlaneacion(
+                        planeacion_id=planeacion_id, estado_anterior=estado_anterior,
+                        estado_nuevo=estado_nuevo, usuario=usuario
+                    ))
+
+            for estado_nuevo, planeacion_ids in por_estado.items():
+                Planeacion.objects.filter(pk__in=planeacion_ids).update(estado=estado_nuevo)
+            TransicionPlaneacion.objects.bulk_create(historial, batch_size=500)
+
+        return {
+            "aplicadas": len(historial),
+            "resultados": resultados,
+        }
@@ -0,0 +1,200 @@
+from collections import defaultdict
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncWeek
+from ..models import Asistencia, Periodo, ResumenAsistenciaDiaria, ResumenAsistenciaPeriodo
+from .resumen_service import ResumenService
+
+class ResumenAsistenciaService:
+    BATCH_SIZE = 500
+    CAMPOS = list(ResumenService.CAMPOS_ASISTENCIA.values())
+    AGRUPACIONES = ['dia', 'semana', 'periodo']
+
+    @staticmethod
+    def _conteos_por_dia(**filtros):
+        """
+        Cuenta las asistencias crudas por (grupo, fecha) y estado
+        """
+        conteos = defaultdict(lambda: dict.fromkeys(ResumenAsistenciaService.CAMPOS, 0))
+        filas = Asistencia.objects.filter(**filtros).values_list(
+            'estudiante__grupo_id', 'fecha', 'estado'
+        ).annotate(total=Count('id')).order_by()
+        for grupo_id, fecha, estado, total in filas:
+            campo = ResumenService.CAMPOS_ASISTENCIA.get(estado)
+            if campo:
+                conteos[(grupo_id, fecha)][campo] = total
+        return conteos
+
+    @staticmethod
+    def _conteos_por_periodo(periodo, grupo_ids=None):
+        """
+        Suma los resúmenes diarios de un período por grupo
+        """
+        filas = ResumenAsistenciaDiaria.objects.filter(
+            fecha__range=(periodo.fecha_inicio, periodo.fecha_fin)
+        )
+        if grupo_ids is not None:
+            filas = filas.filter(grupo_id__in=grupo_ids)
+        filas = filas.values('grupo_id').annotate(
+            **{campo: Sum(campo) for campo in ResumenAsistenciaService.CAMPOS}
+        ).order_by()
+        return {
+            fila['grupo_id']: {campo: fila[campo] for campo in ResumenAsistenciaService.CAMPOS}
+            for fila in filas
+        }
+
+    @staticmethod
+    def _guardar_periodo(periodo, grupo_ids):
+        conteos = ResumenAsistenciaService._conteos_por_periodo(periodo, grupo_ids)
+        vacio = dict.fromkeys(ResumenAsistenciaService.CAMPOS, 0)
+        ResumenAsistenciaPeriodo.objects.bulk_create(
+            [
+                ResumenAsistenciaPeriodo(grupo_id=grupo_id, periodo=periodo, **conteos.get(grupo_id, vacio))
+                for grupo_id in grupo_ids
+            ],
+            batch_size=ResumenAsistenciaService.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['grupo', 'periodo'],
+            update_fields=ResumenAsistenciaService.CAMPOS
+        )
+
+    @staticmethod
+    def recalcular(claves):
+        """
+        Recalcula los resúmenes de las claves (grupo_id, fecha) indicadas y
+        los de los períodos que las contienen.
+        """
+        claves = set(claves)
+        if not claves:
+            return
+        grupo_ids = {grupo_id for grupo_id, _ in claves}
+        fechas = {fecha for _, fecha in claves}
+
+        conteos = ResumenAsistenciaService._conteos_por_dia(
+            estudiante__grupo_id__in=grupo_ids, fecha__in=fechas
+        )
+        vacio = dict.fromkeys(ResumenAsistenciaService.CAMPOS, 0)
+        ResumenAsistenciaDiaria.objects.bulk_create(
+            [
+                ResumenAsistenciaDiaria(grupo_id=grupo_id, fecha=fecha, **conteos.get((grupo_id, fecha), vacio))
+                for grupo_id, fecha in claves
+            ],
+            batch_size=ResumenAsistenciaService.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['grupo', 'fecha'],
+            update_fields=ResumenAsistenciaService.CAMPOS
+        )
+
+        periodos = Periodo.objects.filter(fecha_inicio__lte=max(fechas), fecha_fin__gte=min(fechas))
+        for periodo in periodos:
+            afectados = {
+                grupo_id for grupo_id, fecha in claves
+                if periodo.fecha_inicio <= fecha <= periodo.fecha_fin
+            }
+            if afectados:
+                ResumenAsistenciaService._guardar_periodo(periodo, afectados)
+
+    @staticmethod
+    def consultar(agrupacion, desde=None, hasta=None, grupo=None):
+        """
+        Responde consultas por rango de fechas desde los resúmenes, sin leer
+        la tabla de asistencias. Devuelve las filas agrupadas y los totales.
+        """
+        campos = ResumenAsistenciaService.CAMPOS
+        if agrupacion == 'periodo':
+            filas = ResumenAsistenciaPeriodo.objects.all()
+            if desde:
+                filas = filas.filter(periodo__fecha_fin__gte=desde)
+            if hasta:
+                filas = filas.filter(periodo__fecha_inicio__lte=hasta)
+            if grupo:
+                filas = filas.filter(grupo=grupo)
+            filas = filas.order_by('periodo__fecha_inicio', 'grupo_id').values('grupo_id', 'periodo_id', *campos)
+        else:
+            filas = ResumenAsistenciaDiaria.objects.filter(fecha__range=(desde, hasta))
+            if grupo:
+                filas = filas.filter(grupo=grupo)
+            if agrupacion == 'semana':
+                filas = filas.annotate(semana=TruncWeek('fecha')).values('grupo_id', 'semana').annotate(
+                    **{f'total_{campo}': Sum(campo) for campo in campos}
+                ).order_by('semana', 'grupo_id')
+                filas = [
+                    {
+                        'grupo_id': fila['grupo_id'],
+                        'semana': fila['semana'],
+                        **{campo: fila[f'total_{campo}'] for campo in campos}
+                    }
+                    for fila in filas
+                ]
+            else:
+                filas = filas.order_by('fecha', 'grupo_id').values('grupo_id', 'fecha', *campos)
+
+        filas = list(filas)
+        totales = {campo: sum(fila[campo] for fila in filas) for campo in campos}
+        return {"agrupacion": agrupacion, "resultados": filas, "totales": totales}
+
+    @staticmethod
+    def verificar():
+        """
+        Recalcula los resúmenes desde las asistencias crudas y devuelve las
+        diferencias encontradas. Una fila ausente equivale a conteos en cero.
+        """
+        campos = ResumenAsistenciaService.CAMPOS
+        vacio = dict.fromkeys(campos, 0)
+        diferencias = []
+
+        esperados = ResumenAsistenciaService._conteos_por_dia()
+        actuales = {
+            (fila['grupo_id'], fila['fecha']): {campo: fila[campo] for campo in campos}
+            for fila in ResumenAsistenciaDiaria.objects.values('grupo_id', 'fecha', *campos)
+        }
+        for clave in set(esperados) | set(actuales):
+            esperado = esperados.get(clave, vacio)
+            actual = actuales.get(clave, vacio)
+            if esperado != actual:
+                diferencias.append({
+                    "tipo": "dia", "grupo": clave[0], "clave": clave[1],
+                    "esperado": esperado, "actual": actual
+                })
+
+        for periodo in Periodo.objects.all():
+            esperados = defaultdict(lambda: dict(vacio))
+            for (grupo_id, fecha), conteo in ResumenAsistenciaService._conteos_por_dia(
+                fecha__range=(periodo.fecha_inicio, periodo.fecha_fin)
+            ).items():
+                for campo in campos:
+                    esperados[grupo_id][campo] += conteo[campo]
+            actuales = {
+                fila['grupo_id']: {campo: fila[campo] for campo in campos}
+                for fila in ResumenAsistenciaPeriodo.objects.filter(periodo=periodo).values('grupo_id', *campos)
+            }
+            for grupo_id in set(esperados) | set(actuales):
+                esperado = esperados.get(grupo_id, vacio)
+                actual = actuales.get(grupo_id, vacio)
+                if esperado != actual:
+                    diferencias.append({
+                        "tipo": "periodo", "grupo": grupo_id, "clave": periodo.id,
+                        "esperado": esperado, "actual": actual
+                    })
+
+        return diferencias
+
+    @staticmethod
+    def reconstruir():
+        """
+        Reconstruye todos los resúmenes de asistencia desde las filas crudas
+        """
+        ResumenAsistenciaDiaria.objects.all().delete()
+        ResumenAsistenciaPeriodo.objects.all().delete()
+        conteos = ResumenAsistenciaService._conteos_por_dia()
+        ResumenAsistenciaDiaria.objects.bulk_create(
+            [
+                ResumenAsistenciaDiaria(grupo_id=grupo_id, fecha=fecha, **conteo)
+                for (grupo_id, fecha), conteo in conteos.items()
+            ],
+            batch_size=ResumenAsistenciaService.BATCH_SIZE
+        )
+        for periodo in Periodo.objects.all():
+            grupo_ids = ResumenAsistenciaService._conteos_por_periodo(periodo).keys()
+            if grupo_ids:
+                ResumenAsistenciaService._guardar_periodo(periodo, set(grupo_ids))
+        return len(conteos)
@@ -0,0 +1,114 @@
+from decimal import Decimal
+from django.db.models import Count
+from ..models import Asistencia, Calificacion, Estudiante, Observador, Periodo, ResumenPeriodo
+from .panel_service import PanelService
+
+class ResumenService:
+    # Estudiantes recalculados por lote al reconstruir la tabla completa
+    BATCH_SIZE = 500
+
+    # Estado de asistencia -> campo del resumen
+    CAMPOS_ASISTENCIA = {
+        'P': 'presentes',
+        'A': 'ausencias',
+        'T': 'tardanzas',
+        'J': 'justificadas',
+    }
+
+    @staticmethod
+    def periodo_de_fecha(fecha):
+        """
+        Obtiene el período que contiene la fecha, o None si no hay ninguno
+        """
+        return Periodo.objects.filter(fecha_inicio__lte=fecha, fecha_fin__gte=fecha).first()
+
+    @staticmethod
+    def recalcular(estudiante_ids, periodo):
+        """
+        Recalcula los resúmenes de varios estudiantes en un período.
+
+        Usa un número fijo de consultas (notas, asistencias, observaciones y
+        un upsert) sin importar cuántos estudiantes se recalculen.
+        """
+        estudiante_ids = list(set(estudiante_ids))
+        if not estudiante_ids or periodo is None:
+            return
+
+        resumenes = {
+            estudiante_id: ResumenPeriodo(estudiante_id=estudiante_id, periodo=periodo)
+            for estudiante_id in estudiante_ids
+        }
+
+        calificaciones = Calificacion.objects.filter(
+            periodo=periodo, estudiante_id__in=estudiante_ids
+        ).values_list('estudiante_id', 'asignatura_id', 'nota')
+        for estudiante_id, asignatura_id, nota in calificaciones:
+            resumenes[estudiante_id].notas[str(asignatura_id)] = str(nota)
+
+        rango = (periodo.fecha_inicio, periodo.fecha_fin)
+        asistencias = Asistencia.objects.filter(
+            estudiante_id__in=estudiante_ids, fecha__range=rango
+        ).values_list('estudiante_id', 'estado').annotate(total=Count('id')).order_by()
+        for estudiante_id, estado, total in asistencias:
+            campo = ResumenService.CAMPOS_ASISTENCIA.get(estado)
+            if campo:
+                setattr(resumenes[estudiante_id], campo, total)
+
+        observaciones = Observador.objects.filter(
+            estudiante_id__in=estudiante_ids, fecha__range=rango
+        ).values_list('estudiante_id', 'tipo_observacion_id').annotate(total=Count('id')).order_by()
+        for estudiante_id, tipo_id, total in observaciones:
+            resumen = resumenes[estudiante_id]
+            resumen.observaciones_por_tipo[str(tipo_id)] = total
+            resumen.observaciones += total
+
+        for resumen in resumenes.values():
+            if resumen.notas:
+                total = sum(Decimal(nota) for nota in resumen.notas.values())
+                resumen.promedio_general = (total / len(resumen.notas)).quantize(Decimal('0.01'))
+
+        ResumenPeriodo.objects.bulk_create(
+            resumenes.values(),
+            batch_size=ResumenService.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['estudiante', 'periodo'],
+            update_fields=[
+                'notas', 'promedio_general', 'presentes', 'ausencias', 'tardanzas',
+                'justificadas', 'observaciones', 'observaciones_por_tipo', 'actualizado'
+            ]
+        )
+        # El panel muestra la asistencia y el promedio de estos resúmenes
+        PanelService.invalidar(estudiante_ids)
+
+    @staticmethod
+    def recalcular_por_fecha(estudiante_ids, fecha):
+        """
+        Recalcula los resúmenes del período que contiene la fecha
+        """
+        ResumenService.recalcular(estudiante_ids, ResumenService.periodo_de_fecha(fecha))
+
+    @staticmethod
+    def reconstruir(periodos=None):
+        """
+        Reconstruye desde cero los resúmenes de los períodos indicados (o de
+        todos) y devuelve el número de resúmenes generados.
+        """
+        periodos = list(periodos if periodos is not None else Periodo.objects.all())
+        ResumenPeriodo.objects.filter(periodo__in=periodos).delete()
+
+        estudiante_ids = list(Estudiante.objects.order_by('id').values_list('id', flat=True))
+        for periodo in periodos:
+            for inicio in range(0, len(estudiante_ids), ResumenService.BATCH_SIZE):
+                lote = estudiante_ids[inicio:inicio + ResumenService.BATCH_SIZE]
+                ResumenService.recalcular(lote, periodo)
+        return len(periodos) * len(estudiante_ids)
+
+    @staticmethod
+    def obtener(estudiante, periodo=None):
+        """
+        Obtiene los resúmenes del estudiante, opcionalmente de un solo período
+        """
+        resumenes = ResumenPeriodo.objects.filter(estudiante=estudiante)
+        if periodo is not None:
+            resumenes = resumenes.filter(periodo=periodo)
+        return resumenes.order_by('periodo__fecha_inicio')
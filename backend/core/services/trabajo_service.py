@@ -0,0 +1,274 @@
+import datetime
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from ..logs import RedactingFilter, evento, get_logger, redactar
+from ..models import Trabajo
+
+logger = get_logger('trabajos')
+
+class TrabajoService:
+    """
+    Cola de trabajos en segundo plano sobre la tabla Trabajo.
+
+    Un trabajador reclama el pendiente de mayor prioridad (y más antiguo),
+    lo marca en ejecución con un plazo (``vence``) y ejecuta su tarea
+    (core/trabajos.py). Las escrituras que cierran un intento son UPDATE
+    condicionados al trabajador y al número de intento: si el intento venció
+    y el trabajo ya se reintentó o se dio por fallido, el resultado tardío se
+    descarta. ``recuperar_vencidos`` devuelve a la cola (o marca fallidos)
+    los intentos con el plazo cumplido y los de procesos de este host que ya
+    no existen.
+
+    Los parámetros con credenciales no se guardan en la base: la columna
+    ``parametros`` los lleva redactados y los completos se escriben en un
+    archivo de SISE_TRABAJOS_PRIVADOS_DIR que se borra cuando el trabajo
+    termina (completado o fallido).
+    """
+    # Pendientes que se prueban por reclamo cuando no hay SKIP LOCKED
+    CANDIDATOS = 10
+    # Trabajos que devuelve el listado de la API
+    LISTADO = 50
+    # Credenciales en los parámetros (contraseñas de una importación): se
+    # ocultan en la columna y van al archivo privado
+    PATRON_SENSIBLE = RedactingFilter().patron
+
+    @staticmethod
+    def encolar(tipo, parametros=None, usuario=None, prioridad=0, tiempo_limite=None, max_intentos=None):
+        parametros = parametros or {}
+        redactados = redactar(parametros, TrabajoService.PATRON_SENSIBLE)
+        trabajo = Trabajo(
+            tipo=tipo, parametros=redactados, parametros_privados=redactados != parametros, usuario=usuario,
+            prioridad=prioridad, tiempo_limite=tiempo_limite or settings.SISE_TRABAJOS_TIEMPO_LIMITE_S,
+            max_intentos=max_intentos or settings.SISE_TRABAJOS_MAX_INTENTOS
+        )
+        if not trabajo.parametros_privados:
+            trabajo.save()
+            return trabajo
+        # El archivo se escribe antes que la fila: un trabajador no puede
+        # reclamar el trabajo sin encontrar sus parámetros
+        ruta = TrabajoService._ruta_privada(trabajo)
+        os.makedirs(os.path.dirname(ruta), mode=0o700, exist_ok=True)
+        with os.fdopen(os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w', encoding='utf-8') as archivo:
+            json.dump(parametros, archivo, cls=DjangoJSONEncoder)
+        try:
+            trabajo.save()
+        except Exception:
+            TrabajoService._borrar_privados(trabajo)
+            raise
+        return trabajo
+
+    @staticmethod
+    def _ruta_privada(trabajo):
+        return os.path.join(settings.SISE_TRABAJOS_PRIVADOS_DIR, f'{trabajo.pk}.json')
+
+    @staticmethod
+    def parametros(trabajo):
+        """
+        Parámetros completos del trabajo, con las credenciales del archivo privado
+        """
+        if not trabajo.parametros_privados:
+            return trabajo.parametros
+        with open(TrabajoService._ruta_privada(trabajo), encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+    @staticmethod
+    def _borrar_privados(trabajo):
+        if trabajo.parametros_privados:
+            try:
+                os.remove(TrabajoService._ruta_privada(trabajo))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def identificador():
+        return f'{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}'[:100]
+
+    @staticmethod
+    def _tomar(trabajo_id, tiempo_limite, trabajador, ahora):
+        return Trabajo.objects.filter(pk=trabajo_id, estado='P').update(
+            estado='E', trabajador=trabajador, iniciado=ahora,
+            vence=ahora + datetime.timedelta(seconds=tiempo_limite), intentos=F('intentos') + 1
+        )
+
+    @staticmethod
+    def reclamar(trabajador):
+        """
+        Toma el siguiente trabajo pendiente para ``trabajador`` o devuelve None
+        """
+        ahora = timezone.now()
+        pendientes = (
+            Trabajo.objects.filter(estado='P', disponible__lte=ahora)
+            .order_by('-prioridad', 'creado').values_list('pk', 'tiempo_limite')
+        )
+        tomado = None
+        if connection.features.has_select_for_update_skip_locked:
+            # PostgreSQL: cada trabajador salta las filas que otro ya bloqueó,
+            # así que no esperan unos por otros ni toman el mismo trabajo
+            with transaction.atomic():
+                candidato = pendientes.select_for_update(skip_locked=True).first()
+                if candidato and TrabajoService._tomar(*candidato, trabajador, ahora):
+                    tomado = candidato
+        else:
+            # SQLite no tiene bloqueo de filas: el UPDATE condicional decide
+            # quién se lleva cada trabajo y el perdedor prueba el siguiente
+            for candidato in pendientes[:TrabajoService.CANDIDATOS]:
+                if TrabajoService._tomar(*candidato, trabajador, ahora):
+                    tomado = candidato
+                    break
+        if tomado is None:
+            return None
+        return Trabajo.objects.get(pk=tomado[0])
+
+    @staticmethod
+    def _en_curso(trabajo):
+        # El intento que ejecuta este trabajador, si no venció entretanto
+        return Trabajo.objects.filter(
+            pk=trabajo.pk, estado='E', trabajador=trabajo.trabajador, intentos=trabajo.intentos
+        )
+
+    @staticmethod
+    def _fallar(trabajo, error):
+        """
+        Cierra el intento en curso con ``error``: vuelve a la cola con espera
+        exponencial si le quedan intentos o queda fallido. Devuelve False si el
+        intento ya estaba cerrado.
+        """
+        ahora = timezone.now()
+        if trabajo.intentos < trabajo.max_intentos:
+            espera = settings.SISE_TRABAJOS_REINTENTO_S * 2 ** (trabajo.intentos - 1)
+            campos = {
+                'estado': 'P', 'disponible': ahora + datetime.timedelta(seconds=espera),
+                'vence': None, 'trabajador': '', 'error': error
+            }
+        else:
+            campos = {
+                'estado': 'F', 'terminado': ahora, 'vence': None, 'error': error,
+                'parametros': redactar(trabajo.parametros, TrabajoService.PATRON_SENSIBLE)
+            }
+        cerrado = bool(TrabajoService._en_curso(trabajo).update(**campos))
+        if cerrado and campos['estado'] == 'F':
+            TrabajoService._borrar_privados(trabajo)
+        return cerrado
+
+    @staticmethod
+    def ejecutar(trabajo):
+        """
+        Ejecuta el intento reclamado y registra el resultado; devuelve True si
+        el trabajo quedó completado
+        """
+        from ..trabajos import TAREAS
+        inicio = time.perf_counter()
+        try:
+            tarea = TAREAS.get(trabajo.tipo)
+            if tarea is None:
+                raise ValueError(f'Tipo de trabajo desconocido: {trabajo.tipo}')
+            resultado = tarea.ejecutar(trabajo, TrabajoService.parametros(trabajo))
+        except Exception as exc:
+            if trabajo.archivo:
+                trabajo.archivo.delete(save=False)
+            reintenta = trabajo.intentos < trabajo.max_intentos
+            TrabajoService._fallar(trabajo, f'{type(exc).__name__}: {exc}')
+            evento(
+                logger, 'trabajo.error', nivel=logging.WARNING if reintenta else logging.ERROR, exc_info=True,
+                id=str(trabajo.id), tipo=trabajo.tipo, intento=trabajo.intentos, reintenta=reintenta
+            )
+            return False
+
+        completados = TrabajoService._en_curso(trabajo).update(
+            estado='C', resultado=resultado, archivo=trabajo.archivo.name or None, error='',
+            terminado=timezone.now(), vence=None,
+            parametros=redactar(trabajo.parametros, TrabajoService.PATRON_SENSIBLE)
+        )
+        ms = round((time.perf_counter() - inicio) * 1000)
+        if not completados:
+            # El plazo venció durante la ejecución: el trabajo ya se reintentó o falló
+            if trabajo.archivo:
+                trabajo.archivo.delete(save=False)
+            evento(logger, 'trabajo.descartado', nivel=logging.WARNING, id=str(trabajo.id), tipo=trabajo.tipo, ms=ms)
+            return False
+        TrabajoService._borrar_privados(trabajo)
+        evento(logger, 'trabajo.completado', id=str(trabajo.id), tipo=trabajo.tipo, intento=trabajo.intentos, ms=ms)
+        return True
+
+    @staticmethod
+    def pid_de(trabajador):
+        # identificador(): host:pid:hilo
+        try:
+            return int(trabajador.split(':')[1])
+        except (IndexError, ValueError):
+            return None
+
+    @staticmethod
+    def _proceso_activo(trabajador):
+        pid = TrabajoService.pid_de(trabajador)
+        if pid is None:
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    @staticmethod
+    def recuperar_vencidos():
+        """
+        Cierra los intentos con el plazo cumplido (tiempo agotado o trabajador
+        caído) y los de procesos de este host que ya no existen. Devuelve los
+        trabajos recuperados, con el trabajador que los tenía.
+        """
+        ahora = timezone.now()
+        en_ejecucion = Trabajo.objects.filter(estado='E')
+        vencidos = [(trabajo, 'Tiempo agotado') for trabajo in en_ejecucion.filter(vence__lt=ahora)]
+        locales = en_ejecucion.filter(vence__gte=ahora, trabajador__startswith=f'{socket.gethostname()}:')
+        vencidos += [
+            (trabajo, 'El proceso del trabajador terminó')
+            for trabajo in locales if not TrabajoService._proceso_activo(trabajo.trabajador)
+        ]
+
+        recuperados = []
+        for trabajo, motivo in vencidos:
+            if TrabajoService._fallar(trabajo, motivo):
+                recuperados.append(trabajo)
+                evento(
+                    logger, 'trabajo.recuperado', nivel=logging.WARNING, id=str(trabajo.id), tipo=trabajo.tipo,
+                    trabajador=trabajo.trabajador, motivo=motivo
+                )
+        return recuperados
+
+    @staticmethod
+    def trabajar(detener, intervalo, una_vez=False):
+        """
+        Bucle de un trabajador: reclama y ejecuta trabajos hasta que se active
+        ``detener`` (un Event). Sin trabajos espera ``intervalo`` segundos, o
+        termina si ``una_vez``.
+        """
+        trabajador = TrabajoService.identificador()
+        try:
+            while not detener.is_set():
+                close_old_connections()
+                try:
+                    trabajo = TrabajoService.reclamar(trabajador)
+                except DatabaseError as exc:
+                    # Base bloqueada o conexión perdida: se reintenta en la siguiente vuelta
+                    evento(logger, 'trabajo.reclamo_fallido', nivel=logging.WARNING, trabajador=trabajador, error=str(exc))
+                    detener.wait(intervalo)
+                    continue
+                if trabajo is not None:
+                    TrabajoService.ejecutar(trabajo)
+                elif una_vez:
+                    break
+                else:
+                    detener.wait(intervalo)
+        finally:
+            connection.close()
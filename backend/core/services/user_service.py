@@ -12,9 +12,11 @@ class UserService:
         """
         Obtiene el queryset de usuarios según los permisos
         """
+        # select_related evita una consulta de Rol por fila (rol_nombre)
+        queryset = User.objects.select_related('rol')
         if user.is_staff:
-            return User.objects.all()
-        return User.objects.filter(id=user.id)
+            return queryset
+        return queryset.filter(id=user.id)
 
     @staticmethod
     def get_serializer_class(action):
@@ -0,0 +1,195 @@
+"""
+Receptores de señales de la aplicación core.
+
+Se conectan en ``CoreConfig.ready``. Los guardados masivos (bulk_create y
+update) no emiten señales; los servicios que los usan actualizan los datos
+derivados de forma explícita.
+"""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from . import catalogos
+from .almacenamiento import ajustar_referencias, hash_de_nombre
+from .authentication import token_cache
+from .models import (
+    Asignatura, Asistencia, Calificacion, Estudiante, Grado, Grupo, Observador, Periodo, Planeacion, Rol,
+    TipoObservacion, User
+)
+from .roles import registro as registro_roles
+from .services.notificacion_service import NotificacionService
+from .services.panel_service import PanelService
+from .services.resumen_service import ResumenService
+from .services.resumen_asistencia_service import ResumenAsistenciaService
+
+def _fecha(instance):
+    # La instancia puede traer la fecha como texto si no pasó por un formulario
+    return instance._meta.get_field('fecha').to_python(instance.fecha)
+
+def _clave_resumen(instance):
+    if isinstance(instance, Calificacion):
+        return (instance.estudiante_id, 'periodo', instance.periodo_id)
+    return (instance.estudiante_id, 'fecha', _fecha(instance))
+
+def _recalcular_resumen(clave):
+    estudiante_id, tipo, valor = clave
+    # El estudiante o el período pueden haberse borrado en cascada junto con la fila
+    if not Estudiante.objects.filter(pk=estudiante_id).exists():
+        return
+    if tipo == 'periodo':
+        ResumenService.recalcular([estudiante_id], Periodo.objects.filter(pk=valor).first())
+    else:
+        ResumenService.recalcular_por_fecha([estudiante_id], valor)
+
+def _recalcular_asistencia_grupos(claves):
+    # El grupo puede haberse borrado en cascada junto con las asistencias
+    existentes = set(Grupo.objects.filter(pk__in={g for g, _ in claves}).values_list('pk', flat=True))
+    ResumenAsistenciaService.recalcular(c for c in claves if c[0] in existentes)
+
+@receiver(pre_save, sender=Asistencia)
+@receiver(pre_save, sender=Calificacion)
+@receiver(pre_save, sender=Observador)
+def guardar_estado_anterior(sender, instance, **kwargs):
+    # Si la fila cambia de estudiante, fecha o período hay que recalcular
+    # también los resúmenes a los que pertenecía antes del cambio
+    if instance.pk:
+        instance._anterior = sender.objects.filter(pk=instance.pk).first()
+
+@receiver(post_save, sender=Asistencia)
+@receiver(post_save, sender=Observador)
+def encolar_notificaciones(sender, instance, created, **kwargs):
+    # Se conecta antes de actualizar_resumenes, que descarta _anterior. Los
+    # avisos se escriben en la transacción del guardado (el admin guarda
+    # dentro de una); el registro masivo los encola en AsistenciaService
+    if sender is Observador:
+        if created:
+            NotificacionService.encolar_observacion(instance)
+        return
+    anterior = instance.__dict__.get('_anterior')
+    misma_fila = anterior is not None and (anterior.estudiante_id, _fecha(anterior)) == (
+        instance.estudiante_id, _fecha(instance)
+    )
+    ausente_antes = misma_fila and anterior.estado == 'A'
+    # Una ausencia corregida antes del resumen retira su aviso pendiente
+    if anterior is not None and anterior.estado == 'A' and not (misma_fila and instance.estado == 'A'):
+        NotificacionService.retirar_ausencias([anterior.estudiante_id], _fecha(anterior))
+    if instance.estado == 'A' and not ausente_antes:
+        NotificacionService.encolar_ausencias([instance.estudiante_id], _fecha(instance))
+
+@receiver(post_delete, sender=Asistencia)
+def retirar_notificaciones(sender, instance, **kwargs):
+    if instance.estado == 'A':
+        NotificacionService.retirar_ausencias([instance.estudiante_id], _fecha(instance))
+
+@receiver(post_save, sender=Asistencia)
+@receiver(post_save, sender=Calificacion)
+@receiver(post_save, sender=Observador)
+@receiver(post_delete, sender=Asistencia)
+@receiver(post_delete, sender=Calificacion)
+@receiver(post_delete, sender=Observador)
+def actualizar_resumenes(sender, instance, **kwargs):
+    filas = [instance]
+    anterior = instance.__dict__.pop('_anterior', None)
+    if anterior is not None:
+        filas.append(anterior)
+    claves = {_clave_resumen(fila) for fila in filas}
+
+    claves_grupo = set()
+    if sender is Asistencia:
+        # El grupo se lee ahora: en un borrado en cascada el estudiante
+        # todavía existe dentro de la transacción
+        grupos = dict(
+            Estudiante.objects.filter(pk__in={fila.estudiante_id for fila in filas})
+            .values_list('pk', 'grupo_id')
+        )
+        claves_grupo = {
+            (grupos[fila.estudiante_id], _fecha(fila))
+            for fila in filas if fila.estudiante_id in grupos
+        }
+
+    def recalcular():
+        for clave in claves:
+            _recalcular_resumen(clave)
+        if claves_grupo:
+            _recalcular_asistencia_grupos(claves_grupo)
+
+    transaction.on_commit(recalcular)
+    # Las observaciones fuera de todo período no pasan por los resúmenes
+    PanelService.invalidar(fila.estudiante_id for fila in filas)
+
+@receiver(pre_save, sender=Estudiante)
+def guardar_grupo_anterior(sender, instance, **kwargs):
+    if instance.pk:
+        instance._grupo_anterior = (
+            Estudiante.objects.filter(pk=instance.pk).values_list('grupo_id', flat=True).first()
+        )
+
+@receiver(post_save, sender=Estudiante)
+def mover_asistencias_de_grupo(sender, instance, **kwargs):
+    # Las asistencias se agrupan por el grupo actual del estudiante, así que
+    # un cambio de grupo mueve todos sus días entre los dos resúmenes
+    grupo_anterior = instance.__dict__.pop('_grupo_anterior', None)
+    if grupo_anterior is None or grupo_anterior == instance.grupo_id:
+        return
+    fechas = set(Asistencia.objects.filter(estudiante=instance).values_list('fecha', flat=True))
+    claves = {(grupo_id, fecha) for fecha in fechas for grupo_id in (grupo_anterior, instance.grupo_id)}
+    if claves:
+        transaction.on_commit(lambda: _recalcular_asistencia_grupos(claves))
+
+@receiver(post_delete, sender=Token)
+def invalidar_token(sender, instance, **kwargs):
+    # Logout o token vencido
+    token_cache.invalidar_token(instance.key)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_tokens_usuario(sender, instance, **kwargs):
+    # Desactivación, cambio de contraseña o de rol: el usuario en caché ya no es válido
+    token_cache.invalidar_usuario(instance.pk)
+
+@receiver(post_save, sender=Rol)
+@receiver(post_delete, sender=Rol)
+def invalidar_tokens_rol(sender, instance, **kwargs):
+    token_cache.limpiar()
+    # También al confirmar, por si otro hilo recargó el registro antes del commit
+    registro_roles.invalidar()
+    transaction.on_commit(registro_roles.invalidar)
+
+@receiver(post_save, sender=Rol)
+@receiver(post_delete, sender=Rol)
+@receiver(post_save, sender=Grado)
+@receiver(post_delete, sender=Grado)
+@receiver(post_save, sender=Grupo)
+@receiver(post_delete, sender=Grupo)
+@receiver(post_save, sender=Asignatura)
+@receiver(post_delete, sender=Asignatura)
+@receiver(post_save, sender=Periodo)
+@receiver(post_delete, sender=Periodo)
+@receiver(post_save, sender=TipoObservacion)
+@receiver(post_delete, sender=TipoObservacion)
+def invalidar_catalogo(sender, instance, **kwargs):
+    catalogos.invalidar(sender)
+
+@receiver(pre_save, sender=Planeacion)
+def guardar_adjunto_anterior(sender, instance, update_fields=None, **kwargs):
+    if instance.pk and (update_fields is None or 'archivo_adjunto' in update_fields):
+        instance._adjunto_anterior = (
+            Planeacion.objects.filter(pk=instance.pk).values_list('archivo_adjunto', flat=True).first()
+        )
+
+@receiver(post_save, sender=Planeacion)
+def contar_referencias_adjunto(sender, instance, created, **kwargs):
+    # Referencias de los blobs deduplicados (core/almacenamiento.py)
+    comparar = '_adjunto_anterior' in instance.__dict__
+    anterior = hash_de_nombre(instance.__dict__.pop('_adjunto_anterior', None))
+    actual = hash_de_nombre(instance.archivo_adjunto.name)
+    if created:
+        ajustar_referencias(actual, 1)
+    elif comparar and anterior != actual:
+        ajustar_referencias(actual, 1)
+        ajustar_referencias(anterior, -1)
+
+@receiver(post_delete, sender=Planeacion)
+def descontar_referencia_adjunto(sender, instance, **kwargs):
+    ajustar_referencias(hash_de_nombre(instance.archivo_adjunto.name), -1)
+
@@ -1,3 +1,1928 @@
-from django.test import TestCase
+import base64
+import collections
+import csv
+import datetime
+import glob
+import io
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from . import roles
+from .almacenamiento import hash_de_nombre
+from .authentication import token_cache
+from .benchmarks import api as benchmark_api, cargar_base, comparar, medir, ruta_base
+from .benchmarks.datos import crear_institucion
+from .exports import FORMATOS
+from .logs import REDACTADO, JsonFormatter, NonBlockingHandler, RedactingFilter, SamplingFilter
+from .middleware import RegistroConsultas
+from .models import (
+    Rol, User, Grado, Grupo, Asignatura, Estudiante, DocenteAsignaturaGrupo,
+    Asistencia, Periodo, Calificacion, TipoObservacion, Observador, Planeacion, ResumenPeriodo,
+    ResumenAsistenciaDiaria, Trabajo, CargaAdjunto, BlobAdjunto, TransicionPlaneacion,
+    Notificacion
+)
+from .passwords import hashear_passwords
+from .salud import Sondas, sondas
+from .services import (
+    AsistenciaService, BlobAdjuntoService, NotificacionService, ResumenAsistenciaService, ResumenService,
+    TrabajoService
+)
+from .search import normalizar, texto_busqueda
 
-# Create your tests here.
+def crear_usuarios(rol, prefijo, total):
+    usuarios = [
+        User(
+            email=f'{prefijo}{i}@sise.test', nombre=f'Nombre {i}', apellido=f'{prefijo} {i}',
+            password='!', rol=rol
+        )
+        for i in range(total)
+    ]
+    for usuario in usuarios:
+        usuario.busqueda = texto_busqueda(usuario.nombre, usuario.apellido, usuario.email)
+    User.objects.bulk_create(usuarios)
+    return list(User.objects.filter(email__startswith=prefijo).order_by('id'))
+
+def crear_planeacion(docente, asignatura, grupo, estado='B', fecha=datetime.date(2025, 2, 3), **campos):
+    return Planeacion.objects.create(
+        docente=docente, asignatura=asignatura, grupo=grupo, fecha=fecha, tema='Unidad 1',
+        objetivos='Objetivos', competencias='Competencias', actividades='Actividades',
+        recursos='Recursos', evaluacion='Evaluación', estado=estado, **campos
+    )
+
+class AdminConsultasTest(TestCase):
+    """
+    Número máximo de consultas de cada listado del admin con datos de una
+    institución pequeña. Si un listado vuelve a consultar relaciones por
+    fila (N+1) el conteo pasa a depender del número de filas y la prueba falla.
+    """
+    ESTUDIANTES = 120
+
+    @classmethod
+    def setUpTestData(cls):
+        rol_admin = Rol.objects.create(nombre='Administrador')
+        rol_docente = Rol.objects.create(nombre='Docente')
+        rol_estudiante = Rol.objects.create(nombre='Estudiante')
+        cls.admin = User.objects.create(
+            email='admin@sise.test', nombre='Admin', apellido='SISE', password='!',
+            rol=rol_admin, is_staff=True, is_superuser=True
+        )
+
+        grados = Grado.objects.bulk_create([Grado(nombre=f'Grado {i}') for i in range(6, 12)])
+        grupos = Grupo.objects.bulk_create([
+            Grupo(nombre=f'0{n}', grado=grado) for grado in grados for n in (1, 2)
+        ])
+        asignaturas = Asignatura.objects.bulk_create([
+            Asignatura(nombre=nombre) for nombre in ('Matemáticas', 'Español', 'Ciencias', 'Inglés')
+        ])
+        periodo = Periodo.objects.create(
+            nombre='Primer período', fecha_inicio=datetime.date(2025, 1, 20),
+            fecha_fin=datetime.date(2025, 4, 11)
+        )
+        tipos = TipoObservacion.objects.bulk_create([
+            TipoObservacion(nombre='Convivencia'), TipoObservacion(nombre='Académica')
+        ])
+
+        docentes = crear_usuarios(rol_docente, 'docente', len(asignaturas))
+        DocenteAsignaturaGrupo.objects.bulk_create([
+            DocenteAsignaturaGrupo(docente=docente, asignatura=asignatura, grupo=grupo)
+            for docente, asignatura in zip(docentes, asignaturas) for grupo in grupos
+        ])
+        Planeacion.objects.bulk_create([
+            Planeacion(
+                docente=docentes[n % len(docentes)], asignatura=asignaturas[n % len(asignaturas)],
+                grupo=grupos[n % len(grupos)], fecha=datetime.date(2025, 2, 1 + n % 28),
+                tema=f'Tema {n}', objetivos='-', competencias='-', actividades='-',
+                recursos='-', evaluacion='-'
+            )
+            for n in range(120)
+        ])
+
+        usuarios = crear_usuarios(rol_estudiante, 'estudiante', cls.ESTUDIANTES)
+        Estudiante.objects.bulk_create([
+            Estudiante(user=usuario, grupo=grupos[n % len(grupos)]) for n, usuario in enumerate(usuarios)
+        ])
+        estudiantes = list(Estudiante.objects.order_by('id'))
+        Asistencia.objects.bulk_create([
+            Asistencia(estudiante=estudiante, fecha=fecha, estado='P', registrada_por=docentes[0])
+            for estudiante in estudiantes
+            for fecha in (datetime.date(2025, 2, 3), datetime.date(2025, 2, 4))
+        ])
+        Calificacion.objects.bulk_create([
+            Calificacion(estudiante=estudiante, asignatura=asignatura, periodo=periodo, nota='4.0')
+            for estudiante in estudiantes for asignatura in asignaturas
+        ])
+        Observador.objects.bulk_create([
+            Observador(
+                estudiante=estudiante, tipo_observacion=tipos[n % 2], registrada_por=docentes[0],
+                fecha=datetime.date(2025, 2, 5), descripcion='-'
+            )
+            for n, estudiante in enumerate(estudiantes)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assertConsultasMaximas(self, url, maximo):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertLessEqual(
+            len(consultas), maximo,
+            f'{url} ejecutó {len(consultas)} consultas (máximo {maximo})'
+        )
+
+    def test_listados(self):
+        # Sesión, usuario, conteos de la paginación, filtros laterales y la
+        # página de resultados; no dependen del número de filas
+        maximos = {
+            'rol': 5,
+            'user': 6,
+            'grado': 5,
+            'grupo': 6,
+            'asignatura': 5,
+            'estudiante': 7,
+            'docenteasignaturagrupo': 8,
+            'periodo': 5,
+            'asistencia': 8,
+            'calificacion': 8,
+            'tipoobservacion': 5,
+            'observador': 9,
+            'planeacion': 10,
+        }
+        for modelo, maximo in maximos.items():
+            with self.subTest(modelo=modelo):
+                self.assertConsultasMaximas(f'/admin/core/{modelo}/', maximo)
+
+    def test_formularios(self):
+        # Los selectores de grupo cargan el grado en la misma consulta y los
+        # campos de estudiante y docente usan autocompletado (antes de estos
+        # cambios el formulario de asistencia hacía más de 360 consultas)
+        maximos = {
+            'estudiante': 6,
+            'docenteasignaturagrupo': 7,
+            'asistencia': 5,
+            'calificacion': 7,
+            'observador': 6,
+            'planeacion': 7,
+        }
+        for modelo, maximo in maximos.items():
+            with self.subTest(modelo=modelo):
+                self.assertConsultasMaximas(f'/admin/core/{modelo}/add/', maximo)
+
+    def test_autocompletado_estudiantes(self):
+        self.assertConsultasMaximas(
+            '/admin/autocomplete/?app_label=core&model_name=asistencia&field_name=estudiante&term=nombre',
+            5
+        )
+
+class ApiBenchmarkTest(TestCase):
+    """
+    Ejecuta el escenario de benchmark 'api' con pocos datos y compara el número
+    de consultas de cada endpoint con la línea base guardada. Los tiempos
+    dependen de la máquina y se comparan con ``manage.py benchmark api --comparar``.
+    """
+    def test_consultas_sin_regresiones(self):
+        base = cargar_base(ruta_base('api'))
+        resultados = benchmark_api.run({'tamano': 30, 'repeticiones': 2})
+        self.assertEqual(
+            {resultado['nombre'] for resultado in resultados},
+            {resultado['nombre'] for resultado in base['resultados']}
+        )
+        self.assertEqual(comparar(resultados, base, tiempos=False), [])
+
+    def test_consultas_de_cada_repeticion(self):
+        # La primera repetición consulta dos veces (caché frío); las demás una
+        llamadas = []
+
+        def funcion():
+            llamadas.append(1)
+            for _ in range(2 if len(llamadas) == 1 else 1):
+                list(Grado.objects.all())
+
+        resultado = medir('variable', funcion, repeticiones=3)
+        self.assertEqual((resultado['consultas_min'], resultado['consultas']), (1, 2))
+        base = {'resultados': [dict(resultado, consultas=1)]}
+        self.assertEqual(comparar([resultado], base, tiempos=False), [
+            {'nombre': 'variable', 'metrica': 'consultas', 'base': 1, 'actual': 2}
+        ])
+
+class AsistenciaMasivaTest(APITestCase):
+    URL = '/api/asistencias/registro-masivo/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=2, estudiantes_por_grupo=3, prefijo='asistencia')
+        cls.grupo = cls.datos.grupos[0]
+        cls.estudiantes = [e for e in cls.datos.estudiantes if e.grupo_id == cls.grupo.id]
+        cls.otro = next(e for e in cls.datos.estudiantes if e.grupo_id != cls.grupo.id)
+
+    def setUp(self):
+        self.client.force_authenticate(self.datos.docente)
+
+    def registrar(self, registros, fecha='2025-02-03'):
+        return self.client.post(
+            self.URL, {'grupo': self.grupo.id, 'fecha': fecha, 'registros': registros}, format='json'
+        )
+
+    def test_crea_y_actualiza_con_un_upsert(self):
+        respuesta = self.registrar([{'estudiante': e.id, 'estado': 'P'} for e in self.estudiantes])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.data['creados'], respuesta.data['actualizados']), (3, 0))
+
+        respuesta = self.registrar([{'estudiante': self.estudiantes[0].id, 'estado': 'T', 'observaciones': 'Bus'}])
+        self.assertEqual((respuesta.data['creados'], respuesta.data['actualizados']), (0, 1))
+        asistencia = Asistencia.objects.get(estudiante=self.estudiantes[0], fecha=datetime.date(2025, 2, 3))
+        self.assertEqual((asistencia.estado, asistencia.observaciones), ('T', 'Bus'))
+        self.assertEqual(Asistencia.objects.count(), 3)
+
+    def test_errores_por_fila(self):
+        primero = self.estudiantes[0].id
+        respuesta = self.registrar([
+            {'estudiante': primero, 'estado': 'P'},
+            {'estudiante': primero, 'estado': 'A'},
+            {'estudiante': self.otro.id, 'estado': 'P'},
+        ])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['errores'], 2)
+        self.assertEqual([r['resultado'] for r in respuesta.data['resultados']], ['creado', 'error', 'error'])
+        self.assertEqual(Asistencia.objects.get(estudiante_id=primero).estado, 'P')
+        self.assertFalse(Asistencia.objects.filter(estudiante=self.otro).exists())
+
+    def test_validacion_y_permisos(self):
+        self.assertEqual(self.registrar([]).status_code, 400)
+        self.assertEqual(self.registrar([{'estudiante': self.estudiantes[0].id, 'estado': 'X'}]).status_code, 400)
+
+        ajeno = User.objects.create(
+            email='ajeno@sise.test', nombre='Ajeno', apellido='Docente', password='!',
+            rol=self.datos.roles['Docente']
+        )
+        self.client.force_authenticate(ajeno)
+        self.assertEqual(self.registrar([{'estudiante': self.estudiantes[0].id, 'estado': 'P'}]).status_code, 403)
+
+
+class PlanillaCalificacionesTest(APITestCase):
+    URL = '/api/calificaciones/planilla/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=2, estudiantes_por_grupo=3, prefijo='planilla')
+        cls.asignacion = cls.datos.asignaciones[0]
+        cls.estudiantes = [e for e in cls.datos.estudiantes if e.grupo_id == cls.asignacion.grupo_id]
+        cls.otro = next(e for e in cls.datos.estudiantes if e.grupo_id != cls.asignacion.grupo_id)
+
+    def setUp(self):
+        self.client.force_authenticate(self.datos.docente)
+
+    def registrar(self, registros):
+        return self.client.post(self.URL, {
+            'asignacion': self.asignacion.id, 'periodo': self.datos.periodo.id, 'registros': registros
+        }, format='json')
+
+    def test_upsert_y_errores_por_fila(self):
+        primero, segundo, _ = self.estudiantes
+        respuesta = self.registrar([
+            {'estudiante': primero.id, 'nota': '4.5'},
+            {'estudiante': segundo.id, 'nota': '7.0'},
+            {'estudiante': self.otro.id, 'nota': '3.0'},
+            {'estudiante': primero.id, 'nota': '2.0'},
+        ])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(
+            [r['resultado'] for r in respuesta.data['resultados']], ['creado', 'error', 'error', 'error']
+        )
+        self.assertIn('nota', respuesta.data['resultados'][1]['detalle'])
+
+        respuesta = self.registrar([{'estudiante': primero.id, 'nota': '3.5', 'observaciones': 'Recuperó'}])
+        self.assertEqual(respuesta.data['actualizados'], 1)
+        calificacion = Calificacion.objects.get(estudiante=primero)
+        self.assertEqual((str(calificacion.nota), calificacion.observaciones), ('3.5', 'Recuperó'))
+
+    def test_consultas_no_dependen_de_las_filas(self):
+        with CaptureQueriesContext(connection) as una:
+            self.registrar([{'estudiante': self.estudiantes[0].id, 'nota': '4.0'}])
+        Calificacion.objects.all().delete()
+        with CaptureQueriesContext(connection) as todas:
+            self.registrar([{'estudiante': e.id, 'nota': '4.0'} for e in self.estudiantes])
+        self.assertEqual(len(una), len(todas))
+
+    def test_solo_el_docente_de_la_asignacion(self):
+        ajeno = User.objects.create(
+            email='ajeno.planilla@sise.test', nombre='Ajeno', apellido='Docente', password='!',
+            rol=self.datos.roles['Docente']
+        )
+        self.client.force_authenticate(ajeno)
+        self.assertEqual(self.registrar([{'estudiante': self.estudiantes[0].id, 'nota': '4.0'}]).status_code, 403)
+
+class ResumenPeriodoTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=1, estudiantes_por_grupo=2, prefijo='resumen')
+        cls.estudiante, cls.companero = cls.datos.estudiantes
+        cls.tipo = TipoObservacion.objects.create(nombre='Convivencia')
+
+    def resumen(self):
+        return ResumenPeriodo.objects.get(estudiante=self.estudiante, periodo=self.datos.periodo)
+
+    def test_senales_mantienen_el_resumen(self):
+        fecha = datetime.date(2025, 2, 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            asistencia = Asistencia.objects.create(
+                estudiante=self.estudiante, fecha=fecha, estado='A', registrada_por=self.datos.docente
+            )
+            Calificacion.objects.create(
+                estudiante=self.estudiante, asignatura=self.datos.asignatura, periodo=self.datos.periodo, nota='4.0'
+            )
+            Observador.objects.create(
+                estudiante=self.estudiante, tipo_observacion=self.tipo, registrada_por=self.datos.docente,
+                fecha=fecha, descripcion='-'
+            )
+        resumen = self.resumen()
+        self.assertEqual((resumen.ausencias, resumen.observaciones), (1, 1))
+        self.assertEqual(resumen.promedio_general, Decimal('4.00'))
+        self.assertEqual(resumen.observaciones_por_tipo, {str(self.tipo.id): 1})
+
+        # Una fecha fuera del período saca la asistencia del resumen anterior
+        with self.captureOnCommitCallbacks(execute=True):
+            asistencia.fecha = datetime.date(2025, 6, 1)
+            asistencia.save()
+        self.assertEqual(self.resumen().ausencias, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Calificacion.objects.filter(estudiante=self.estudiante).get().delete()
+        self.assertIsNone(self.resumen().promedio_general)
+
+    def test_reconstruir_coincide_con_el_incremental(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for estudiante, nota in ((self.estudiante, '3.0'), (self.companero, '5.0')):
+                Calificacion.objects.create(
+                    estudiante=estudiante, asignatura=self.datos.asignatura, periodo=self.datos.periodo, nota=nota
+                )
+        incremental = {r.estudiante_id: (r.notas, r.promedio_general) for r in ResumenPeriodo.objects.all()}
+        self.assertEqual(ResumenService.reconstruir(), 2)
+        reconstruido = {r.estudiante_id: (r.notas, r.promedio_general) for r in ResumenPeriodo.objects.all()}
+        self.assertEqual(incremental, reconstruido)
+
+    def test_boletin_solo_del_propio_estudiante(self):
+        ResumenService.reconstruir()
+        url = f'/api/estudiantes/{self.estudiante.id}/boletin/'
+        self.client.force_authenticate(self.estudiante.user)
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.data), 1)
+        self.assertEqual(self.client.get(url, {'periodo': 'x'}).status_code, 400)
+
+        self.client.force_authenticate(self.companero.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+class ResumenAsistenciaTest(APITestCase):
+    URL = '/api/asistencias/resumen/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=2, estudiantes_por_grupo=2, prefijo='rollup')
+        cls.grupo, cls.otro_grupo = cls.datos.grupos
+        cls.estudiantes = [e for e in cls.datos.estudiantes if e.grupo_id == cls.grupo.id]
+
+    def setUp(self):
+        self.client.force_authenticate(self.datos.docente)
+        for fecha, estados in ((datetime.date(2025, 2, 3), 'PA'), (datetime.date(2025, 2, 4), 'PT')):
+            AsistenciaService.registrar_grupo(self.grupo, fecha, [
+                {'estudiante': e.id, 'estado': estado} for e, estado in zip(self.estudiantes, estados)
+            ], self.datos.docente)
+
+    def test_agrupaciones(self):
+        parametros = {'grupo': self.grupo.id, 'desde': '2025-02-01', 'hasta': '2025-02-28'}
+        dias = self.client.get(self.URL, parametros).data
+        self.assertEqual(len(dias['resultados']), 2)
+        self.assertEqual(
+            (dias['totales']['presentes'], dias['totales']['ausencias'], dias['totales']['tardanzas']), (2, 1, 1)
+        )
+        semanas = self.client.get(self.URL, {**parametros, 'agrupacion': 'semana'}).data
+        self.assertEqual(len(semanas['resultados']), 1)
+        self.assertEqual(semanas['totales'], dias['totales'])
+        periodos = self.client.get(self.URL, {'grupo': self.grupo.id, 'agrupacion': 'periodo'}).data
+        self.assertEqual(periodos['resultados'][0]['periodo_id'], self.datos.periodo.id)
+        self.assertEqual(periodos['totales'], dias['totales'])
+
+    def test_cambio_de_grupo_mueve_las_asistencias(self):
+        estudiante = Estudiante.objects.get(pk=self.estudiantes[1].pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            estudiante.grupo = self.otro_grupo
+            estudiante.save()
+        totales = ResumenAsistenciaService.consultar('periodo', grupo=self.otro_grupo)['totales']
+        self.assertEqual((totales['ausencias'], totales['tardanzas']), (1, 1))
+        self.assertEqual(ResumenAsistenciaService.verificar(), [])
+
+    def test_verificar_detecta_y_reconstruye(self):
+        ResumenAsistenciaDiaria.objects.filter(grupo=self.grupo).update(presentes=9)
+        self.assertTrue(ResumenAsistenciaService.verificar())
+        ResumenAsistenciaService.reconstruir()
+        self.assertEqual(ResumenAsistenciaService.verificar(), [])
+
+    def test_validacion_y_permisos(self):
+        self.assertEqual(self.client.get(self.URL, {'grupo': self.grupo.id}).status_code, 400)
+        # Sin grupo solo consulta el personal administrativo
+        self.assertEqual(self.client.get(self.URL, {'desde': '2025-02-01', 'hasta': '2025-02-28'}).status_code, 403)
+
+class TokenAuthTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(nombre='Docente')
+        cls.usuario = User.objects.create(email='token@sise.test', nombre='Token', apellido='Prueba', rol=rol)
+        cls.usuario.set_password('clave-segura-123')
+        cls.usuario.save()
+
+    def setUp(self):
+        token_cache.limpiar()
+
+    def login(self):
+        respuesta = self.client.post('/api/login/', {'email': self.usuario.email, 'password': 'clave-segura-123'})
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.data['token']
+
+    def vencer(self, key):
+        Token.objects.filter(key=key).update(created=timezone.now() - datetime.timedelta(hours=25))
+        token_cache.limpiar()
+
+    def test_cache_evita_consultar_el_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.login()}')
+        self.assertEqual(self.client.get('/api/user/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/user/').status_code, 200)
+
+    def test_invalidaciones(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.login()}')
+        self.client.get('/api/user/')
+        User.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        # update no emite señales: el usuario sigue en caché hasta que se guarda
+        usuario = User.objects.get(pk=self.usuario.pk)
+        usuario.save()
+        self.assertEqual(self.client.get('/api/user/').status_code, 401)
+
+        usuario.is_active = True
+        usuario.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.login()}')
+        self.assertEqual(self.client.post('/api/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/user/').status_code, 401)
+
+    def test_token_vencido(self):
+        key = self.login()
+        self.vencer(key)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+        self.assertEqual(self.client.get('/api/user/').status_code, 401)
+        self.assertFalse(Token.objects.filter(key=key).exists())
+
+        self.client.credentials()
+        key = self.login()
+        self.vencer(key)
+        self.assertNotEqual(self.login(), key)
+
+    def test_token_auth_reemplaza_el_token_vencido(self):
+        credenciales = {'username': self.usuario.email, 'password': 'clave-segura-123'}
+        key = self.client.post('/api/token-auth/', credenciales).data['token']
+        self.assertEqual(self.client.post('/api/token-auth/', credenciales).data['token'], key)
+        self.vencer(key)
+        nuevo = self.client.post('/api/token-auth/', credenciales).data['token']
+        self.assertNotEqual(nuevo, key)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {nuevo}')
+        self.assertEqual(self.client.get('/api/user/').status_code, 200)
+
+class LogsTest(APITestCase):
+    def registro(self, nombre, nivel=logging.INFO, **campos):
+        registro = logging.makeLogRecord({'name': 'sise.prueba', 'levelno': nivel, 'levelname': logging.getLevelName(nivel)})
+        registro.evento, registro.campos = nombre, campos
+        return registro
+
+    def test_redacta_credenciales(self):
+        registro = self.registro(
+            'auth.login', datos={'email': 'a@sise.test', 'password': 'x'}, headers={'Authorization': 'Token y'},
+            token_nuevo=True, pin={'password': 123456, 'password2': None}
+        )
+        RedactingFilter().filter(registro)
+        self.assertEqual(registro.campos['datos'], {'email': 'a@sise.test', 'password': REDACTADO})
+        self.assertEqual(registro.campos['pin'], {'password': REDACTADO, 'password2': None})
+        self.assertEqual(registro.campos['headers'], {'Authorization': REDACTADO})
+        self.assertIs(registro.campos['token_nuevo'], True)
+
+    def test_muestreo_no_descarta_advertencias(self):
+        filtro = SamplingFilter({'ruidoso': 0.0})
+        self.assertFalse(filtro.filter(self.registro('ruidoso')))
+        self.assertTrue(filtro.filter(self.registro('ruidoso', logging.WARNING)))
+        self.assertTrue(filtro.filter(self.registro('otro')))
+
+    def test_formato_json(self):
+        linea = json.loads(JsonFormatter().format(self.registro('auth.login', resultado='ok', user_id=3)))
+        self.assertEqual(
+            {clave: linea[clave] for clave in ('nivel', 'logger', 'evento', 'resultado', 'user_id')},
+            {'nivel': 'INFO', 'logger': 'sise.prueba', 'evento': 'auth.login', 'resultado': 'ok', 'user_id': 3}
+        )
+
+    def test_manejador_no_bloquea_con_la_cola_llena(self):
+        manejador = NonBlockingHandler(stream=io.StringIO(), tamano_cola=1)
+        # Sin el hilo escritor la cola no se vacía
+        manejador.detener()
+        for _ in range(3):
+            manejador.emit(self.registro('ruidoso'))
+        self.assertEqual(manejador.descartados, 2)
+
+    def test_login_emite_evento(self):
+        with self.assertLogs('sise.auth', logging.INFO) as registros:
+            self.client.post('/api/login/', {'email': 'nadie@sise.test', 'password': 'x'})
+        self.assertEqual(
+            [(r.evento, r.campos['resultado']) for r in registros.records], [('auth.login', 'no_existe')]
+        )
+
+class UsuariosPaginacionTest(APITestCase):
+    URL = '/api/usuarios/'
+
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(nombre='Estudiante')
+        cls.admin = User.objects.create(
+            email='admin.paginas@sise.test', nombre='Admin', apellido='Paginas', password='!', rol=rol, is_staff=True
+        )
+        # Apellidos repetidos: el desempate por id debe mantener el orden estable
+        User.objects.bulk_create([
+            User(email=f'pagina{i}@sise.test', nombre=f'N{i % 3}', apellido=f'A{i % 4}', password='!', rol=rol)
+            for i in range(23)
+        ])
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def recorrer(self, url, enlace='next'):
+        ids, paginas = [], 0
+        while url:
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            ids += [usuario['id'] for usuario in respuesta.data['results']]
+            url, paginas = respuesta.data[enlace], paginas + 1
+        return ids, paginas
+
+    def test_recorre_todas_las_paginas_en_orden(self):
+        esperado = list(User.objects.order_by('apellido', 'nombre', 'id').values_list('id', flat=True))
+        ids, paginas = self.recorrer(f'{self.URL}?page_size=5')
+        self.assertEqual((ids, paginas), (esperado, 5))
+
+        esperado = list(User.objects.order_by('-email', 'id').values_list('id', flat=True))
+        self.assertEqual(self.recorrer(f'{self.URL}?page_size=7&ordering=-email')[0], esperado)
+
+    def test_enlace_anterior(self):
+        primera = self.client.get(self.URL, {'page_size': 5}).data
+        self.assertIsNone(primera['previous'])
+        segunda = self.client.get(primera['next']).data
+        self.assertEqual(self.client.get(segunda['previous']).data['results'], primera['results'])
+
+    def test_consultas_no_dependen_de_la_profundidad(self):
+        primera = self.client.get(self.URL, {'page_size': 5}).data
+        with CaptureQueriesContext(connection) as inicio:
+            self.client.get(self.URL, {'page_size': 5})
+        with CaptureQueriesContext(connection) as siguiente:
+            self.client.get(primera['next'])
+        self.assertEqual(len(inicio), len(siguiente))
+        self.assertFalse(any('COUNT(' in consulta['sql'] for consulta in siguiente.captured_queries))
+
+    def test_cursor_invalido_y_paginacion_por_numero(self):
+        self.assertEqual(self.client.get(self.URL, {'cursor': 'no-es-un-cursor'}).status_code, 404)
+        # Cursores manipulados con valores del tipo equivocado
+        for valores in (['M', 'N', 'abc'], ['M', 'N', {'id': 1}], ['M', None, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps({'v': valores, 'a': False}).encode()).decode()
+            self.assertEqual(self.client.get(self.URL, {'cursor': cursor}).status_code, 404, valores)
+        respuesta = self.client.get(self.URL, {'page': 2})
+        self.assertEqual(respuesta.data['count'], 24)
+
+class BusquedaUsuariosTest(APITestCase):
+    URL = '/api/usuarios/'
+
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(nombre='Estudiante')
+        cls.admin = User.objects.create(
+            email='admin.busqueda@sise.test', nombre='Admin', apellido='Busqueda', password='!', rol=rol, is_staff=True
+        )
+        for nombre, apellido in (('María José', 'Gómez Peña'), ('José', 'Álvarez'), ('Andrés', 'Gomes')):
+            User.objects.create(
+                email=f'{normalizar(apellido).replace(" ", ".")}@sise.test', nombre=nombre, apellido=apellido,
+                password='!', rol=rol
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def apellidos(self, texto):
+        respuesta = self.client.get(self.URL, {'search': texto})
+        self.assertEqual(respuesta.status_code, 200)
+        return sorted(usuario['apellido'] for usuario in respuesta.data['results'])
+
+    def test_sin_tildes_y_por_prefijo(self):
+        self.assertEqual(self.apellidos('gomez'), ['Gómez Peña'])
+        self.assertEqual(self.apellidos('GÓM'), ['Gomes', 'Gómez Peña'])
+        self.assertEqual(self.apellidos('jose'), ['Gómez Peña', 'Álvarez'])
+        self.assertEqual(self.apellidos('jose alv'), ['Álvarez'])
+        self.assertEqual(self.apellidos('pena.gomez'), ['Gómez Peña'])
+        self.assertEqual(self.apellidos('ramirez'), [])
+
+    def test_indice_se_actualiza_al_guardar(self):
+        usuario = User.objects.get(apellido='Gomes')
+        usuario.apellido, usuario.email = 'Núñez', 'nunez@sise.test'
+        usuario.save()
+        self.assertEqual(self.apellidos('gomes'), [])
+        self.assertEqual(self.apellidos('nunez'), ['Núñez'])
+
+class ExportacionesTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=2, estudiantes_por_grupo=2, prefijo='exportacion')
+        cls.admin = User.objects.create(
+            email='admin.exportacion@sise.test', nombre='Admin', apellido='Exportación', password='!',
+            rol=cls.datos.docente.rol, is_staff=True
+        )
+        Asistencia.objects.bulk_create([
+            Asistencia(
+                estudiante=estudiante, fecha=datetime.date(2025, 2, 3), estado='A',
+                observaciones='Cita médica' if n == 0 else None, registrada_por=cls.datos.docente
+            )
+            for n, estudiante in enumerate(cls.datos.estudiantes)
+        ])
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def exportar(self, **parametros):
+        return self.client.get(
+            '/api/exportar/asistencias/', {'desde': '2025-02-01', 'hasta': '2025-02-28', **parametros}
+        )
+
+    def test_csv(self):
+        respuesta = self.exportar(grupo=self.datos.grupos[0].id)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.streaming)
+        self.assertIn('asistencias-', respuesta['Content-Disposition'])
+        filas = list(csv.reader(io.StringIO(b''.join(respuesta.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual(filas[0][:3], ['Fecha', 'Estudiante ID', 'Apellido'])
+        self.assertEqual(len(filas), 3)
+        self.assertIn('Cita médica', filas[1])
+
+    def test_xlsx(self):
+        respuesta = self.exportar(formato='xlsx')
+        self.assertEqual(respuesta['Content-Type'], FORMATOS['xlsx'])
+        with zipfile.ZipFile(io.BytesIO(b''.join(respuesta.streaming_content))) as libro:
+            self.assertIsNone(libro.testzip())
+            hoja = libro.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(hoja.count('<row'), 5)
+        self.assertIn('Cita médica', hoja)
+
+    def test_otras_exportaciones(self):
+        usuarios = b''.join(self.client.get('/api/exportar/usuarios/').streaming_content).decode('utf-8-sig')
+        self.assertEqual(len(usuarios.splitlines()), User.objects.count() + 1)
+        respuesta = self.client.get('/api/exportar/calificaciones/', {'periodo': self.datos.periodo.id})
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_validacion_y_permisos(self):
+        self.assertEqual(self.exportar(desde='2025-03-01').status_code, 400)
+        self.assertEqual(self.exportar(formato='pdf').status_code, 400)
+        self.client.force_authenticate(self.datos.docente)
+        self.assertEqual(self.exportar().status_code, 403)
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class MatriculaImportTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=2, estudiantes_por_grupo=1, prefijo='matricula')
+        cls.admin = User.objects.create(
+            email='admin.matricula@sise.test', nombre='Admin', apellido='Matrícula', password='!',
+            rol=cls.datos.docente.rol, is_staff=True
+        )
+
+    def setUp(self):
+        self.privados = tempfile.TemporaryDirectory()
+        self.addCleanup(self.privados.cleanup)
+        ajustes = override_settings(SISE_TRABAJOS_PRIVADOS_DIR=self.privados.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.client.force_authenticate(self.admin)
+
+    def registro(self, n, **campos):
+        return {
+            'email': f'nuevo{n}@sise.test', 'nombre': f'Nuevo {n}', 'apellido': 'Matrícula',
+            'password': 'Clave-segura-2025', 'grupo_id': self.datos.grupos[0].id, **campos
+        }
+
+    def importar(self, registros, **opciones):
+        return self.client.post('/api/matricula/importar/', {'registros': registros, **opciones}, format='json')
+
+    def test_importa_registros(self):
+        por_nombre = self.registro(1, grado='matricula grado', grupo='02')
+        del por_nombre['grupo_id']
+        respuesta = self.importar([self.registro(0), por_nombre])
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.data['creados'], 2)
+        usuario = User.objects.get(email='nuevo1@sise.test')
+        self.assertTrue(usuario.check_password('Clave-segura-2025'))
+        self.assertEqual(usuario.rol.nombre, 'Estudiante')
+        self.assertEqual(usuario.estudiante.grupo, self.datos.grupos[1])
+        self.assertEqual(usuario.busqueda, texto_busqueda(usuario.nombre, usuario.apellido, usuario.email))
+
+    def test_archivo_csv(self):
+        contenido = (
+            '\ufeffemail,nombre,apellido,grado,grupo\n'
+            'csv0@sise.test,Ana,Pérez,matricula grado,01\n'
+            'csv1@sise.test,Luis,Gómez,matricula grado,02\n'
+        ).encode('utf-8')
+        respuesta = self.client.post('/api/matricula/importar/', {
+            'archivo': SimpleUploadedFile('matricula.csv', contenido, content_type='text/csv'),
+            'password_por_defecto': 'Clave-segura-2025'
+        })
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.data['creados'], 2)
+        self.assertTrue(User.objects.get(email='csv0@sise.test').check_password('Clave-segura-2025'))
+
+    def test_errores_por_fila(self):
+        registros = [
+            self.registro(0),
+            self.registro(1, email=self.datos.docente.email),
+            self.registro(2, grupo_id=999999),
+            self.registro(3, password='123'),
+            self.registro(0, nombre='Repetido'),
+            {'email': 'incompleto@sise.test'},
+        ]
+        respuesta = self.importar(registros)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual([error['fila'] for error in respuesta.data['errores']], [1, 2, 3, 4, 5])
+        self.assertEqual(respuesta.data['errores'][0]['detalle'], 'Ya existe un usuario con este email')
+        self.assertEqual(respuesta.data['creados'], 0)
+        self.assertFalse(User.objects.filter(email='nuevo0@sise.test').exists())
+
+        respuesta = self.importar(registros, parcial=True)
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.data['creados'], 1)
+        self.assertTrue(User.objects.filter(email='nuevo0@sise.test').exists())
+
+    def test_simular_no_escribe(self):
+        respuesta = self.importar([self.registro(0)], simular=True)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.data['validos'], respuesta.data['creados']), (1, 0))
+        self.assertFalse(User.objects.filter(email='nuevo0@sise.test').exists())
+
+    def test_email_registrado_durante_el_hash(self):
+        def hashear_y_registrar(passwords, procesos=None):
+            # Otra petición registra el email mientras se hashean las contraseñas
+            User.objects.create(
+                email='nuevo1@sise.test', nombre='Otro', apellido='Proceso', password='!', rol=self.datos.docente.rol
+            )
+            return hashear_passwords(passwords, procesos)
+
+        with mock.patch('core.services.matricula_service.hashear_passwords', side_effect=hashear_y_registrar):
+            respuesta = self.importar([self.registro(0), self.registro(1)])
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.data['errores'], [
+            {'fila': 1, 'email': 'nuevo1@sise.test', 'detalle': 'Ya existe un usuario con este email'}
+        ])
+        self.assertFalse(User.objects.filter(email='nuevo0@sise.test').exists())
+
+        User.objects.filter(email='nuevo1@sise.test').delete()
+        with mock.patch('core.services.matricula_service.hashear_passwords', side_effect=hashear_y_registrar):
+            respuesta = self.importar([self.registro(0), self.registro(1)], parcial=True)
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.data['creados'], 1)
+        self.assertTrue(Estudiante.objects.filter(user__email='nuevo0@sise.test').exists())
+        self.assertFalse(Estudiante.objects.filter(user__email='nuevo1@sise.test').exists())
+
+    @override_settings(SISE_MATRICULA_SINCRONA_MAX=1)
+    def test_importacion_grande_se_encola(self):
+        respuesta = self.importar([self.registro(0), self.registro(1)], password_por_defecto='Clave-segura-2025')
+        self.assertEqual(respuesta.status_code, 202)
+        self.assertFalse(User.objects.filter(email__startswith='nuevo').exists())
+        trabajo = Trabajo.objects.get(pk=respuesta.data['id'])
+        self.assertEqual(trabajo.tipo, 'importar_matricula')
+        self.assertEqual(trabajo.usuario, self.admin)
+        self.assertEqual(len(trabajo.parametros['registros']), 2)
+        # Las contraseñas no se guardan en la base mientras el trabajo espera
+        self.assertNotIn('Clave-segura-2025', json.dumps(trabajo.parametros))
+        self.assertEqual(trabajo.parametros['password_por_defecto'], REDACTADO)
+        self.assertEqual(os.listdir(self.privados.name), [f'{trabajo.pk}.json'])
+
+        # La simulación no hashea, así que sigue siendo síncrona
+        self.assertEqual(self.importar([self.registro(0), self.registro(1)], simular=True).status_code, 200)
+
+        self.assertTrue(TrabajoService.ejecutar(TrabajoService.reclamar('host:1:a')))
+        self.assertTrue(User.objects.get(email='nuevo1@sise.test').check_password('Clave-segura-2025'))
+        self.assertEqual(os.listdir(self.privados.name), [])
+
+    @override_settings(SISE_MATRICULA_SINCRONA_MAX=1)
+    def test_importacion_grande_valida_antes_de_encolar(self):
+        respuesta = self.importar([self.registro(0), self.registro(1, grupo_id=999999)])
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(
+            [(error['fila'], error['detalle']) for error in respuesta.data['errores']], [(1, 'El grupo no existe')]
+        )
+        self.assertFalse(Trabajo.objects.exists())
+
+        # Con parcial se encolan igualmente las filas válidas
+        respuesta = self.importar([self.registro(0), self.registro(1, grupo_id=999999)], parcial=True)
+        self.assertEqual(respuesta.status_code, 202)
+
+class RegistroRolesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.docente = Rol.objects.create(nombre='Docente')
+
+    def setUp(self):
+        self.registro = roles.RegistroRoles(ttl=300)
+
+    def test_busquedas_en_memoria(self):
+        self.assertEqual(self.registro.nombre(self.docente.id), 'Docente')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.registro.id('docente'), self.docente.id)
+            self.assertEqual(self.registro.nombre_normalizado(self.docente.id), roles.DOCENTE)
+            self.assertEqual(self.registro.roles(), [(self.docente.id, 'Docente')])
+
+    def test_id_desconocido_recarga_una_vez(self):
+        self.registro.roles()
+        # bulk_create no envía señales: es como un rol creado en otro proceso
+        nuevo, = Rol.objects.bulk_create([Rol(nombre='Acudiente')])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.registro.nombre(nuevo.id), 'Acudiente')
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.registro.nombre(nuevo.id + 1000))
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.registro.nombre(None))
+
+    def test_acargar_con_rol_desconocido(self):
+        async_to_sync(self.registro.acargar)()
+        nuevo, = Rol.objects.bulk_create([Rol(nombre='Coordinador')])
+        async_to_sync(self.registro.acargar)(nuevo.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.registro.nombre(nuevo.id), 'Coordinador')
+
+    def test_senales_invalidan_el_registro_global(self):
+        roles.registro.invalidar()
+        self.assertEqual(roles.registro.id('docente'), self.docente.id)
+        self.docente.nombre = 'Profesor'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.docente.save()
+        self.assertIsNone(roles.registro.id('docente'))
+        self.assertEqual(roles.registro.nombre(self.docente.id), 'Profesor')
+
+@override_settings(SISE_INSTRUMENTACION=True, SISE_INSTRUMENTACION_MUESTREO=1.0)
+class InstrumentacionTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=1, estudiantes_por_grupo=3, prefijo='instrumentacion')
+        cls.admin = User.objects.create(
+            email='admin.instrumentacion@sise.test', nombre='Admin', apellido='Instrumentación',
+            password='!', rol=cls.datos.docente.rol, is_staff=True
+        )
+        cls.token = Token.objects.create(user=cls.admin)
+
+    def setUp(self):
+        token_cache.limpiar()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def metricas(self, registros):
+        return [registro.campos for registro in registros.records if registro.evento == 'request.metricas']
+
+    def test_server_timing_y_evento(self):
+        with self.assertLogs('sise.request', 'INFO') as registros:
+            respuesta = self.client.get('/api/usuarios/')
+        self.assertEqual(respuesta.status_code, 200)
+        partes = respuesta['Server-Timing'].split(', ')
+        self.assertEqual([parte.split(';')[0] for parte in partes], ['total', 'db', 'app'])
+        campos, = self.metricas(registros)
+        self.assertEqual(campos['vista'], 'api:usuario-list')
+        self.assertEqual(campos['estado'], 200)
+        self.assertIn(f'desc="{campos["consultas"]} consultas"', partes[1])
+        self.assertGreater(campos['consultas'], 0)
+        self.assertLessEqual(len(campos['lentas']), 5)
+
+    @override_settings(SISE_PRESUPUESTOS={'*': {'consultas': 0, 'ms': 60000}})
+    def test_presupuesto_excedido(self):
+        with self.assertLogs('sise.request', 'INFO') as registros:
+            self.client.get('/api/usuarios/')
+        excedidos = [registro for registro in registros.records if registro.evento == 'request.presupuesto_excedido']
+        self.assertEqual(len(excedidos), 1)
+        self.assertEqual(excedidos[0].levelno, logging.WARNING)
+        self.assertEqual(excedidos[0].campos['excedido'], ['consultas'])
+
+    @override_settings(SISE_INSTRUMENTACION=False)
+    def test_desactivada_no_agrega_cabecera(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/usuarios/'))
+
+    async def test_vista_asincrona(self):
+        with self.assertLogs('sise.request', 'INFO') as registros:
+            respuesta = await self.async_client.get(
+                '/api/async/user/', headers={'Authorization': f'Token {self.token.key}'}
+            )
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('Server-Timing', respuesta)
+        self.assertEqual(self.metricas(registros)[0]['vista'], 'api:async-user')
+
+    def test_registro_de_consultas(self):
+        registro = RegistroConsultas(lentas=2)
+        with connection.execute_wrapper(registro):
+            for _ in range(3):
+                list(Grado.objects.filter(pk=self.datos.grado.id))
+            list(Grupo.objects.all())
+        self.assertEqual(registro.total, 4)
+        self.assertEqual(len(registro.lentas_ordenadas()), 2)
+        duplicada, = registro.duplicadas()
+        self.assertEqual(duplicada['veces'], 3)
+        self.assertIn('core_grado', duplicada['sql'])
+
+class GenerarInstitucionTest(TestCase):
+    def generar(self, dominio, semilla=7, **opciones):
+        salida = io.StringIO()
+        call_command(
+            'generar_institucion', estudiantes=30, por_grupo=12, semilla=semilla, dominio=dominio,
+            stdout=salida, **opciones
+        )
+        return salida.getvalue()
+
+    def huella(self, dominio):
+        estudiantes = Estudiante.objects.filter(user__email__endswith=f'@{dominio}').order_by('user__email')
+        return (
+            list(estudiantes.values_list('user__nombre', 'user__apellido')),
+            list(Asistencia.objects.filter(estudiante__in=estudiantes).order_by('estudiante__user__email', 'fecha')
+                 .values_list('fecha', 'estado')),
+            list(Calificacion.objects.filter(estudiante__in=estudiantes)
+                 .order_by('estudiante__user__email', 'periodo__fecha_inicio', 'asignatura__nombre')
+                 .values_list('nota', flat=True)),
+        )
+
+    def test_genera_la_institucion(self):
+        salida = self.generar('uno.sise.test')
+        self.assertIn('Institución generada', salida)
+        estudiantes = Estudiante.objects.filter(user__email__endswith='@uno.sise.test')
+        self.assertEqual(estudiantes.count(), 30)
+        # 30 estudiantes de a 12 por grupo: tres grupos, el último con 6
+        por_grupo = collections.Counter(estudiantes.values_list('grupo_id', flat=True))
+        self.assertEqual(sorted(por_grupo.values()), [6, 12, 12])
+        self.assertEqual(Periodo.objects.count(), 4)
+        self.assertEqual(Calificacion.objects.count(), 30 * 4 * Asignatura.objects.count())
+        self.assertTrue(User.objects.get(email='estudiante00001@uno.sise.test').check_password('sise12345'))
+        self.assertTrue(Observador.objects.exists())
+        self.assertTrue(Planeacion.objects.exists())
+        self.assertEqual(ResumenPeriodo.objects.count(), 30 * 4)
+        self.assertTrue(ResumenAsistenciaDiaria.objects.exists())
+
+    def test_misma_semilla_mismos_datos(self):
+        self.generar('uno.sise.test', sin_resumenes=True)
+        self.generar('dos.sise.test', sin_resumenes=True)
+        self.generar('tres.sise.test', semilla=8, sin_resumenes=True)
+        self.assertEqual(self.huella('uno.sise.test'), self.huella('dos.sise.test'))
+        self.assertNotEqual(self.huella('uno.sise.test'), self.huella('tres.sise.test'))
+        self.assertFalse(ResumenPeriodo.objects.exists())
+
+    def test_dominio_repetido(self):
+        self.generar('uno.sise.test', sin_resumenes=True)
+        with self.assertRaises(CommandError):
+            self.generar('uno.sise.test')
+        with self.assertRaises(CommandError):
+            call_command('generar_institucion', estudiantes=0, stdout=io.StringIO())
+
+class VistasAsincronasTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.rol = Rol.objects.create(nombre='Docente')
+        cls.admin = User.objects.create(
+            email='admin.async@sise.test', nombre='Admin', apellido='Async', password='!', rol=cls.rol,
+            is_staff=True
+        )
+        cls.usuarios = crear_usuarios(cls.rol, 'async', 15)
+        cls.token = Token.objects.create(user=cls.admin)
+
+    def setUp(self):
+        token_cache.limpiar()
+        roles.registro.invalidar()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    async def obtener(self, ruta, **parametros):
+        respuesta = await self.async_client.get(
+            ruta, parametros, headers={'Authorization': f'Token {self.token.key}'}
+        )
+        return respuesta.status_code, json.loads(respuesta.content)
+
+    async def sincrona(self, ruta, **parametros):
+        respuesta = await sync_to_async(self.client.get)(ruta, parametros)
+        return respuesta.status_code, respuesta.json()
+
+    async def test_mismas_respuestas_que_las_rutas_sincronas(self):
+        for sincrona, asincrona, parametros in [
+            ('/api/user/', '/api/async/user/', {}),
+            ('/api/usuarios/', '/api/async/usuarios/', {}),
+            ('/api/usuarios/', '/api/async/usuarios/', {'search': 'async1', 'ordering': 'email'}),
+            (f'/api/usuarios/{self.usuarios[3].id}/', f'/api/async/usuarios/{self.usuarios[3].id}/', {}),
+            ('/api/roles/', '/api/async/roles/', {}),
+            ('/api/health/', '/api/async/health/', {}),
+        ]:
+            with self.subTest(ruta=asincrona, **parametros):
+                estado, datos = await self.sincrona(sincrona, **parametros)
+                estado_async, datos_async = await self.obtener(asincrona, **parametros)
+                self.assertEqual(estado_async, estado)
+                for clave in ('next', 'previous'):
+                    if isinstance(datos, dict) and datos.get(clave):
+                        datos[clave] = datos[clave].replace('/api/', '/api/async/', 1)
+                self.assertEqual(datos_async, datos)
+
+    async def test_paginacion_por_cursor(self):
+        estado, pagina = await self.obtener('/api/async/usuarios/', page_size=10)
+        self.assertEqual(estado, 200)
+        self.assertEqual(len(pagina['results']), 10)
+        ruta = pagina['next'].replace('http://testserver', '')
+        estado, siguiente = await self.obtener(ruta)
+        self.assertEqual(estado, 200)
+        ids = [usuario['id'] for usuario in pagina['results'] + siguiente['results']]
+        self.assertEqual(len(ids), 16)
+        self.assertEqual(len(set(ids)), 16)
+
+    async def test_errores(self):
+        respuesta = await self.async_client.get('/api/async/user/')
+        self.assertEqual(respuesta.status_code, 401)
+        self.assertIn('WWW-Authenticate', respuesta)
+        respuesta = await self.async_client.get('/api/async/user/', headers={'Authorization': 'Token invalido'})
+        self.assertEqual(respuesta.status_code, 401)
+        respuesta = await self.async_client.post('/api/async/roles/', headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual((respuesta.status_code, respuesta['Allow']), (405, 'GET'))
+        self.assertEqual((await self.obtener('/api/async/usuarios/999999/'))[0], 404)
+        self.assertEqual((await self.obtener('/api/async/roles/', page=5))[0], 404)
+
+class SondasSaludTest(APITestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=self.media.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        sondas.invalidar()
+        self.addCleanup(sondas.invalidar)
+
+    def test_vida_no_consulta_la_base(self):
+        with self.assertNumQueries(0):
+            respuesta = self.client.get('/api/health/live/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['Cache-Control'], 'no-store')
+
+    def test_disponibilidad_y_cache(self):
+        respuesta = self.client.get('/api/health/ready/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['Cache-Control'], 'no-store')
+        self.assertEqual(set(respuesta.data['checks']), {'base_datos', 'cache', 'media', 'migraciones'})
+        self.assertFalse(respuesta.data['en_cache'])
+        with self.assertNumQueries(0):
+            respuesta = self.client.get('/api/health/ready/')
+        self.assertTrue(respuesta.data['en_cache'])
+
+    def test_comprobaciones_fallidas(self):
+        archivo = Path(self.media.name) / 'no-es-directorio'
+        archivo.write_text('x')
+        with override_settings(SISE_SALUD_DB_MAX_MS=-1, MEDIA_ROOT=archivo):
+            with self.assertLogs('sise.salud', 'WARNING'):
+                respuesta = self.client.get('/api/health/ready/')
+        self.assertEqual(respuesta.status_code, 503)
+        checks = respuesta.data['checks']
+        self.assertFalse(checks['base_datos']['ok'])
+        self.assertIn('latencia', checks['base_datos']['detalle'])
+        self.assertFalse(checks['media']['ok'])
+        self.assertTrue(checks['cache']['ok'])
+
+    def test_una_evaluacion_para_sondas_simultaneas(self):
+        sonda = Sondas(ttl=60)
+        evaluaciones = []
+
+        def evaluar():
+            evaluaciones.append(1)
+            time.sleep(0.05)
+            return {"status": 'ok', "checks": {}}
+
+        with mock.patch.object(sonda, '_evaluar', side_effect=evaluar):
+            hilos = [threading.Thread(target=sonda.disponibilidad) for _ in range(8)]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+        self.assertEqual(len(evaluaciones), 1)
+        sonda.invalidar()
+        with mock.patch.object(sonda, '_evaluar', side_effect=evaluar):
+            self.assertFalse(sonda.disponibilidad()['en_cache'])
+        self.assertEqual(len(evaluaciones), 2)
+
+class CatalogosTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=2, estudiantes_por_grupo=1, prefijo='catalogo')
+        cls.usuario = cls.datos.docente
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.usuario)
+
+    def test_etag_y_304(self):
+        respuesta = self.client.get('/api/grados/')
+        self.assertEqual(respuesta.status_code, 200)
+        etag = respuesta['ETag']
+        self.assertIn('must-revalidate', respuesta['Cache-Control'])
+        with self.assertNumQueries(0):
+            respuesta = self.client.get('/api/grados/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta['ETag'], etag)
+        with self.assertNumQueries(0):
+            respuesta = self.client.get('/api/grados/')
+        self.assertEqual((respuesta.status_code, respuesta['ETag']), (200, etag))
+        self.assertNotEqual(self.client.get('/api/grados/?format=json&x=1')['ETag'], etag)
+
+    def test_comodin_solo_para_recursos_existentes(self):
+        grado = self.datos.grado
+        self.assertEqual(self.client.get(f'/api/grados/{grado.id}/', HTTP_IF_NONE_MATCH='*').status_code, 304)
+        self.assertEqual(self.client.get('/api/grados/999999/', HTTP_IF_NONE_MATCH='*').status_code, 404)
+
+    def test_las_senales_invalidan(self):
+        grados = self.client.get('/api/grados/')['ETag']
+        grupos = self.client.get('/api/grupos/')['ETag']
+        asignaturas = self.client.get('/api/asignaturas/')['ETag']
+        grado = self.datos.grado
+        grado.nombre = 'Renombrado'
+        with self.captureOnCommitCallbacks(execute=True):
+            grado.save()
+        respuesta = self.client.get('/api/grados/', HTTP_IF_NONE_MATCH=grados)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('Renombrado', [fila['nombre'] for fila in respuesta.data])
+        # grado_nombre aparece en los grupos
+        self.assertNotEqual(self.client.get('/api/grupos/')['ETag'], grupos)
+        self.assertEqual(self.client.get('/api/asignaturas/')['ETag'], asignaturas)
+
+    def test_cambio_de_otro_proceso_se_ve_al_vencer_la_version(self):
+        etag = self.client.get('/api/grados/')['ETag']
+        # update() no envía señales: es como un cambio hecho en otro proceso
+        Grado.objects.filter(pk=self.datos.grado.pk).update(nombre='Desde otro proceso')
+        self.assertEqual(self.client.get('/api/grados/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with mock.patch('time.time', return_value=time.time() + settings.SISE_CATALOGOS_TTL + 1):
+            respuesta = self.client.get('/api/grados/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+        self.assertIn('Desde otro proceso', [fila['nombre'] for fila in respuesta.data])
+
+    def test_api_navegable_no_se_guarda(self):
+        respuesta = self.client.get('/api/grados/', HTTP_ACCEPT='text/html')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotIn('ETag', respuesta)
+
+class PanelEstudianteTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=1, estudiantes_por_grupo=2, prefijo='panel')
+        cls.estudiante, cls.otro = cls.datos.estudiantes
+        cls.acudiente = User.objects.create(
+            email='acudiente.panel@sise.test', nombre='Acudiente', apellido='Panel', password='!',
+            rol=Rol.objects.get_or_create(nombre='Acudiente')[0]
+        )
+        cls.estudiante.acudientes.add(cls.acudiente)
+        cls.admin = User.objects.create(
+            email='admin.panel@sise.test', nombre='Admin', apellido='Panel', password='!',
+            rol=cls.datos.docente.rol, is_staff=True
+        )
+        Calificacion.objects.create(
+            estudiante=cls.estudiante, asignatura=cls.datos.asignatura, periodo=cls.datos.periodo,
+            nota=Decimal('4.5')
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def panel(self, usuario, estudiante=None, **parametros):
+        self.client.force_authenticate(usuario)
+        return self.client.get(f'/api/estudiantes/{(estudiante or self.estudiante).id}/panel/', parametros)
+
+    def test_contenido(self):
+        respuesta = self.panel(self.estudiante.user)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['grupo']['id'], self.datos.grupos[0].id)
+        periodo, = respuesta.data['periodos']
+        self.assertEqual(periodo['calificaciones'][0]['nota'], '4.5')
+        self.assertEqual(self.panel(self.estudiante.user, periodo=self.datos.periodo.id).data['periodos'], [periodo])
+        self.assertEqual(self.panel(self.estudiante.user, periodo='x').status_code, 400)
+
+    def test_permisos(self):
+        self.assertEqual(self.panel(self.acudiente).status_code, 200)
+        self.assertEqual(self.panel(self.admin).status_code, 200)
+        self.assertEqual(self.panel(self.acudiente, self.otro).status_code, 403)
+        self.assertEqual(self.panel(self.otro.user).status_code, 403)
+        self.assertEqual(self.panel(self.datos.docente).status_code, 403)
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get('/api/estudiantes/999999/panel/').status_code, 404)
+
+    def test_cache_e_invalidacion(self):
+        self.panel(self.estudiante.user)
+        with self.assertNumQueries(1):
+            self.panel(self.estudiante.user)
+        calificacion = Calificacion.objects.get(estudiante=self.estudiante)
+        calificacion.nota = Decimal('3.0')
+        with self.captureOnCommitCallbacks(execute=True):
+            calificacion.save()
+        self.assertEqual(self.panel(self.estudiante.user).data['periodos'][0]['calificaciones'][0]['nota'], '3.0')
+
+class CargaDocenteTest(APITestCase):
+    URL = '/api/docentes/carga/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=2, estudiantes_por_grupo=3, prefijo='carga')
+        cls.docente = cls.datos.docente
+        # Segunda asignatura en el primer grupo: el grupo debe aparecer una sola vez
+        cls.otra_asignatura = Asignatura.objects.create(nombre='carga otra asignatura')
+        DocenteAsignaturaGrupo.objects.create(
+            docente=cls.docente, asignatura=cls.otra_asignatura, grupo=cls.datos.grupos[0]
+        )
+        cls.hoy = timezone.localdate()
+        Asistencia.objects.create(
+            estudiante=cls.datos.estudiantes[0], fecha=cls.hoy, estado='A', registrada_por=cls.docente
+        )
+        cls.pendientes = [
+            crear_planeacion(cls.docente, cls.datos.asignatura, cls.datos.grupos[0], estado)
+            for estado in 'BEA'
+        ][:2]
+        cls.admin = User.objects.create(
+            email='admin.carga@sise.test', nombre='Admin', apellido='Carga', password='!',
+            rol=cls.docente.rol, is_staff=True
+        )
+
+    def test_carga_del_docente(self):
+        self.client.force_authenticate(self.docente)
+        with self.assertNumQueries(4):
+            respuesta = self.client.get(self.URL)
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.data
+        self.assertEqual(len(datos['asignaciones']), 3)
+        self.assertEqual([grupo['id'] for grupo in datos['grupos']], [grupo.id for grupo in self.datos.grupos])
+        self.assertEqual(sum(len(grupo['estudiantes']) for grupo in datos['grupos']), 6)
+        self.assertEqual(len(datos['estudiantes']), 6)
+        self.assertEqual(datos['asistencia'], {str(self.datos.estudiantes[0].id): 'A'})
+        self.assertEqual(
+            [planeacion['id'] for planeacion in datos['planeaciones_pendientes']],
+            [planeacion.id for planeacion in self.pendientes]
+        )
+
+    def test_docente_sin_asignaciones(self):
+        self.client.force_authenticate(self.admin)
+        # Sin grupos no se consultan estudiantes ni asistencia
+        with self.assertNumQueries(2):
+            respuesta = self.client.get(self.URL)
+        self.assertEqual((respuesta.data['grupos'], respuesta.data['planeaciones_pendientes']), ([], []))
+
+    def test_carga_de_otro_docente(self):
+        self.client.force_authenticate(self.admin)
+        respuesta = self.client.get(self.URL, {'docente': self.docente.id})
+        self.assertEqual(respuesta.data['docente']['id'], self.docente.id)
+        self.assertEqual(self.client.get(self.URL, {'docente': 999999}).status_code, 404)
+        self.assertEqual(self.client.get(self.URL, {'docente': 'x'}).status_code, 400)
+        self.client.force_authenticate(self.docente)
+        self.assertEqual(self.client.get(self.URL, {'docente': self.admin.id}).status_code, 403)
+        self.assertEqual(self.client.get(self.URL, {'docente': self.docente.id}).status_code, 200)
+
+class CargaAdjuntoTest(APITestCase):
+    CONTENIDO = b'0123456789abcdefghij'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=1, estudiantes_por_grupo=1, prefijo='adjunto')
+        cls.planeacion = crear_planeacion(cls.datos.docente, cls.datos.asignatura, cls.datos.grupos[0])
+        cls.otro = User.objects.create(
+            email='otro.adjunto@sise.test', nombre='Otro', apellido='Docente', password='!', rol=cls.datos.docente.rol
+        )
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=self.media.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.client.force_authenticate(self.datos.docente)
+
+    def crear(self, tamano=len(CONTENIDO)):
+        respuesta = self.client.post(
+            f'/api/planeaciones/{self.planeacion.id}/adjunto/cargas/', {'nombre': 'guia.txt', 'tamano': tamano}
+        )
+        self.assertEqual(respuesta.status_code, 201)
+        return f"/api/cargas/{respuesta.data['id']}/"
+
+    def enviar(self, url, inicio, fin, contenido=None):
+        datos = self.CONTENIDO[inicio:fin + 1] if contenido is None else contenido
+        return self.client.generic(
+            'PATCH', url, datos, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {inicio}-{fin}/{len(self.CONTENIDO)}'
+        )
+
+    def subir(self):
+        url = self.crear()
+        self.enviar(url, 0, 9)
+        return url, self.enviar(url, 10, 19)
+
+    def test_carga_por_partes(self):
+        url = self.crear()
+        respuesta = self.enviar(url, 0, 9)
+        self.assertEqual((respuesta.status_code, respuesta.data['recibido'], respuesta.data['completa']), (200, 10, False))
+        self.assertEqual(self.client.get(url).data['recibido'], 10)
+        respuesta = self.enviar(url, 10, 19)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.data['completa'])
+        self.planeacion.refresh_from_db()
+        self.assertEqual(respuesta.data['archivo_adjunto'], self.planeacion.archivo_adjunto.name)
+        with self.planeacion.archivo_adjunto.open('rb') as archivo:
+            self.assertEqual(archivo.read(), self.CONTENIDO)
+
+    def test_ultimo_fragmento_repetido(self):
+        url, completada = self.subir()
+        with self.assertNumQueries(1):
+            repetida = self.enviar(url, 10, 19)
+        self.assertEqual(repetida.status_code, 200)
+        self.assertEqual(repetida.data, completada.data)
+        self.assertEqual(self.client.get(url).data['completa'], True)
+        # Un fragmento intermedio ya no continúa nada
+        self.assertEqual(self.enviar(url, 0, 9).status_code, 409)
+
+    def test_fragmentos_invalidos(self):
+        url = self.crear()
+        self.assertEqual(self.client.generic('PATCH', url, b'x').status_code, 400)
+        respuesta = self.enviar(url, 10, 19)
+        self.assertEqual((respuesta.status_code, respuesta.data['recibido']), (409, 0))
+        respuesta = self.client.generic('PATCH', url, b'0123', HTTP_CONTENT_RANGE='bytes 0-3/99')
+        self.assertEqual(respuesta.status_code, 400)
+        respuesta = self.client.generic('PATCH', url, b'012', HTTP_CONTENT_RANGE='bytes 0-3/20')
+        self.assertEqual(respuesta.status_code, 400)
+        with override_settings(SISE_CARGA_FRAGMENTO_MAX_BYTES=4):
+            self.assertEqual(self.enviar(url, 0, 9).status_code, 413)
+
+    def test_nombre_invalido_se_rechaza_al_crear(self):
+        for nombre in ('x/', '..', '???'):
+            respuesta = self.client.post(
+                f'/api/planeaciones/{self.planeacion.id}/adjunto/cargas/', {'nombre': nombre, 'tamano': 10}
+            )
+            self.assertEqual(respuesta.status_code, 400, nombre)
+            self.assertIn('nombre', respuesta.data)
+        self.assertFalse(CargaAdjunto.objects.exists())
+
+    def test_permisos_y_cancelacion(self):
+        url = self.crear()
+        self.client.force_authenticate(self.otro)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(
+            self.client.post(
+                f'/api/planeaciones/{self.planeacion.id}/adjunto/cargas/', {'nombre': 'x.txt', 'tamano': 1}
+            ).status_code,
+            403
+        )
+        self.client.force_authenticate(self.datos.docente)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_limpiar_cargas_elimina_las_completas_vencidas(self):
+        url, _ = self.subir()
+        pendiente = self.crear()
+        CargaAdjunto.objects.update(
+            actualizada=timezone.now() - datetime.timedelta(hours=settings.SISE_CARGA_VIGENCIA_HORAS + 1)
+        )
+        self.assertEqual(self.client.get(url).status_code, 404)
+        call_command('limpiar_cargas', stdout=io.StringIO())
+        self.assertFalse(CargaAdjunto.objects.exists())
+        self.assertFalse(os.listdir(Path(self.media.name) / 'cargas'))
+        self.planeacion.refresh_from_db()
+        self.assertTrue(self.planeacion.archivo_adjunto)
+        self.assertEqual(self.client.get(pendiente).status_code, 404)
+
+    def test_descarga_con_range(self):
+        self.subir()
+        url = f'/api/planeaciones/{self.planeacion.id}/adjunto/'
+        respuesta = self.client.get(url)
+        self.assertEqual((respuesta.status_code, respuesta['Accept-Ranges']), (200, 'bytes'))
+        self.assertEqual(b''.join(respuesta.streaming_content), self.CONTENIDO)
+        for rango, esperado in [('bytes=2-5', (2, 5)), ('bytes=-3', (17, 19)), ('bytes=15-', (15, 19))]:
+            with self.subTest(rango=rango):
+                respuesta = self.client.get(url, HTTP_RANGE=rango)
+                self.assertEqual(respuesta.status_code, 206)
+                self.assertEqual(respuesta['Content-Range'], f'bytes {esperado[0]}-{esperado[1]}/20')
+                self.assertEqual(b''.join(respuesta.streaming_content), self.CONTENIDO[esperado[0]:esperado[1] + 1])
+        respuesta = self.client.get(url, HTTP_RANGE='bytes=20-')
+        self.assertEqual((respuesta.status_code, respuesta['Content-Range']), (416, 'bytes */20'))
+        # If-Range con otra fecha: el archivo cambió y se envía completo
+        respuesta = self.client.get(url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='Wed, 21 Oct 2015 07:28:00 GMT')
+        self.assertEqual(respuesta.status_code, 200)
+        self.client.force_authenticate(self.otro)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+class BlobsAdjuntosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=2, estudiantes_por_grupo=1, prefijo='blobs')
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=self.media.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.planeaciones = [
+            crear_planeacion(self.datos.docente, self.datos.asignatura, grupo) for grupo in self.datos.grupos
+        ]
+
+    def adjuntar(self, planeacion, nombre, contenido):
+        planeacion.archivo_adjunto.save(nombre, ContentFile(contenido))
+        return hash_de_nombre(planeacion.archivo_adjunto.name)
+
+    def blobs(self):
+        return sorted(
+            os.path.basename(ruta) for ruta in glob.glob(os.path.join(self.media.name, 'blobs', '*', '*'))
+        )
+
+    def envejecer(self):
+        BlobAdjunto.objects.update(usado=timezone.now() - datetime.timedelta(hours=settings.SISE_BLOBS_GRACIA_HORAS + 1))
+
+    def test_mismo_contenido_un_solo_blob(self):
+        primero = self.adjuntar(self.planeaciones[0], 'guia.pdf', b'contenido')
+        segundo = self.adjuntar(self.planeaciones[1], 'copia.pdf', b'contenido')
+        self.assertEqual(primero, segundo)
+        self.assertEqual(self.blobs(), [primero])
+        self.assertTrue(self.planeaciones[1].archivo_adjunto.name.endswith(f'{primero}/copia.pdf'))
+        self.assertEqual(BlobAdjunto.objects.get().referencias, 2)
+        with self.planeaciones[1].archivo_adjunto.open('rb') as archivo:
+            self.assertEqual(archivo.read(), b'contenido')
+
+    def test_referencias_al_reemplazar_y_eliminar(self):
+        viejo = self.adjuntar(self.planeaciones[0], 'guia.pdf', b'version 1')
+        self.adjuntar(self.planeaciones[1], 'guia.pdf', b'version 1')
+        nuevo = self.adjuntar(self.planeaciones[0], 'guia.pdf', b'version 2')
+        referencias = dict(BlobAdjunto.objects.values_list('sha256', 'referencias'))
+        self.assertEqual(referencias, {viejo: 1, nuevo: 1})
+        self.planeaciones[1].delete()
+        self.assertEqual(BlobAdjunto.objects.get(sha256=viejo).referencias, 0)
+        # El blob sigue en disco hasta la recolección
+        self.assertIn(viejo, self.blobs())
+
+    def test_recoleccion(self):
+        huerfano = self.adjuntar(self.planeaciones[0], 'a.txt', b'huerfano')
+        usado = self.adjuntar(self.planeaciones[1], 'b.txt', b'usado')
+        self.planeaciones[0].delete()
+        # Dentro del período de gracia no se toca
+        self.assertEqual(BlobAdjuntoService.recolectar(), (0, 0))
+        self.envejecer()
+        self.assertEqual(BlobAdjuntoService.recolectar(simular=True), (1, len(b'huerfano')))
+        self.assertEqual(len(self.blobs()), 2)
+        salida = io.StringIO()
+        call_command('recolectar_adjuntos', stdout=salida)
+        self.assertIn('1 blobs sin referencias eliminados', salida.getvalue())
+        self.assertEqual(self.blobs(), [usado])
+        self.assertFalse(BlobAdjunto.objects.filter(sha256=huerfano).exists())
+
+    def test_recontar_corrige_escrituras_sin_senales(self):
+        sha256 = self.adjuntar(self.planeaciones[0], 'guia.pdf', b'contenido')
+        Planeacion.objects.filter(pk=self.planeaciones[1].pk).update(
+            archivo_adjunto=self.planeaciones[0].archivo_adjunto.name
+        )
+        self.assertEqual(BlobAdjuntoService.recontar(), 1)
+        self.assertEqual(BlobAdjunto.objects.get(sha256=sha256).referencias, 2)
+        self.assertEqual(BlobAdjuntoService.recontar(), 0)
+
+    def test_importar_adjuntos_anteriores(self):
+        sha256 = self.adjuntar(self.planeaciones[0], 'guia.pdf', b'contenido')
+        # Adjunto guardado con su nombre, antes de la deduplicación
+        ruta = Path(self.media.name) / 'planeaciones' / 'antigua.pdf'
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_bytes(b'contenido')
+        Planeacion.objects.filter(pk=self.planeaciones[1].pk).update(archivo_adjunto='planeaciones/antigua.pdf')
+        self.assertEqual(BlobAdjuntoService.importar_existentes(), (1, len(b'contenido')))
+        self.planeaciones[1].refresh_from_db()
+        self.assertEqual(self.planeaciones[1].archivo_adjunto.name, f'planeaciones/{sha256}/antigua.pdf')
+        self.assertEqual(BlobAdjunto.objects.get(sha256=sha256).referencias, 2)
+        self.assertFalse(ruta.exists())
+
+class TransicionesPlaneacionTest(APITestCase):
+    URL = '/api/planeaciones/transiciones/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=1, estudiantes_por_grupo=1, prefijo='transiciones')
+        cls.docente = cls.datos.docente
+        cls.otro = User.objects.create(
+            email='otro.transiciones@sise.test', nombre='Otro', apellido='Docente', password='!', rol=cls.docente.rol
+        )
+        cls.coordinador = User.objects.create(
+            email='coordinador.transiciones@sise.test', nombre='Coordinador', apellido='Transiciones',
+            password='!', rol=Rol.objects.get_or_create(nombre='Coordinador')[0]
+        )
+
+    def setUp(self):
+        roles.registro.invalidar()
+        self.borrador, self.enviada, self.aprobada = [
+            crear_planeacion(self.docente, self.datos.asignatura, self.datos.grupos[0], estado) for estado in 'BEA'
+        ]
+
+    def transicionar(self, usuario, *transiciones):
+        self.client.force_authenticate(usuario)
+        respuesta = self.client.post(
+            self.URL, {'transiciones': [{'id': id_, 'estado': estado} for id_, estado in transiciones]}, format='json'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.data
+
+    def test_docente_envia_sus_planeaciones(self):
+        datos = self.transicionar(
+            self.docente,
+            (self.borrador.id, 'E'), (self.enviada.id, 'A'), (self.aprobada.id, 'A'), (999999, 'E'),
+            (self.borrador.id, 'E')
+        )
+        self.assertEqual(datos['aplicadas'], 1)
+        self.assertEqual(
+            [(resultado['resultado'], resultado.get('estado_anterior')) for resultado in datos['resultados']],
+            [('aplicada', 'B'), ('sin_permiso', None), ('sin_permiso', None), ('no_encontrada', None),
+             ('duplicada', None)]
+        )
+        self.borrador.refresh_from_db()
+        self.assertEqual(self.borrador.estado, 'E')
+        transicion = TransicionPlaneacion.objects.get(planeacion=self.borrador)
+        self.assertEqual((transicion.estado_anterior, transicion.estado_nuevo, transicion.usuario), ('B', 'E', self.docente))
+
+    def test_planeaciones_ajenas_no_revelan_su_estado(self):
+        datos = self.transicionar(self.otro, (self.borrador.id, 'E'), (self.aprobada.id, 'E'))
+        self.assertEqual(datos['resultados'], [
+            {'id': self.borrador.id, 'estado': 'E', 'resultado': 'sin_permiso'},
+            {'id': self.aprobada.id, 'estado': 'E', 'resultado': 'sin_permiso'},
+        ])
+        self.assertFalse(TransicionPlaneacion.objects.exists())
+
+    def test_coordinacion_revisa(self):
+        datos = self.transicionar(
+            self.coordinador,
+            (self.enviada.id, 'A'), (self.borrador.id, 'A'), (self.aprobada.id, 'A'), (self.aprobada.id, 'B')
+        )
+        self.assertEqual(
+            [(resultado['resultado'], resultado.get('estado_anterior')) for resultado in datos['resultados']],
+            [('aplicada', 'E'), ('transicion_invalida', 'B'), ('sin_cambio', 'A'), ('duplicada', None)]
+        )
+        self.assertEqual(self.transicionar(self.coordinador, (self.enviada.id, 'B'))['resultados'][0]['resultado'],
+                         'transicion_invalida')
+
+    def test_consultas_no_dependen_del_lote(self):
+        planeaciones = [
+            crear_planeacion(self.docente, self.datos.asignatura, self.datos.grupos[0]) for _ in range(10)
+        ]
+        self.client.force_authenticate(self.docente)
+        roles.registro.roles()
+        with CaptureQueriesContext(connection) as pocas:
+            self.transicionar(self.docente, *[(planeacion.id, 'E') for planeacion in planeaciones[:2]])
+        with CaptureQueriesContext(connection) as muchas:
+            self.transicionar(self.docente, *[(planeacion.id, 'E') for planeacion in planeaciones[2:]])
+        self.assertEqual(len(muchas), len(pocas))
+
+    def test_validacion(self):
+        self.client.force_authenticate(self.docente)
+        self.assertEqual(self.client.post(self.URL, {'transiciones': []}, format='json').status_code, 400)
+        self.assertEqual(
+            self.client.post(self.URL, {'transiciones': [{'id': self.borrador.id, 'estado': 'X'}]}, format='json')
+            .status_code,
+            400
+        )
+
+@override_settings(SISE_NOTIFICACIONES_MAX_INTENTOS=3, SISE_NOTIFICACIONES_REINTENTO_S=60)
+class NotificacionesTest(APITestCase):
+    URL = '/api/asistencias/registro-masivo/'
+    FECHA = datetime.date(2025, 2, 3)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=1, estudiantes_por_grupo=3, prefijo='notificaciones')
+        cls.grupo = cls.datos.grupos[0]
+        cls.estudiantes = cls.datos.estudiantes
+        rol = Rol.objects.get_or_create(nombre='Acudiente')[0]
+        cls.acudiente, cls.otro_acudiente = [
+            User.objects.create(
+                email=f'acudiente{i}.notificaciones@sise.test', nombre=f'Acudiente{i}', apellido='Notificaciones',
+                password='!', rol=rol
+            )
+            for i in range(2)
+        ]
+        # El primer acudiente tiene a cargo a dos estudiantes
+        cls.estudiantes[0].acudientes.add(cls.acudiente)
+        cls.estudiantes[1].acudientes.add(cls.acudiente, cls.otro_acudiente)
+
+    def setUp(self):
+        self.client.force_authenticate(self.datos.docente)
+
+    def registrar(self, *estados):
+        respuesta = self.client.post(self.URL, {
+            'grupo': self.grupo.id, 'fecha': self.FECHA.isoformat(),
+            'registros': [{'estudiante': e.id, 'estado': estado} for e, estado in zip(self.estudiantes, estados)]
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+
+    def llegar_la_hora(self):
+        Notificacion.objects.filter(estado='P').update(disponible=timezone.now())
+
+    def pendientes(self):
+        return sorted(
+            Notificacion.objects.filter(estado='P').values_list('estudiante_id', 'acudiente_id')
+        )
+
+    def test_registro_masivo_encola_y_retira_ausencias(self):
+        self.registrar('A', 'A', 'A')
+        esperadas = sorted([
+            (self.estudiantes[0].id, self.acudiente.id), (self.estudiantes[1].id, self.acudiente.id),
+            (self.estudiantes[1].id, self.otro_acudiente.id)
+        ])
+        self.assertEqual(self.pendientes(), esperadas)
+
+        # Repetir la ausencia no duplica el aviso
+        self.registrar('A', 'A', 'P')
+        self.assertEqual(self.pendientes(), esperadas)
+
+        # Corregida antes del envío: el aviso se retira
+        self.registrar('A', 'J')
+        self.assertEqual(self.pendientes(), [(self.estudiantes[0].id, self.acudiente.id)])
+
+        # Un aviso ya enviado no se retira
+        Notificacion.objects.update(estado='E')
+        self.registrar('P')
+        self.assertEqual(Notificacion.objects.filter(estado='E').count(), 1)
+
+    def test_guardado_individual_encola_y_retira_ausencias(self):
+        estudiante = self.estudiantes[0]
+        asistencia = Asistencia.objects.create(
+            estudiante=estudiante, fecha=self.FECHA, estado='A', registrada_por=self.datos.docente
+        )
+        self.assertEqual(self.pendientes(), [(estudiante.id, self.acudiente.id)])
+
+        asistencia.estado = 'T'
+        asistencia.save()
+        self.assertEqual(self.pendientes(), [])
+
+        asistencia.estado = 'A'
+        asistencia.save()
+        # Otra fecha: el aviso del día anterior se retira y se encola el nuevo
+        asistencia.fecha = self.FECHA + datetime.timedelta(days=1)
+        asistencia.save()
+        self.assertEqual(
+            list(Notificacion.objects.filter(estado='P').values_list('fecha', flat=True)), [asistencia.fecha]
+        )
+
+        asistencia.delete()
+        self.assertEqual(self.pendientes(), [])
+
+    @override_settings(SISE_NOTIFICACIONES_HORA=17)
+    def test_avisos_tardios_esperan_al_siguiente_resumen(self):
+        def disponible(fecha, ahora):
+            with mock.patch('django.utils.timezone.now', return_value=timezone.make_aware(ahora)):
+                return timezone.localtime(NotificacionService._disponible(fecha)).replace(tzinfo=None)
+
+        lunes, martes = self.FECHA, self.FECHA + datetime.timedelta(days=1)
+        self.assertEqual(disponible(lunes, datetime.datetime(2025, 2, 3, 9)), datetime.datetime(2025, 2, 3, 17))
+        # Después de la hora del resumen del día: al del día siguiente
+        self.assertEqual(disponible(lunes, datetime.datetime(2025, 2, 3, 18)), datetime.datetime(2025, 2, 4, 17))
+        # Con fecha pasada: al próximo resumen
+        self.assertEqual(disponible(lunes, datetime.datetime(2025, 2, 4, 9)), datetime.datetime(2025, 2, 4, 17))
+        self.assertEqual(disponible(martes, datetime.datetime(2025, 2, 4, 17)), datetime.datetime(2025, 2, 5, 17))
+
+        # El registro de una fecha pasada no se envía de inmediato
+        self.registrar('A')
+        self.assertEqual(NotificacionService.enviar_pendientes()["correos"], 0)
+        self.assertGreater(Notificacion.objects.get().disponible, timezone.now())
+
+    def test_un_correo_por_acudiente_y_dia(self):
+        self.registrar('A', 'A')
+        self.llegar_la_hora()
+        totales = NotificacionService.enviar_pendientes()
+        self.assertEqual(totales, {"correos": 2, "avisos": 3, "reintentos": 0, "fallidos": 0})
+        self.assertEqual(sorted(correo.to[0] for correo in mail.outbox), [self.acudiente.email, self.otro_acudiente.email])
+        correo = next(correo for correo in mail.outbox if correo.to == [self.acudiente.email])
+        self.assertEqual(correo.body.count('no asistió a clase'), 2)
+        self.assertFalse(Notificacion.objects.exclude(estado='E').exists())
+        self.assertFalse(Notificacion.objects.filter(enviada__isnull=True).exists())
+
+        # Nada pendiente: no hay nuevos correos
+        self.assertEqual(NotificacionService.enviar_pendientes()["correos"], 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_reintento_con_espera_exponencial(self):
+        self.registrar('A')
+        self.llegar_la_hora()
+        aviso = Notificacion.objects.get()
+        falla = mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP caído')
+        )
+        with falla, self.assertLogs('sise.notificaciones', 'WARNING') as registros:
+            antes = timezone.now()
+            totales = NotificacionService.enviar_pendientes()
+        self.assertEqual((totales["reintentos"], totales["fallidos"]), (1, 0))
+        self.assertIn('notificaciones.error', [registro.evento for registro in registros.records])
+        aviso.refresh_from_db()
+        self.assertEqual((aviso.estado, aviso.intentos, aviso.lote), ('P', 1, None))
+        self.assertIn('SMTP caído', aviso.error)
+        self.assertGreaterEqual(aviso.disponible, antes + datetime.timedelta(seconds=60))
+        self.assertLess(aviso.disponible, antes + datetime.timedelta(seconds=120))
+
+        # Antes de la espera no se vuelve a intentar
+        with falla:
+            self.assertEqual(NotificacionService.enviar_pendientes()["reintentos"], 0)
+
+        # El segundo fallo duplica la espera
+        Notificacion.objects.update(disponible=timezone.now())
+        with falla, self.assertLogs('sise.notificaciones', 'WARNING'):
+            antes = timezone.now()
+            NotificacionService.enviar_pendientes()
+        aviso.refresh_from_db()
+        self.assertEqual(aviso.intentos, 2)
+        self.assertGreaterEqual(aviso.disponible, antes + datetime.timedelta(seconds=120))
+
+        # Al llegar al máximo de intentos el aviso queda fallido
+        Notificacion.objects.update(disponible=timezone.now())
+        with falla, self.assertLogs('sise.notificaciones', 'ERROR'):
+            totales = NotificacionService.enviar_pendientes()
+        self.assertEqual(totales["fallidos"], 1)
+        aviso.refresh_from_db()
+        self.assertEqual((aviso.estado, aviso.intentos), ('F', 3))
+        self.assertEqual(NotificacionService.enviar_pendientes()["correos"], 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_avisos_reservados_por_otro_envio(self):
+        self.registrar('A', 'A')
+        self.llegar_la_hora()
+        # Otro proceso reservó los avisos del primer acudiente
+        Notificacion.objects.filter(acudiente=self.acudiente).update(
+            lote=uuid.uuid4(), disponible=timezone.now() + datetime.timedelta(minutes=10)
+        )
+        salida = io.StringIO()
+        call_command('enviar_notificaciones', stdout=salida)
+        self.assertIn('1 correos enviados (1 avisos)', salida.getvalue())
+        self.assertEqual([correo.to for correo in mail.outbox], [[self.otro_acudiente.email]])
+
+        # La reserva vence si el proceso que la tomó no terminó
+        Notificacion.objects.filter(estado='P').update(disponible=timezone.now())
+        self.assertEqual(NotificacionService.enviar_pendientes()["avisos"], 2)
+
+@override_settings(SISE_TRABAJOS_REINTENTO_S=30)
+class TrabajosTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_institucion(grupos=1, estudiantes_por_grupo=2, prefijo='trabajos')
+        cls.admin = User.objects.create(
+            email='admin.trabajos@sise.test', nombre='Admin', apellido='Trabajos', password='!',
+            rol=cls.datos.docente.rol, is_staff=True
+        )
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        self.privados = tempfile.TemporaryDirectory()
+        self.addCleanup(self.privados.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=self.media.name, SISE_TRABAJOS_PRIVADOS_DIR=self.privados.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.client.force_authenticate(self.admin)
+
+    def test_reclama_por_prioridad_y_disponibilidad(self):
+        normal = TrabajoService.encolar('exportar_usuarios', tiempo_limite=60)
+        urgente = TrabajoService.encolar('exportar_usuarios', prioridad=5)
+        futuro = TrabajoService.encolar('exportar_usuarios', prioridad=9)
+        Trabajo.objects.filter(pk=futuro.pk).update(disponible=timezone.now() + datetime.timedelta(minutes=5))
+
+        trabajo = TrabajoService.reclamar('host:1:a')
+        self.assertEqual(trabajo.pk, urgente.pk)
+        self.assertEqual((trabajo.estado, trabajo.intentos, trabajo.trabajador), ('E', 1, 'host:1:a'))
+        trabajo = TrabajoService.reclamar('host:1:b')
+        self.assertEqual(trabajo.pk, normal.pk)
+        self.assertEqual(trabajo.vence - trabajo.iniciado, datetime.timedelta(seconds=60))
+        # El de mayor prioridad todavía no está disponible
+        self.assertIsNone(TrabajoService.reclamar('host:1:c'))
+
+    def test_encolar_ejecutar_y_descargar(self):
+        respuesta = self.client.post('/api/trabajos/', {
+            'tipo': 'exportar_usuarios', 'parametros': {'formato': 'csv'}, 'prioridad': 1
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 202)
+        self.assertEqual((respuesta.data['estado'], respuesta.data['archivo']), ('P', None))
+        url = f"/api/trabajos/{respuesta.data['id']}/"
+        self.assertEqual(self.client.get(url + 'archivo/').status_code, 404)
+
+        with self.assertLogs('sise.trabajos') as registros:
+            self.assertTrue(TrabajoService.ejecutar(TrabajoService.reclamar('host:1:a')))
+        self.assertIn('trabajo.completado', [registro.evento for registro in registros.records])
+        datos = self.client.get(url).data
+        self.assertEqual((datos['estado'], datos['intentos']), ('C', 1))
+        self.assertEqual(datos['resultado']['filas'], User.objects.count())
+        self.assertEqual(datos['archivo'], url + 'archivo/')
+        self.assertEqual(self.client.get(url + 'archivo/').status_code, 200)
+
+    def test_validacion_y_permisos(self):
+        self.assertEqual(
+            self.client.post('/api/trabajos/', {'tipo': 'desconocido'}, format='json').status_code, 400
+        )
+        self.assertEqual(self.client.post('/api/trabajos/', {
+            'tipo': 'exportar_usuarios', 'parametros': {'formato': 'pdf'}
+        }, format='json').status_code, 400)
+        self.assertEqual(self.client.get(f'/api/trabajos/{uuid.uuid4()}/').status_code, 404)
+        self.client.force_authenticate(self.datos.docente)
+        self.assertEqual(self.client.get('/api/trabajos/').status_code, 403)
+        self.assertFalse(Trabajo.objects.exists())
+
+    def test_reintento_con_espera_y_fallo_final(self):
+        encolado = TrabajoService.encolar('desconocido', {'password': 'Clave-secreta'}, max_intentos=2)
+        self.assertEqual(TrabajoService.parametros(encolado), {'password': 'Clave-secreta'})
+        with self.assertLogs('sise.trabajos', 'WARNING'):
+            antes = timezone.now()
+            self.assertFalse(TrabajoService.ejecutar(TrabajoService.reclamar('host:1:a')))
+        trabajo = Trabajo.objects.get()
+        self.assertEqual((trabajo.estado, trabajo.intentos, trabajo.trabajador, trabajo.vence), ('P', 1, '', None))
+        self.assertIn('Tipo de trabajo desconocido', trabajo.error)
+        self.assertGreaterEqual(trabajo.disponible, antes + datetime.timedelta(seconds=30))
+        self.assertIsNone(TrabajoService.reclamar('host:1:a'))
+        # El archivo privado se conserva para el reintento
+        self.assertEqual(os.listdir(self.privados.name), [f'{trabajo.pk}.json'])
+
+        Trabajo.objects.update(disponible=timezone.now())
+        with self.assertLogs('sise.trabajos', 'ERROR'):
+            self.assertFalse(TrabajoService.ejecutar(TrabajoService.reclamar('host:1:a')))
+        trabajo.refresh_from_db()
+        self.assertEqual((trabajo.estado, trabajo.intentos), ('F', 2))
+        self.assertIsNotNone(trabajo.terminado)
+        # Las credenciales no quedan guardadas en un trabajo terminado
+        self.assertEqual(trabajo.parametros, {'password': REDACTADO})
+        self.assertEqual(os.listdir(self.privados.name), [])
+
+    def test_tiempo_agotado_descarta_el_resultado_tardio(self):
+        TrabajoService.encolar('exportar_usuarios', max_intentos=2)
+        trabajo = TrabajoService.reclamar('host:1:a')
+        Trabajo.objects.update(vence=timezone.now() - datetime.timedelta(seconds=1))
+
+        with self.assertLogs('sise.trabajos', 'WARNING'):
+            recuperados = TrabajoService.recuperar_vencidos()
+        self.assertEqual([recuperado.pk for recuperado in recuperados], [trabajo.pk])
+        actual = Trabajo.objects.get()
+        self.assertEqual((actual.estado, actual.error), ('P', 'Tiempo agotado'))
+
+        # El intento vencido termina después: su resultado no se registra
+        with self.assertLogs('sise.trabajos', 'WARNING') as registros:
+            self.assertFalse(TrabajoService.ejecutar(trabajo))
+        self.assertIn('trabajo.descartado', [registro.evento for registro in registros.records])
+        self.assertEqual(Trabajo.objects.get().estado, 'P')
+        self.assertEqual(os.listdir(self.media.name), ['trabajos'])
+        self.assertEqual(os.listdir(os.path.join(self.media.name, 'trabajos')), [])
+
+        # Sin intentos restantes el trabajo vencido queda fallido
+        Trabajo.objects.update(disponible=timezone.now())
+        TrabajoService.reclamar('host:1:a')
+        Trabajo.objects.update(vence=timezone.now() - datetime.timedelta(seconds=1))
+        with self.assertLogs('sise.trabajos', 'WARNING'):
+            TrabajoService.recuperar_vencidos()
+        self.assertEqual(Trabajo.objects.get().estado, 'F')
+
+    def test_recupera_trabajos_de_procesos_terminados(self):
+        TrabajoService.encolar('exportar_usuarios')
+        TrabajoService.encolar('exportar_usuarios')
+        host = socket.gethostname()
+        caido = TrabajoService.reclamar(f'{host}:999999:a')
+        vivo = TrabajoService.reclamar(f'{host}:{os.getpid()}:a')
+
+        activo = mock.patch.object(
+            TrabajoService, '_proceso_activo', side_effect=lambda trabajador: trabajador == vivo.trabajador
+        )
+        with activo, self.assertLogs('sise.trabajos', 'WARNING'):
+            recuperados = TrabajoService.recuperar_vencidos()
+        self.assertEqual([trabajo.pk for trabajo in recuperados], [caido.pk])
+        self.assertEqual(Trabajo.objects.get(pk=caido.pk).error, 'El proceso del trabajador terminó')
+        self.assertEqual(Trabajo.objects.get(pk=vivo.pk).estado, 'E')
+
+class RunworkersTest(TransactionTestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        ajustes = override_settings(MEDIA_ROOT=self.media.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def test_una_vez_vacia_la_cola(self):
+        for _ in range(3):
+            TrabajoService.encolar('exportar_usuarios')
+        salida = io.StringIO()
+        with self.assertLogs('sise.trabajos'):
+            call_command('runworkers', '--hilos', '2', '--una-vez', '--intervalo', '0.01', stdout=salida)
+        self.assertIn('2 trabajadores en hilos', salida.getvalue())
+        self.assertEqual(list(Trabajo.objects.values_list('estado', flat=True)), ['C'] * 3)
+        self.assertEqual(set(Trabajo.objects.values_list('intentos', flat=True)), {1})
@@ -0,0 +1,100 @@
+"""
+Tipos de trabajo en segundo plano.
+
+Cada tipo se registra con ``@tarea(nombre, serializer)``: el serializer
+valida los parámetros al encolar (la API responde 400 si no son válidos) y
+de nuevo al ejecutar, cuando los ids ya se convierten en instancias. La
+función recibe el Trabajo y los datos validados y devuelve el resultado
+(un valor JSON); si produce un archivo lo guarda en ``trabajo.archivo``
+sin guardar el modelo, y TrabajoService lo registra al completar.
+"""
+import tempfile
+from django.core.files import File
+from django.db import transaction
+from .exports import escribir_exportacion, nombre_exportacion
+from .models import Periodo
+from .serializers import (
+    ExportacionSerializer, ExportacionCalificacionesSerializer, ExportacionAsistenciasSerializer,
+    ImportarMatriculaSerializer, ReconstruirResumenesSerializer
+)
+from .services.exportacion_service import ExportacionService
+from .services.matricula_service import MatriculaService
+from .services.resumen_service import ResumenService
+
+class Tarea:
+    def __init__(self, nombre, funcion, serializer):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.serializer = serializer
+
+    def validar(self, parametros):
+        """
+        Devuelve ``(datos, errores)``: los datos validados o los errores del serializer
+        """
+        serializer = self.serializer(data=parametros)
+        if serializer.is_valid():
+            return serializer.validated_data, None
+        return None, serializer.errors
+
+    def ejecutar(self, trabajo, parametros):
+        datos, errores = self.validar(parametros)
+        if errores:
+            raise ValueError(f'Parámetros inválidos: {errores}')
+        return self.funcion(trabajo, datos)
+
+TAREAS = {}
+
+def tarea(nombre, serializer):
+    def registrar(funcion):
+        TAREAS[nombre] = Tarea(nombre, funcion, serializer)
+        return funcion
+    return registrar
+
+def _exportar(trabajo, nombre, formato, encabezados, filas):
+    total = 0
+
+    def contar(filas):
+        nonlocal total
+        for fila in filas:
+            total += 1
+            yield fila
+
+    with tempfile.TemporaryFile() as temporal:
+        escribir_exportacion(temporal, formato, encabezados, contar(filas))
+        temporal.seek(0)
+        trabajo.archivo.save(nombre_exportacion(nombre, formato), File(temporal), save=False)
+    return {"filas": total}
+
+@tarea('exportar_usuarios', ExportacionSerializer)
+def exportar_usuarios(trabajo, datos):
+    encabezados, filas = ExportacionService.usuarios()
+    return _exportar(trabajo, 'usuarios', datos['formato'], encabezados, filas)
+
+@tarea('exportar_calificaciones', ExportacionCalificacionesSerializer)
+def exportar_calificaciones(trabajo, datos):
+    encabezados, filas = ExportacionService.calificaciones(datos['periodo'], datos.get('grupo'))
+    return _exportar(trabajo, 'calificaciones', datos['formato'], encabezados, filas)
+
+@tarea('exportar_asistencias', ExportacionAsistenciasSerializer)
+def exportar_asistencias(trabajo, datos):
+    encabezados, filas = ExportacionService.asistencias(datos['desde'], datos['hasta'], datos.get('grupo'))
+    return _exportar(trabajo, 'asistencias', datos['formato'], encabezados, filas)
+
+@tarea('importar_matricula', ImportarMatriculaSerializer)
+def importar_matricula(trabajo, datos):
+    # Los parámetros son JSON: la matrícula llega como lista de registros, no como archivo
+    return MatriculaService.importar(
+        datos['registros'],
+        password_por_defecto=datos.get('password_por_defecto'),
+        parcial=datos['parcial'],
+        simular=datos['simular']
+    )
+
+@tarea('reconstruir_resumenes', ReconstruirResumenesSerializer)
+def reconstruir_resumenes(trabajo, datos):
+    periodos = Periodo.objects.all()
+    if datos.get('periodos'):
+        periodos = periodos.filter(id__in=datos['periodos'])
+    with transaction.atomic():
+        total = ResumenService.reconstruir(periodos)
+    return {"resumenes": total}
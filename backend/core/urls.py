@@ -1,11 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 # Configurar los routers para las vistas basadas en ViewSet
 router = DefaultRouter()
 router.register(r'usuarios', views.UserViewSet, basename='usuario')
 router.register(r'roles', views.RolViewSet, basename='rol')
+router.register(r'grados', views.GradoViewSet, basename='grado')
+router.register(r'grupos', views.GrupoViewSet, basename='grupo')
+router.register(r'asignaturas', views.AsignaturaViewSet, basename='asignatura')
+router.register(r'periodos', views.PeriodoViewSet, basename='periodo')
+router.register(r'tipos-observacion', views.TipoObservacionViewSet, basename='tipo-observacion')
 
 app_name = 'api'  # Namespace para la API
 
@@ -18,6 +23,50 @@ urlpatterns = [
     path('logout/', views.api_logout, name='logout'),
     path('user/', views.api_user, name='user'),
     
+    # Endpoints de asistencia
+    path('asistencias/registro-masivo/', views.api_asistencia_masiva, name='asistencia-masiva'),
+    path('asistencias/resumen/', views.api_resumen_asistencia, name='asistencia-resumen'),
+    
+    # Endpoints de calificaciones
+    path('calificaciones/planilla/', views.api_planilla_calificaciones, name='calificaciones-planilla'),
+    
+    # Boletín por estudiante
+    path('estudiantes/<int:estudiante_id>/boletin/', views.api_boletin, name='estudiante-boletin'),
+    
+    # Panel del estudiante (grupo, notas, asistencia y observaciones en una respuesta)
+    path('estudiantes/<int:estudiante_id>/panel/', views.api_panel_estudiante, name='estudiante-panel'),
+    
+    # Carga del docente (asignaciones, listas de grupo, asistencia del día y planeaciones)
+    path('docentes/carga/', views.api_carga_docente, name='docente-carga'),
+    
+    # Revisión de planeaciones por lotes
+    path('planeaciones/transiciones/', views.api_transiciones_planeaciones, name='planeacion-transiciones'),
+    
+    # Adjuntos de planeaciones: carga por partes (reanudable) y descarga
+    path('planeaciones/<int:planeacion_id>/adjunto/', views.api_descargar_adjunto, name='planeacion-adjunto'),
+    path('planeaciones/<int:planeacion_id>/adjunto/cargas/', views.api_crear_carga_adjunto, name='planeacion-carga-adjunto'),
+    path('cargas/<uuid:carga_id>/', views.api_carga_adjunto, name='carga-adjunto'),
+    
+    # Trabajos en segundo plano: encolar, consultar estado y descargar el archivo generado
+    path('trabajos/', views.api_trabajos, name='trabajo-list'),
+    path('trabajos/<uuid:trabajo_id>/', views.api_trabajo, name='trabajo-detail'),
+    path('trabajos/<uuid:trabajo_id>/archivo/', views.api_trabajo_archivo, name='trabajo-archivo'),
+    
+    # Exportaciones (CSV o XLSX)
+    path('exportar/usuarios/', views.api_exportar_usuarios, name='exportar-usuarios'),
+    path('exportar/calificaciones/', views.api_exportar_calificaciones, name='exportar-calificaciones'),
+    path('exportar/asistencias/', views.api_exportar_asistencias, name='exportar-asistencias'),
+    
+    # Importación de matrícula (CSV o JSON)
+    path('matricula/importar/', views.api_importar_matricula, name='matricula-importar'),
+    
+    # Lecturas asíncronas (ASGI) con las mismas respuestas que las rutas síncronas
+    path('async/health/', async_views.api_health_check, name='async-health'),
+    path('async/user/', async_views.api_user, name='async-user'),
+    path('async/usuarios/', async_views.api_usuarios, name='async-usuario-list'),
+    path('async/usuarios/<int:pk>/', async_views.api_usuario, name='async-usuario-detail'),
+    path('async/roles/', async_views.api_roles, name='async-rol-list'),
+    
     # Incluir rutas auto-generadas por el router
     path('', include(router.urls)),
 ] 
\ No newline at end of file
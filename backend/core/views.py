@@ -1,23 +1,53 @@
+import logging
 from django.shortcuts import render
 from django.http import HttpResponse
 from django.views.generic import TemplateView
 from django.views.decorators.csrf import ensure_csrf_cookie
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, action
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
 from rest_framework import status, viewsets, filters
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.db.models import Q
-from .models import User, Rol
+from django.utils import timezone
+from .models import (
+    User, Rol, Estudiante, Grado, Grupo, Asignatura, Periodo, TipoObservacion, Planeacion, CargaAdjunto, Trabajo
+)
 from .serializers import (
     UserSerializer, UserCreateSerializer, UserDetailSerializer,
-    UserUpdateSerializer, ChangePasswordSerializer, RolSerializer
+    UserUpdateSerializer, ChangePasswordSerializer, RolSerializer,
+    AsistenciaMasivaSerializer, PlanillaCalificacionesSerializer, ResumenPeriodoSerializer,
+    ConsultaResumenAsistenciaSerializer, ExportacionSerializer, ExportacionCalificacionesSerializer,
+    ExportacionAsistenciasSerializer, ImportarMatriculaSerializer, GradoSerializer, GrupoSerializer,
+    AsignaturaSerializer, PeriodoSerializer, TipoObservacionSerializer, NuevaCargaAdjuntoSerializer,
+    CargaAdjuntoSerializer, TransicionesPlaneacionSerializer, NuevoTrabajoSerializer, TrabajoSerializer
 )
 from django.conf import settings
+from .archivos import respuesta_archivo
+from .catalogos import CatalogoCacheMixin
+from .exports import respuesta_exportacion
+from .logs import evento, get_logger
+from .pagination import UserKeysetPagination
+from .salud import sondas
+from .search import UserSearchFilter
 from .services.auth_service import AuthService
 from .services.user_service import UserService
+from .services.asistencia_service import AsistenciaService
+from .services.calificacion_service import CalificacionService
+from .services.resumen_service import ResumenService
+from .services.resumen_asistencia_service import ResumenAsistenciaService
+from .services.exportacion_service import ExportacionService
+from .services.matricula_service import MatriculaService
+from .services.panel_service import PanelService
+from .services.carga_docente_service import CargaDocenteService
+from .services.carga_adjunto_service import CargaAdjuntoService
+from .services.planeacion_service import PlaneacionService
+from .services.trabajo_service import TrabajoService
+
+logger = get_logger('views')
 
 # Create your views here.
 
@@ -36,36 +66,70 @@ class ReactAppView(TemplateView):
     template_name = 'index.html'
 
 # API de prueba/salud
+ESTADO_API = {
+    "status": "ok",
+    "message": "API en funcionamiento",
+    "version": "1.0.0"
+}
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def api_health_check(request):
     """
     Endpoint de verificación de salud/disponibilidad de la API
     """
-    return Response({
-        "status": "ok",
-        "message": "API en funcionamiento",
-        "version": "1.0.0"
-    })
+    return Response(ESTADO_API)
+
+# Sondas para el balanceador: no autentican para no consultar tokens
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def api_health_live(request):
+    """
+    Liveness: el proceso responde. No consulta dependencias
+    """
+    return Response({"status": "ok"}, headers={'Cache-Control': 'no-store'})
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def api_health_ready(request):
+    """
+    Readiness: base de datos, caché, directorio de medios y migraciones.
+    Responde 503 si alguna comprobación falla
+    """
+    resultado = sondas.disponibilidad()
+    return Response(
+        resultado,
+        status=status.HTTP_200_OK if resultado['status'] == 'ok' else status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Cache-Control': 'no-store'}
+    )
 
 # Endpoints de autenticación
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def api_login(request):
-    print(f"\n=== DEBUG LOGIN ===")
-    print(f"Método HTTP: {request.method}")
-    print(f"HEADERS: {dict(request.headers)}")
-    print(f"BODY: {request.data}")
-    print(f"=== FIN DEBUG ===\n")
+    evento(
+        logger, 'auth.login.solicitud', logging.DEBUG,
+        headers=dict(request.headers), datos=dict(request.data)
+    )
     
     email = request.data.get('email')
     password = request.data.get('password')
     
-    print(f"Email recibido: {email}")
-    print(f"Password recibido: {'*' * len(password) if password else 'No proporcionado'}")
-    
     return AuthService.login(email, password)
 
+class ObtenerTokenView(ObtainAuthToken):
+    """
+    ``obtain_auth_token`` de DRF, pero un token vencido se reemplaza por uno
+    nuevo como en api_login (el vencido fallaría con 401 en cada petición)
+    """
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token, _ = AuthService.emitir_token(serializer.validated_data['user'])
+        return Response({'token': token.key})
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def api_logout(request):
@@ -76,9 +140,428 @@ def api_logout(request):
 def api_user(request):
     return AuthService.get_current_user(request.user)
 
+# Registro masivo de asistencia para un grupo completo
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_asistencia_masiva(request):
+    """
+    Registra (o actualiza) la asistencia de todo un grupo para una fecha
+    """
+    serializer = AsistenciaMasivaSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    grupo = serializer.validated_data['grupo']
+    if not AsistenciaService.puede_registrar(request.user, grupo):
+        return Response(
+            {"detail": "No tiene asignaciones en este grupo"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    resultado = AsistenciaService.registrar_grupo(
+        grupo,
+        serializer.validated_data['fecha'],
+        serializer.validated_data['registros'],
+        request.user
+    )
+    return Response(resultado)
+
+# Consultas de asistencia por grupo a partir de los resúmenes
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_resumen_asistencia(request):
+    """
+    Conteos de asistencia por estado agrupados por día, semana o período
+    """
+    serializer = ConsultaResumenAsistenciaSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    grupo = serializer.validated_data.get('grupo')
+    if not request.user.is_staff and (grupo is None or not AsistenciaService.puede_registrar(request.user, grupo)):
+        return Response(
+            {"detail": "No tiene permiso para consultar la asistencia de este grupo"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    return Response(ResumenAsistenciaService.consultar(**serializer.validated_data))
+
+# Planilla de calificaciones de una asignación en un período
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_planilla_calificaciones(request):
+    """
+    Registra (o actualiza) las notas de una asignación docente en un período
+    """
+    serializer = PlanillaCalificacionesSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    asignacion = serializer.validated_data['asignacion']
+    if not CalificacionService.puede_calificar(request.user, asignacion):
+        return Response(
+            {"detail": "La asignación no pertenece al usuario"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    resultado = CalificacionService.registrar_planilla(
+        asignacion,
+        serializer.validated_data['periodo'],
+        serializer.validated_data['registros']
+    )
+    return Response(resultado)
+
+# Boletín de un estudiante a partir de los resúmenes materializados
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_boletin(request, estudiante_id):
+    """
+    Devuelve el resumen del estudiante por período (?periodo=<id> para uno solo)
+    """
+    estudiante = Estudiante.objects.filter(pk=estudiante_id).first()
+    if estudiante is None:
+        return Response({"detail": "Estudiante no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    if not request.user.is_staff and estudiante.user_id != request.user.id:
+        return Response(
+            {"detail": "No tiene permiso para ver este boletín"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    periodo = request.query_params.get('periodo')
+    if periodo is not None and not periodo.isdigit():
+        return Response({"detail": "Período inválido"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    resumenes = ResumenService.obtener(estudiante, periodo)
+    return Response(ResumenPeriodoSerializer(resumenes, many=True).data)
+
+# Panel del estudiante con sus datos de todos los períodos en una sola petición
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_panel_estudiante(request, estudiante_id):
+    """
+    Devuelve grupo, calificaciones y asistencia por período y observaciones
+    recientes del estudiante (?periodo=<id> para un solo período). Lo pueden
+    ver el estudiante, sus acudientes y el personal administrativo
+    """
+    estudiante = Estudiante.objects.select_related('user', 'grupo__grado').filter(pk=estudiante_id).first()
+    if estudiante is None:
+        return Response({"detail": "Estudiante no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    if (
+        not request.user.is_staff and estudiante.user_id != request.user.id
+        and not estudiante.acudientes.filter(pk=request.user.id).exists()
+    ):
+        return Response(
+            {"detail": "No tiene permiso para ver este panel"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    periodo = request.query_params.get('periodo')
+    if periodo is not None and not periodo.isdigit():
+        return Response({"detail": "Período inválido"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(PanelService.obtener(estudiante, int(periodo) if periodo else None))
+
+# Carga del docente al iniciar sesión: grupos, estudiantes, asistencia del día y planeaciones
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_carga_docente(request):
+    """
+    Devuelve la carga del usuario autenticado; el personal administrativo
+    puede consultar la de otro docente con ?docente=<id>
+    """
+    docente = request.user
+    docente_id = request.query_params.get('docente')
+    if docente_id is not None:
+        if not docente_id.isdigit():
+            return Response({"detail": "Docente inválido"}, status=status.HTTP_400_BAD_REQUEST)
+        if int(docente_id) != request.user.id:
+            if not request.user.is_staff:
+                return Response(
+                    {"detail": "No tiene permiso para ver la carga de otro docente"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            docente = User.objects.filter(pk=docente_id).first()
+            if docente is None:
+                return Response({"detail": "Docente no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response(CargaDocenteService.obtener(docente, timezone.localdate()))
+
+# Adjuntos de planeaciones: carga por partes y descarga con permiso
+def _gestiona_planeacion(usuario, planeacion):
+    return usuario.is_staff or planeacion.docente_id == usuario.id
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_crear_carga_adjunto(request, planeacion_id):
+    """
+    Inicia la carga por partes del adjunto de una planeación ({nombre, tamano})
+    """
+    planeacion = Planeacion.objects.filter(pk=planeacion_id).first()
+    if planeacion is None:
+        return Response({"detail": "Planeación no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+    if not _gestiona_planeacion(request.user, planeacion):
+        return Response(
+            {"detail": "No tiene permiso para modificar esta planeación"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    serializer = NuevaCargaAdjuntoSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    carga = CargaAdjuntoService.crear(
+        planeacion, request.user, serializer.validated_data['nombre'], serializer.validated_data['tamano']
+    )
+    return Response(CargaAdjuntoSerializer(carga).data, status=status.HTTP_201_CREATED)
+
+def _fragmento(request, carga):
+    """
+    Posición y longitud del fragmento según Content-Range (bytes inicio-fin/total),
+    o la respuesta de error
+    """
+    unidad, _, valor = request.headers.get('Content-Range', '').partition(' ')
+    intervalo, _, total = valor.partition('/')
+    inicio, _, fin = intervalo.partition('-')
+    if unidad != 'bytes' or not (inicio.isdigit() and fin.isdigit() and total.isdigit()):
+        return Response(
+            {"detail": "Debe indicar Content-Range: bytes inicio-fin/total"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    inicio, fin, total = int(inicio), int(fin), int(total)
+    longitud = fin - inicio + 1
+    if total != carga.tamano or fin < inicio or fin >= total:
+        return Response({"detail": "Content-Range no corresponde a la carga"}, status=status.HTTP_400_BAD_REQUEST)
+    if longitud > settings.SISE_CARGA_FRAGMENTO_MAX_BYTES:
+        return Response(
+            {"detail": f"El fragmento supera el máximo de {settings.SISE_CARGA_FRAGMENTO_MAX_BYTES} bytes"},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    if request.headers.get('Content-Length') != str(longitud):
+        return Response(
+            {"detail": "Content-Length no coincide con Content-Range"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if carga.completa and fin == total - 1:
+        # Último fragmento repetido (p. ej. se perdió la respuesta): ya se aplicó
+        return Response(CargaAdjuntoSerializer(carga).data)
+    if inicio != carga.recibido:
+        return Response(
+            {"detail": "El fragmento no continúa la carga", "recibido": carga.recibido},
+            status=status.HTTP_409_CONFLICT
+        )
+    return inicio, longitud
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def api_carga_adjunto(request, carga_id):
+    """
+    GET: estado de la carga (bytes recibidos, para reanudar).
+    PATCH: envía un fragmento con el cuerpo en bruto y Content-Range; si la
+    carga ya está completa, repetir el último fragmento devuelve su estado.
+    DELETE: cancela la carga.
+    """
+    carga = CargaAdjunto.objects.select_related('planeacion').filter(pk=carga_id).first()
+    if carga is None or CargaAdjuntoService.vencida(carga):
+        return Response({"detail": "Carga no encontrada o vencida"}, status=status.HTTP_404_NOT_FOUND)
+    if not request.user.is_staff and carga.usuario_id != request.user.id:
+        return Response({"detail": "No tiene permiso sobre esta carga"}, status=status.HTTP_403_FORBIDDEN)
+    
+    if request.method == 'GET':
+        return Response(CargaAdjuntoSerializer(carga).data)
+    if request.method == 'DELETE':
+        CargaAdjuntoService.cancelar(carga)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    fragmento = _fragmento(request, carga)
+    if isinstance(fragmento, Response):
+        return fragmento
+    inicio, longitud = fragmento
+    try:
+        # El cuerpo se lee directamente del flujo de la petición, sin request.data
+        CargaAdjuntoService.escribir(carga, inicio, longitud, request.stream)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    except CargaAdjunto.DoesNotExist:
+        carga.refresh_from_db()
+        if carga.completa and inicio + longitud == carga.tamano:
+            return Response(CargaAdjuntoSerializer(carga).data)
+        return Response(
+            {"detail": "El fragmento no continúa la carga", "recibido": carga.recibido},
+            status=status.HTTP_409_CONFLICT
+        )
+    return Response(CargaAdjuntoSerializer(carga).data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_descargar_adjunto(request, planeacion_id):
+    """
+    Descarga el adjunto de una planeación (el docente que la creó o el personal
+    administrativo)
+    """
+    planeacion = Planeacion.objects.filter(pk=planeacion_id).first()
+    if planeacion is None or not planeacion.archivo_adjunto:
+        return Response({"detail": "Adjunto no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    if not _gestiona_planeacion(request.user, planeacion):
+        return Response(
+            {"detail": "No tiene permiso para ver este adjunto"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return respuesta_archivo(request, planeacion.archivo_adjunto)
+
+# Revisión de planeaciones por lotes (B → E → A)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_transiciones_planeaciones(request):
+    """
+    Cambia el estado de varias planeaciones ({transiciones: [{id, estado}]})
+    e informa el resultado de cada una
+    """
+    serializer = TransicionesPlaneacionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    resultado = PlaneacionService.transicionar(serializer.validated_data['transiciones'], request.user)
+    return Response(resultado)
+
+# Exportaciones de Secretaría (CSV o XLSX con ?formato=)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_exportar_usuarios(request):
+    """
+    Exporta todos los usuarios transmitiendo las filas a medida que se leen
+    """
+    serializer = ExportacionSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    encabezados, filas = ExportacionService.usuarios()
+    return respuesta_exportacion('usuarios', serializer.validated_data['formato'], encabezados, filas)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_exportar_calificaciones(request):
+    """
+    Exporta las calificaciones de un período (?periodo=), opcionalmente de un grupo (?grupo=)
+    """
+    serializer = ExportacionCalificacionesSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    datos = serializer.validated_data
+    encabezados, filas = ExportacionService.calificaciones(datos['periodo'], datos.get('grupo'))
+    return respuesta_exportacion('calificaciones', datos['formato'], encabezados, filas)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_exportar_asistencias(request):
+    """
+    Exporta las asistencias entre ?desde= y ?hasta=, opcionalmente de un grupo (?grupo=)
+    """
+    serializer = ExportacionAsistenciasSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    datos = serializer.validated_data
+    encabezados, filas = ExportacionService.asistencias(datos['desde'], datos['hasta'], datos.get('grupo'))
+    return respuesta_exportacion('asistencias', datos['formato'], encabezados, filas)
+
+# Importación masiva de matrícula (usuarios + estudiantes)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def api_importar_matricula(request):
+    """
+    Importa estudiantes desde un archivo CSV/JSON (campo ``archivo``) o una
+    lista ``registros``. Responde 400 con los errores por fila si alguna fila
+    es inválida y no se pidió ``parcial``. Con más de SISE_MATRICULA_SINCRONA_MAX
+    filas (y sin ``simular``) valida las filas, encola el trabajo
+    importar_matricula y responde 202.
+    """
+    serializer = ImportarMatriculaSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    datos = serializer.validated_data
+    registros = datos.get('registros')
+    if registros is None:
+        archivo = datos['archivo']
+        try:
+            registros = MatriculaService.leer_archivo(archivo.read(), MatriculaService.formato_de(archivo.name))
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({"detail": f"Archivo inválido: {exc}"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not datos['simular'] and len(registros) > settings.SISE_MATRICULA_SINCRONA_MAX:
+        # Las filas se validan aquí (sin hashear) para responder 400 con los
+        # errores en lugar de encolar un trabajo que fallaría
+        validacion = MatriculaService.importar(
+            registros, password_por_defecto=datos.get('password_por_defecto'), simular=True
+        )
+        if validacion['errores'] and not datos['parcial']:
+            return Response(validacion, status=status.HTTP_400_BAD_REQUEST)
+        parametros = {"registros": registros, "parcial": datos['parcial'], "simular": False}
+        if 'password_por_defecto' in datos:
+            parametros['password_por_defecto'] = datos['password_por_defecto']
+        trabajo = TrabajoService.encolar('importar_matricula', parametros, usuario=request.user)
+        evento(logger, 'trabajo.encolado', id=str(trabajo.id), tipo=trabajo.tipo, usuario=request.user.id)
+        return Response(TrabajoSerializer(trabajo).data, status=status.HTTP_202_ACCEPTED)
+    
+    resultado = MatriculaService.importar(
+        registros,
+        password_por_defecto=datos.get('password_por_defecto'),
+        parcial=datos['parcial'],
+        simular=datos['simular']
+    )
+    if resultado['errores'] and not datos['parcial']:
+        return Response(resultado, status=status.HTTP_400_BAD_REQUEST)
+    return Response(resultado, status=status.HTTP_201_CREATED if resultado['creados'] else status.HTTP_200_OK)
+
+# Trabajos en segundo plano (los ejecuta el comando runworkers)
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def api_trabajos(request):
+    """
+    GET: últimos trabajos (opcionalmente ?estado=). POST: encola un trabajo
+    ({tipo, parametros, prioridad}) y responde 202 con su id; los tipos están
+    en core/trabajos.py
+    """
+    if request.method == 'GET':
+        trabajos = Trabajo.objects.order_by('-creado')
+        if request.query_params.get('estado'):
+            trabajos = trabajos.filter(estado=request.query_params['estado'])
+        return Response(TrabajoSerializer(trabajos[:TrabajoService.LISTADO], many=True).data)
+    
+    serializer = NuevoTrabajoSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    trabajo = TrabajoService.encolar(usuario=request.user, **serializer.validated_data)
+    evento(logger, 'trabajo.encolado', id=str(trabajo.id), tipo=trabajo.tipo, usuario=request.user.id)
+    return Response(TrabajoSerializer(trabajo).data, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_trabajo(request, trabajo_id):
+    """
+    Estado y resultado de un trabajo
+    """
+    trabajo = Trabajo.objects.filter(pk=trabajo_id).first()
+    if trabajo is None:
+        return Response({"detail": "Trabajo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    return Response(TrabajoSerializer(trabajo).data)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_trabajo_archivo(request, trabajo_id):
+    """
+    Descarga el archivo generado por un trabajo completado
+    """
+    trabajo = Trabajo.objects.filter(pk=trabajo_id, estado='C').first()
+    if trabajo is None or not trabajo.archivo:
+        return Response({"detail": "Archivo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    return respuesta_archivo(request, trabajo.archivo)
+
 # ViewSet para el modelo Rol
-class RolViewSet(viewsets.ModelViewSet):
-    queryset = Rol.objects.all()
+class RolViewSet(CatalogoCacheMixin, viewsets.ModelViewSet):
+    queryset = Rol.objects.order_by('id')
     serializer_class = RolSerializer
     permission_classes = [IsAuthenticated]
     
@@ -89,15 +572,45 @@ class RolViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
 
+# Catálogos de solo lectura; completos (sin paginar) y con ETag (ver core/catalogos.py)
+class GradoViewSet(CatalogoCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Grado.objects.order_by('id')
+    serializer_class = GradoSerializer
+    pagination_class = None
+
+class GrupoViewSet(CatalogoCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Grupo.objects.select_related('grado').order_by('grado_id', 'nombre')
+    serializer_class = GrupoSerializer
+    pagination_class = None
+    # grado_nombre cambia si se renombra el grado
+    catalogo_modelos = (Grupo, Grado)
+
+class AsignaturaViewSet(CatalogoCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Asignatura.objects.order_by('nombre')
+    serializer_class = AsignaturaSerializer
+    pagination_class = None
+
+class PeriodoViewSet(CatalogoCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Periodo.objects.order_by('fecha_inicio')
+    serializer_class = PeriodoSerializer
+    pagination_class = None
+
+class TipoObservacionViewSet(CatalogoCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = TipoObservacion.objects.order_by('nombre')
+    serializer_class = TipoObservacionSerializer
+    pagination_class = None
+
 # ViewSet para el modelo User
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()  # Queryset por defecto
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    # UserSearchFilter va después de OrderingFilter para ordenar por relevancia
+    filter_backends = [filters.OrderingFilter, UserSearchFilter]
     search_fields = ['nombre', 'apellido', 'email']
     ordering_fields = ['nombre', 'apellido', 'email', 'rol__nombre']
-    ordering = ['apellido', 'nombre']
+    ordering = ['apellido', 'nombre', 'id']
+    pagination_class = UserKeysetPagination
     
     def get_queryset(self):
         return UserService.get_user_queryset(self.request.user)
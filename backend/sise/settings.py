@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    # Métricas por petición; no hace nada si SISE_INSTRUMENTACION está desactivado
+    'core.middleware.InstrumentacionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -210,6 +212,19 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # Adjuntos de planeaciones, deduplicados por contenido
+    'adjuntos': {
+        'BACKEND': 'core.almacenamiento.AlmacenamientoDeduplicado',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -222,10 +237,146 @@ AUTH_USER_MODEL = 'core.User'
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'no-reply@sise.edu.co')
 
+# Avisos a acudientes (core/services/notificacion_service.py)
+# Hora local desde la que se envía el resumen de cada día
+SISE_NOTIFICACIONES_HORA = int(os.getenv('SISE_NOTIFICACIONES_HORA', '17'))
+# Intentos de envío antes de marcar un aviso como fallido
+SISE_NOTIFICACIONES_MAX_INTENTOS = int(os.getenv('SISE_NOTIFICACIONES_MAX_INTENTOS', '6'))
+# Espera antes del primer reintento en segundos; se duplica en cada intento
+SISE_NOTIFICACIONES_REINTENTO_S = int(os.getenv('SISE_NOTIFICACIONES_REINTENTO_S', '60'))
+# Segundos que un envío reserva sus filas; si el proceso muere vuelven a estar disponibles
+SISE_NOTIFICACIONES_RESERVA_S = int(os.getenv('SISE_NOTIFICACIONES_RESERVA_S', '600'))
+
+# Trabajos en segundo plano (core/services/trabajo_service.py, comando runworkers)
+# Segundos que puede durar cada intento antes de darse por vencido
+SISE_TRABAJOS_TIEMPO_LIMITE_S = int(os.getenv('SISE_TRABAJOS_TIEMPO_LIMITE_S', '1800'))
+# Intentos por trabajo (el primero incluido)
+SISE_TRABAJOS_MAX_INTENTOS = int(os.getenv('SISE_TRABAJOS_MAX_INTENTOS', '3'))
+# Espera antes del primer reintento en segundos; se duplica en cada intento
+SISE_TRABAJOS_REINTENTO_S = int(os.getenv('SISE_TRABAJOS_REINTENTO_S', '30'))
+# Trabajadores por defecto de runworkers y segundos entre revisiones de la cola vacía
+SISE_TRABAJOS_HILOS = int(os.getenv('SISE_TRABAJOS_HILOS', '2'))
+SISE_TRABAJOS_INTERVALO_S = float(os.getenv('SISE_TRABAJOS_INTERVALO_S', '2'))
+# Directorio de los parámetros con credenciales de los trabajos pendientes
+# (contraseñas de una importación); fuera de MEDIA_ROOT y compartido por los trabajadores
+SISE_TRABAJOS_PRIVADOS_DIR = os.getenv('SISE_TRABAJOS_PRIVADOS_DIR', str(BASE_DIR / 'trabajos_privados'))
+# Filas desde las que api/matricula/importar/ encola el trabajo importar_matricula
+# en lugar de hashear las contraseñas dentro de la petición
+SISE_MATRICULA_SINCRONA_MAX = int(os.getenv('SISE_MATRICULA_SINCRONA_MAX', '200'))
+
+# Registro estructurado de eventos (ver core/logs.py)
+# Nivel de detalle de los eventos de la aplicación: DEBUG, INFO, WARNING...
+SISE_LOG_LEVEL = os.getenv('SISE_LOG_LEVEL', 'INFO')
+# Fracción de eventos de alto volumen que se conserva
+SISE_LOG_SAMPLING = {
+    'auth.usuario_actual': float(os.getenv('SISE_LOG_SAMPLE_USUARIO_ACTUAL', '0.01')),
+    'request.metricas': float(os.getenv('SISE_LOG_SAMPLE_REQUEST', '1.0')),
+}
+
+# Instrumentación de rendimiento por petición (ver core/middleware.py)
+SISE_INSTRUMENTACION = os.getenv('SISE_INSTRUMENTACION', 'False') == 'True'
+# Fracción de peticiones instrumentadas cuando está activada
+SISE_INSTRUMENTACION_MUESTREO = float(os.getenv('SISE_INSTRUMENTACION_MUESTREO', '1.0'))
+# Presupuesto de consultas y milisegundos por vista (nombre de la URL);
+# '*' aplica a las vistas sin presupuesto propio
+SISE_PRESUPUESTOS = {
+    '*': {'consultas': 30, 'ms': 1000},
+    # El hash de la contraseña domina el tiempo del login
+    'api:login': {'consultas': 4, 'ms': 1500},
+    'api:user': {'consultas': 2, 'ms': 100},
+    'api:usuario-list': {'consultas': 4, 'ms': 300},
+    'api:usuario-detail': {'consultas': 3, 'ms': 200},
+    'api:rol-list': {'consultas': 3, 'ms': 200},
+    'api:estudiante-boletin': {'consultas': 4, 'ms': 300},
+    'api:estudiante-panel': {'consultas': 6, 'ms': 300},
+    'api:docente-carga': {'consultas': 5, 'ms': 300},
+    'api:planeacion-transiciones': {'consultas': 8, 'ms': 1000},
+    'api:trabajo-list': {'consultas': 4, 'ms': 200},
+    'api:trabajo-detail': {'consultas': 3, 'ms': 100},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'muestreo': {
+            '()': 'core.logs.SamplingFilter',
+            'tasas': SISE_LOG_SAMPLING,
+        },
+        'redactar': {
+            '()': 'core.logs.RedactingFilter',
+        },
+    },
+    'formatters': {
+        'json': {
+            '()': 'core.logs.JsonFormatter',
+        },
+    },
+    'handlers': {
+        'sise': {
+            'class': 'core.logs.NonBlockingHandler',
+            'formatter': 'json',
+            'filters': ['muestreo', 'redactar'],
+        },
+    },
+    'loggers': {
+        'sise': {
+            'handlers': ['sise'],
+            'level': SISE_LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
+
+# Autenticación por token
+# Vigencia de los tokens en horas (0 = no vencen)
+TOKEN_LIFETIME_HOURS = int(os.getenv('TOKEN_LIFETIME_HOURS', '24'))
+# Caché en memoria de token -> usuario (por proceso)
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '10000'))
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', '60'))
+# Ruta a una función hook(evento, cache) para exportar métricas del caché
+TOKEN_CACHE_METRICS_HOOK = os.getenv('TOKEN_CACHE_METRICS_HOOK')
+# Segundos que cada proceso conserva el registro de roles (core/roles.py)
+ROLES_CACHE_TTL = int(os.getenv('ROLES_CACHE_TTL', '300'))
+
+# Caché de los catálogos con ETag (core/catalogos.py)
+# Segundos que se guarda cada respuesta y que vive cada contador de versión;
+# con LocMemCache también es lo que tarda un proceso en ver los cambios hechos en otro
+SISE_CATALOGOS_TTL = int(os.getenv('SISE_CATALOGOS_TTL', '300'))
+# max-age de Cache-Control: 0 obliga al navegador a revalidar (304) siempre
+SISE_CATALOGOS_MAX_AGE = int(os.getenv('SISE_CATALOGOS_MAX_AGE', '0'))
+
+# Sondas de vida y disponibilidad (core/salud.py)
+# Segundos que se reutiliza el resultado de la sonda de disponibilidad
+SISE_SALUD_TTL = float(os.getenv('SISE_SALUD_TTL', '5'))
+# Latencia máxima de la base de datos para considerar el proceso disponible
+SISE_SALUD_DB_MAX_MS = float(os.getenv('SISE_SALUD_DB_MAX_MS', '250'))
+
+# Panel del estudiante (core/services/panel_service.py)
+# Segundos que se guarda el panel de cada estudiante y que vive su contador de
+# versión; con LocMemCache también es lo que tarda un proceso en ver los cambios
+# hechos en otro
+SISE_PANEL_TTL = int(os.getenv('SISE_PANEL_TTL', '300'))
+
+# Adjuntos de planeaciones (core/services/carga_adjunto_service.py y core/archivos.py)
+# Tamaño máximo de un adjunto y de cada fragmento de una carga por partes
+SISE_ADJUNTO_MAX_BYTES = int(os.getenv('SISE_ADJUNTO_MAX_BYTES', str(1024 * 1024 * 1024)))
+SISE_CARGA_FRAGMENTO_MAX_BYTES = int(os.getenv('SISE_CARGA_FRAGMENTO_MAX_BYTES', str(8 * 1024 * 1024)))
+# Horas sin recibir fragmentos tras las que una carga se descarta (limpiar_cargas)
+SISE_CARGA_VIGENCIA_HORAS = int(os.getenv('SISE_CARGA_VIGENCIA_HORAS', '24'))
+# Quién envía las descargas: 'django' (FileResponse con Range, para desarrollo),
+# 'x-accel' (nginx) o 'x-sendfile' (Apache mod_xsendfile, lighttpd)
+SISE_DESCARGAS_SERVIDOR = os.getenv('SISE_DESCARGAS_SERVIDOR', 'django')
+# Prefijo de la location interna de nginx que apunta a MEDIA_ROOT
+SISE_DESCARGAS_PREFIJO_INTERNO = os.getenv('SISE_DESCARGAS_PREFIJO_INTERNO', '/protegido/')
+# Horas que se conserva un blob sin referencias antes de que recolectar_adjuntos
+# lo borre (cubre las cargas que lo encontraron y todavía no guardaron la planeación)
+SISE_BLOBS_GRACIA_HORAS = int(os.getenv('SISE_BLOBS_GRACIA_HORAS', '24'))
+
 # Configuración de REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -18,21 +18,25 @@ from django.contrib import admin
 from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework.authtoken import views as token_views
-from core.views import ReactAppView, api_health_check, home
+from core.views import ObtenerTokenView, ReactAppView, api_health_check, api_health_live, api_health_ready, home
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     
     # API endpoints
     path('api/health/', api_health_check, name='api-health-check'),
-    path('api/token-auth/', token_views.obtain_auth_token, name='api-token-auth'),
+    path('api/health/live/', api_health_live, name='api-health-live'),
+    path('api/health/ready/', api_health_ready, name='api-health-ready'),
+    path('api/token-auth/', ObtenerTokenView.as_view(), name='api-token-auth'),
     path('api/', include('core.urls', namespace='api')),
     
     # Frontend URLs - La vista principal y React para rutas no capturadas
     path('', home, name='home'),
     re_path(r'^.*$', ReactAppView.as_view(), name='react-app'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# MEDIA_ROOT no se publica: los adjuntos se descargan desde la API, que
+# comprueba el permiso (core/archivos.py)
 
 # Servir archivos estáticos en desarrollo
 if settings.DEBUG: